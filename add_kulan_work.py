@@ -3,14 +3,14 @@
 Add Kúlan 1962 work to works.json as a test of the workflow.
 """
 
-import json
+from store import WorksStore
 
 def add_kulan_work():
     """Add Kúlan 1962 work entry."""
 
     # Read current works.json
-    with open('works.json', 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    store = WorksStore()
+    data = store.data
 
     # Create new work entry
     kulan_work = {
@@ -54,9 +54,9 @@ def add_kulan_work():
     # Add to the beginning of the works array (chronologically early work)
     data['works'].insert(0, kulan_work)
 
-    # Write updated JSON
-    with open('works.json', 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    # Write updated JSON through the store (atomic, and journalled per work)
+    store.changed()
+    store.save()
 
     print("OK: Added Kúlan 1962 to works.json")
     print(f"Total works now: {len(data['works'])}")
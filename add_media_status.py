@@ -1,16 +1,14 @@
-import json
+from store import WorksStore
 
-# Read the works file
-with open('works.json', 'r', encoding='utf-8') as f:
-    data = json.load(f)
+store = WorksStore()
 
 # Add mediaStatus field to all works
-for work in data['works']:
+for work in store.works:
     work['mediaStatus'] = 'images draft'
 
-# Write back to file with proper formatting
-with open('works.json', 'w', encoding='utf-8') as f:
-    json.dump(data, f, ensure_ascii=False, indent=2)
+# Write back through the store (atomic, and journalled per work)
+store.changed()
+store.save()
 
-print(f"Added 'mediaStatus' field to {len(data['works'])} works")
+print(f"Added 'mediaStatus' field to {len(store.works)} works")
 print(f"All works set to: 'images draft'")
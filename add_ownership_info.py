@@ -4,11 +4,11 @@ Script to add ownership information to works.json for works that are missing it.
 This moves hardcoded ownership data from works.js into the JSON file.
 """
 
-import json
+from store import WorksStore
 
 # Read works.json
-with open('works.json', 'r', encoding='utf-8') as f:
-    data = json.load(f)
+store = WorksStore()
+data = store.data
 
 # Ownership information from works.js getOwnershipInfo()
 ownership_additions = {
@@ -30,8 +30,8 @@ for work in data['works']:
         work['ownership'] = ownership_additions[work['id']]
         print(f"Added ownership info to: {work['id']}")
 
-# Write back to works.json
-with open('works.json', 'w', encoding='utf-8') as f:
-    json.dump(data, f, indent=2, ensure_ascii=False)
+# Write back to works.json through the store (atomic, and journalled per work)
+store.changed()
+store.save()
 
 print("Ownership information added successfully!")
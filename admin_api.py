@@ -0,0 +1,266 @@
+"""
+Local admin API: per-record reads and writes of works.json and exhibitions.json
+for the admin-*.html pages, mounted under /api/ by the preview server.
+
+  GET    /api/works                 - [{id, title, year, version}, ...]
+  GET    /api/works/<id>            - One work; the ETag header is its version
+  PATCH  /api/works/<id>            - Merge the body into the work (needs If-Match)
+  POST   /api/works                 - Add a work
+  GET    /api/exhibitions/<id>      - One exhibition (same rules as works)
+  PATCH  /api/exhibitions/<id>
+  POST   /api/exhibitions           - Add an exhibition; body has "type": "solo" or "group"
+  DELETE /api/exhibitions/<id>      - Remove an exhibition no work refers to (needs If-Match)
+
+Saves are optimistic: the version (a hash of the record) the page loaded goes
+back in If-Match, and if the record was saved by someone else in between the
+write is refused with 412 and the current record. A PATCH body is a JSON merge
+patch (RFC 7396): fields it names are replaced, null removes a field and
+everything else is kept. The resulting record is checked against the model
+(models.Work.problems / Exhibition.problems) and refused with 422 if a field
+has the wrong type or a required one is missing, before anything is written.
+Each save first snapshots both files (snapshots.py), then writes the changed
+one atomically through the WorksStore and runs the build stages derived from
+the records (build.py update_records: fix-ups, search and facet indexes,
+article pages) for the works whose fingerprint changed; images are never
+rendered from a save. If one of those stages fails the record stays saved,
+but the response is a 500 naming the failed stages (with the saved record in
+"current").
+
+Writes are refused unless they come from the preview server's own pages: the
+Host must be a loopback name, an Origin header must match it, and a body must
+be sent as Content-Type: application/json. A cross-site form or text/plain
+POST therefore gets 403/415 instead of editing the data.
+"""
+
+import json
+import threading
+from urllib.parse import unquote, urlsplit
+
+from journal import current_command, set_command
+from models import Exhibition, Work
+from store import WorksStore, record_version
+
+API_PREFIX = '/api/'
+LOCAL_HOSTS = ('127.0.0.1', 'localhost', '::1')
+WRITE_METHODS = ('POST', 'PATCH', 'DELETE')
+EXHIBITION_KINDS = ('solo', 'group')
+
+
+class ApiError(Exception):
+    def __init__(self, status, message, record=None):
+        super().__init__(message)
+        self.status = status
+        self.record = record
+
+
+def merge_patch(target, patch):
+    """Apply a JSON merge patch (RFC 7396) to target, returning a new value."""
+    if not isinstance(patch, dict):
+        return patch
+    result = dict(target) if isinstance(target, dict) else {}
+    for key, value in patch.items():
+        if value is None:
+            result.pop(key, None)
+        else:
+            result[key] = merge_patch(result.get(key), value)
+    return result
+
+
+def _version_from(if_match):
+    if not if_match:
+        return None
+    return if_match.strip().removeprefix('W/').strip('"')
+
+
+def check_request(method, headers):
+    """Refuse requests a page on another site could make through the browser (see the module docstring)."""
+    host = headers.get('Host') or ''
+    if urlsplit(f"//{host}").hostname not in LOCAL_HOSTS:
+        raise ApiError(403, f"the admin API only answers on {', '.join(LOCAL_HOSTS)}, not {host!r}")
+    if method not in WRITE_METHODS:
+        return
+    origin = headers.get('Origin')
+    if origin is not None and urlsplit(origin).netloc != host:
+        raise ApiError(403, f"cross-origin request from {origin} refused")
+    content_type = (headers.get('Content-Type') or '').split(';')[0].strip().lower()
+    if method != 'DELETE' and content_type != 'application/json':
+        raise ApiError(415, 'send the body as Content-Type: application/json')
+
+
+def check_record(model, record):
+    problems = model.problems(record)
+    if problems:
+        raise ApiError(422, '; '.join(problems))
+
+
+def _text(value):
+    return value.get('en', '') if isinstance(value, dict) else value
+
+
+class AdminAPI:
+    """Request handling independent of the HTTP server; one lock serialises all access to the store."""
+
+    def __init__(self, store=None):
+        self.store = store or WorksStore()
+        self.lock = threading.Lock()
+
+    def handle(self, method, path, if_match=None, body=b'', headers=None):
+        """Returns (status, headers, JSON body bytes); request headers are checked when given."""
+        try:
+            if headers is not None:
+                check_request(method, headers)
+            parts = [unquote(p) for p in path[len(API_PREFIX):].strip('/').split('/')]
+            if parts[0] not in ('works', 'exhibitions') or len(parts) > 2:
+                raise ApiError(404, 'unknown API path')
+            try:
+                payload = json.loads(body) if body else None
+            except ValueError as e:
+                raise ApiError(400, f"invalid JSON: {e}")
+            if method in ('PATCH', 'POST') and not isinstance(payload, dict):
+                raise ApiError(400, 'body must be a JSON object')
+            with self.lock:
+                if self.store.is_stale():
+                    self.store.reload()  # works.json was edited by hand or by a script
+                set_command(f"admin {method} {path}")
+                status, record = self.dispatch(method, parts[0], parts[1] if len(parts) > 1 else None,
+                                               _version_from(if_match), payload)
+        except ApiError as e:
+            body = {'error': str(e)}
+            if e.record is not None:
+                body['current'] = e.record
+            headers = {'ETag': f'"{record_version(e.record)}"'} if e.record is not None else {}
+            return e.status, headers, json.dumps(body, ensure_ascii=False).encode('utf-8')
+
+        headers = {}
+        if isinstance(record, dict):
+            headers['ETag'] = f'"{record_version(record)}"'
+        return status, headers, json.dumps(record, ensure_ascii=False).encode('utf-8')
+
+    def dispatch(self, method, collection, record_id, version, payload):
+        if collection == 'works':
+            if record_id is None and method == 'GET':
+                return 200, self.list_works()
+            if record_id is None and method == 'POST':
+                return 201, self.add_work(payload)
+            if record_id is not None and method == 'GET':
+                return 200, self.current_work(record_id)
+            if record_id is not None and method == 'PATCH':
+                return 200, self.patch_work(record_id, version, payload)
+        else:
+            if record_id is None and method == 'POST':
+                return 201, self.add_exhibition(payload)
+            if record_id is not None and method == 'GET':
+                return 200, self.current_exhibition(record_id)[1]
+            if record_id is not None and method == 'PATCH':
+                return 200, self.patch_exhibition(record_id, version, payload)
+            if record_id is not None and method == 'DELETE':
+                return 200, self.delete_exhibition(record_id, version)
+        raise ApiError(405, f"{method} is not supported here")
+
+    # -- works --------------------------------------------------------------
+
+    def list_works(self):
+        return [{'id': w.get('id'), 'title': _text(w.get('title')), 'year': w.get('year'),
+                 'version': record_version(w)} for w in self.store.works]
+
+    def current_work(self, work_id):
+        work = self.store.get(work_id)
+        if work is None:
+            raise ApiError(404, f"no work with id {work_id}")
+        return work
+
+    def check_version(self, record, version):
+        if version is None:
+            raise ApiError(428, 'send the version you edited in If-Match')
+        if version != record_version(record):
+            raise ApiError(412, 'the record was changed since you loaded it', record)
+
+    def patch_work(self, work_id, version, patch):
+        work = self.current_work(work_id)
+        self.check_version(work, version)
+        if patch.get('id', work_id) != work_id:
+            raise ApiError(400, "changing a work's id moves its images; use `mp rename`")
+        updated = merge_patch(work, patch)
+        check_record(Work, updated)
+        self.store.replace_work(work_id, updated)
+        self.saved(works=True, record=updated)
+        return self.current_work(work_id)
+
+    def add_work(self, work):
+        work_id = work.get('id')
+        if not isinstance(work_id, str) or not work_id.strip():
+            raise ApiError(400, 'a new work needs an id')
+        check_record(Work, work)
+        self.check_new_id(work_id)
+        self.store.add_work(work)
+        self.saved(works=True, record=work)
+        return self.current_work(work_id)
+
+    # -- exhibitions --------------------------------------------------------
+
+    def current_exhibition(self, exhibition_id):
+        found = self.store.exhibition_index().get(exhibition_id)
+        if found is None:
+            raise ApiError(404, f"no exhibition with id {exhibition_id}")
+        return found
+
+    def patch_exhibition(self, exhibition_id, version, patch):
+        kind, exhibition = self.current_exhibition(exhibition_id)
+        self.check_version(exhibition, version)
+        if patch.get('id', exhibition_id) != exhibition_id:
+            raise ApiError(400, "changing an exhibition's id would break the works that refer to it")
+        updated = merge_patch(exhibition, patch)
+        check_record(Exhibition, updated)
+        items = self.store.exhibitions_data[kind]
+        items[items.index(exhibition)] = updated
+        self.saved(exhibitions=True, record=updated)
+        return self.current_exhibition(exhibition_id)[1]
+
+    def add_exhibition(self, exhibition):
+        exhibition = dict(exhibition)
+        kind = exhibition.pop('type', None)
+        if kind not in EXHIBITION_KINDS:
+            raise ApiError(400, 'type must be solo or group')
+        exhibition_id = exhibition.get('id')
+        if not isinstance(exhibition_id, str) or not exhibition_id.strip():
+            raise ApiError(400, 'a new exhibition needs an id')
+        check_record(Exhibition, exhibition)
+        self.check_new_id(exhibition_id)
+        items = self.store.exhibitions_data.setdefault(kind, [])
+        # the lists are kept newest first
+        year = str(exhibition.get('year', ''))
+        position = next((i for i, ex in enumerate(items) if str(ex.get('year', '')) < year), len(items))
+        items.insert(position, exhibition)
+        self.saved(exhibitions=True, record=exhibition)
+        return exhibition
+
+    def delete_exhibition(self, exhibition_id, version):
+        kind, exhibition = self.current_exhibition(exhibition_id)
+        self.check_version(exhibition, version)
+        users = [w.get('id') for w in self.store.works if exhibition_id in (w.get('exhibitions') or [])]
+        if users:
+            raise ApiError(409, f"still listed on {len(users)} works: {', '.join(users[:10])}")
+        self.store.exhibitions_data[kind].remove(exhibition)
+        self.saved(exhibitions=True)
+        return {'deleted': exhibition_id}
+
+    # -- saving -------------------------------------------------------------
+
+    def check_new_id(self, item_id):
+        from slugs import IdRegistry
+        registry = IdRegistry.from_files(self.store.works_path, self.store.exhibitions_path)
+        if registry.is_taken(item_id):
+            raise ApiError(409, f"id {item_id} is already used (or differs only in case, accents or _/-)")
+
+    def saved(self, works=False, exhibitions=False, record=None):
+        """Snapshot and write the changed file, then bring what is derived from the records up to date."""
+        from build import FAILED, update_records
+        from snapshots import take
+        take(f"before {current_command()}", quiet=True)  # the files on disk still hold the previous save
+        self.store.changed(works=works, exhibitions=exhibitions)
+        self.store.save()
+        status = update_records(self.store)
+        failed = [name for name, state in status.items() if state in FAILED]
+        if failed:
+            raise ApiError(500, f"these build stages failed afterwards: {', '.join(failed)} "
+                                f"(see the server log; the site shows stale data until they pass)", record)
@@ -6,10 +6,13 @@ Analyze the A and B works to understand what we need to process next.
 import os
 import glob
 
+from settings import source_dir
+from years import first_year
+
 def analyze_ab_works():
     """Analyze the available A and B works and their contents."""
 
-    base_path = r"C:\Users\VeigaMagnusdottir\projects\magnusPalsson\images-not-used"
+    base_path = source_dir()
 
     # Get all A and B folders (and files that might be individual works)
     all_items = os.listdir(base_path)
@@ -35,18 +38,7 @@ def analyze_ab_works():
                 other_files.extend(glob.glob(os.path.join(item_path, ext)))
 
             # Extract potential year from folder name
-            year = "Unknown"
-            for word in item_name.split():
-                if word.isdigit() and len(word) == 4 and word.startswith(('19', '20')):
-                    year = word
-                    break
-                elif '-' in word and any(part.isdigit() and len(part) == 4 for part in word.split('-')):
-                    # Handle ranges like 1970-74
-                    parts = word.split('-')
-                    for part in parts:
-                        if part.isdigit() and len(part) == 4:
-                            year = part
-                            break
+            year = str(first_year(item_name) or "Unknown")
 
             work_info = {
                 'name': item_name,
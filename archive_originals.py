@@ -4,6 +4,8 @@ import os
 import shutil
 import sys
 
+from settings import archive_dir
+
 # Files to move to archive (these are the specific files we just processed)
 files_to_archive = [
     'images/draumur-hlynsins-um-fjall-1974/Hanging mountain.png',
@@ -17,7 +19,7 @@ files_to_archive = [
     'images/jorgen-bruun-hansen-2013/Jörgen BH pencil sketch MP.jpg'
 ]
 
-archive_base = '../images-not-used'
+archive_base = archive_dir()
 
 print("Moving original large files to archive...")
 
@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+"""
+Static pages and listing data for the press articles in articles/*.md.
+
+An article is Markdown with an optional front matter block:
+
+  ---
+  date: 2000-08-29
+  lang: is
+  mentions: thrigaldur-thursavaenn-2000, þrígaldur-þursavænn-2000
+  ---
+  # Title
+  ## Author
+
+  *Publication, date*
+
+Without front matter the title and author come from the first two headings,
+the publication from the italic line and the date from the file name
+(<publication>-YYYY-MM-DD-<slug>.md). `mentions` lists work and exhibition
+ids; they are looked up in the id registry, so a near-twin spelling (case,
+accents, _ or -) resolves to the real id. Titles of works and exhibitions from
+the few years before the article that appear in its text are linked as well,
+unless the title is shared by several records ("Exhibition").
+
+For each article this writes articles/pages/<name>.html, and for each
+language articles/pages/index-<lang>.json, newest first, with the linked
+works and exhibitions titled in that language. A "## English Translation"
+section gives the English excerpt. Pages are only re-rendered for changed
+articles (or all of them when works or exhibitions change, since link titles
+come from there), and files are only written when their content differs.
+
+Usage:
+  python article_pages.py           - Render every article and the listings
+"""
+
+import glob
+import html
+import json
+import os
+import re
+import sys
+
+from slugs import IdRegistry, fold, id_key
+from store import write_json_atomic
+from years import parse_year
+
+ARTICLES_DIR = 'articles'
+PAGES_DIR = os.path.join(ARTICLES_DIR, 'pages')
+LANGUAGES = ('en', 'is')
+MENTION_YEARS = 3          # link titles of works and exhibitions this many years before the article
+MIN_EXCERPT_LENGTH = 100
+EXCERPT_LENGTH = 300
+
+FILE_NAME = re.compile(r'^(?P<publication>[a-z]+)-(?P<date>\d{4}-\d{2}-\d{2})-(?P<slug>.+)$')
+FRONT_MATTER = re.compile(r'\A---\n(.*?)\n---\n', re.DOTALL)
+WORD = re.compile(r'[0-9a-zÀ-ɏ]+')
+ENGLISH_HEADING = re.compile(r'^#{2,3}\s+English translation\s*$', re.IGNORECASE | re.MULTILINE)
+MONTHS = {
+    'en': ['January', 'February', 'March', 'April', 'May', 'June', 'July', 'August', 'September',
+           'October', 'November', 'December'],
+    'is': ['janúar', 'febrúar', 'mars', 'apríl', 'maí', 'júní', 'júlí', 'ágúst', 'september',
+           'október', 'nóvember', 'desember'],
+}
+LABELS = {
+    'en': {'works': 'Works', 'exhibitions': 'Exhibitions'},
+    'is': {'works': 'Verk', 'exhibitions': 'Sýningar'},
+}
+EXHIBITION_PAGES = {'solo-exhibition': 'exhibitions-solo.html', 'group-exhibition': 'exhibitions-group.html'}
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<!-- Generated by article_pages.py from {source}; edit the Markdown, not this file. -->
+<html lang="{lang}">
+<head>
+  <meta charset="UTF-8">
+  <meta name="viewport" content="width=device-width, initial-scale=1">
+  <meta name="robots" content="noindex, nofollow">
+  <base href="../../">
+  <link rel="icon" type="image/svg+xml" href="favicon.svg">
+  <title>{title} – Magnús Pálsson</title>
+  <link rel="stylesheet" href="https://cdn.jsdelivr.net/npm/@picocss/pico@1/css/pico.min.css">
+  <link rel="stylesheet" href="style.css">
+</head>
+<body>
+  <div class="wip-banner">WORK IN PROGRESS – This website is under construction and is not yet available to the public</div>
+
+  <!-- Navigation placeholder -->
+  <div id="nav-placeholder"></div>
+
+  <main class="container">
+    <article class="press-article">
+{body}
+{links}    </article>
+  </main>
+
+  <!-- Footer -->
+  <div id="footer-placeholder"></div>
+
+  <script src="i18n.js"></script>
+  <script src="nav.js"></script>
+  <script src="footer.js"></script>
+</body>
+</html>
+"""
+
+
+# ---------------------------------------------------------------------------
+# Markdown
+
+def _inline(text):
+    text = html.escape(text, quote=False)
+    text = re.sub(r'\[([^\]]+)\]\(([^)\s]+)\)',
+                  lambda m: f'<a href="{html.escape(m.group(2))}">{m.group(1)}</a>', text)
+    text = re.sub(r'\*\*(.+?)\*\*', r'<strong>\1</strong>', text)
+    return re.sub(r'\*(.+?)\*', r'<em>\1</em>', text)
+
+
+def render_markdown(text):
+    """HTML for the Markdown the articles use: headings, paragraphs (lines kept), rules, lists, emphasis, links."""
+    out, paragraph, items = [], [], []
+
+    def flush():
+        if paragraph:
+            out.append(f"<p>{'<br>'.join(_inline(line) for line in paragraph)}</p>")
+            paragraph.clear()
+        if items:
+            out.append('<ul>' + ''.join(f'<li>{_inline(item)}</li>' for item in items) + '</ul>')
+            items.clear()
+
+    for line in text.splitlines():
+        line = line.strip()
+        heading = re.match(r'^(#{1,6})\s+(.*)$', line)
+        if not line:
+            flush()
+        elif heading:
+            flush()
+            level = len(heading.group(1))
+            out.append(f'<h{level}>{_inline(heading.group(2))}</h{level}>')
+        elif re.match(r'^(-{3,}|\*{3,})$', line):
+            flush()
+            out.append('<hr>')
+        elif line.startswith(('- ', '* ')):
+            if paragraph:
+                flush()
+            items.append(line[2:])
+        else:
+            if items:
+                flush()
+            paragraph.append(line)
+    flush()
+    return '\n'.join(out)
+
+
+def plain_text(markdown):
+    """Markdown without markup, one paragraph per line."""
+    text = re.sub(r'\[([^\]]+)\]\([^)]*\)', r'\1', markdown)
+    text = re.sub(r'^#{1,6}\s+|^[-*]\s+|^(-{3,}|\*{3,})$', '', text, flags=re.MULTILINE)
+    text = text.replace('**', '').replace('*', '')
+    return '\n'.join(' '.join(block.split()) for block in re.split(r'\n\s*\n', text) if block.strip())
+
+
+# ---------------------------------------------------------------------------
+# Articles
+
+def parse_front_matter(text):
+    """({key: value}, body) - values are strings, `mentions` a list."""
+    match = FRONT_MATTER.match(text)
+    if not match:
+        return {}, text
+    meta = {}
+    for line in match.group(1).splitlines():
+        key, sep, value = line.partition(':')
+        if sep and key.strip():
+            meta[key.strip()] = value.strip()
+    if 'mentions' in meta:
+        meta['mentions'] = [m.strip() for m in meta['mentions'].split(',') if m.strip()]
+    return meta, text[match.end():]
+
+
+def _excerpt(markdown):
+    """The first prose paragraph, skipping headings, bylines, bold credit blocks and lists."""
+    for block in re.split(r'\n\s*\n', markdown):
+        block = block.strip()
+        if block.startswith(('#', '*', '-', '>', '[')):
+            continue
+        paragraph = plain_text(block)
+        if len(paragraph) >= MIN_EXCERPT_LENGTH:
+            return paragraph if len(paragraph) <= EXCERPT_LENGTH else paragraph[:EXCERPT_LENGTH - 3] + '...'
+    return ''
+
+
+def parse_article(path):
+    """Article dict from one Markdown file."""
+    with open(path, 'r', encoding='utf-8') as f:
+        meta, body = parse_front_matter(f.read())
+    name = os.path.splitext(os.path.basename(path))[0]
+    from_name = FILE_NAME.match(name)
+    headings = re.findall(r'^(#{1,2})\s+(.+)$', body, re.MULTILINE)
+    byline = re.search(r'^\*([^*]+?),\s*([^*]+)\*\s*$', body, re.MULTILINE)
+
+    date = meta.get('date') or (from_name.group('date') if from_name else '')
+    english = ENGLISH_HEADING.search(body)
+    original = body[:english.start()] if english else body
+    return {
+        'name': name,
+        'source': path.replace(os.sep, '/'),
+        'title': meta.get('title') or next((text for marks, text in headings if marks == '#'), name),
+        'author': meta.get('author') or next((text for marks, text in headings if marks == '##'), ''),
+        'publication': meta.get('publication') or (byline.group(1) if byline else ''),
+        'date': date,
+        'year': int(date[:4]) if date[:4].isdigit() else None,
+        'lang': meta.get('lang', 'is'),
+        'mentions': meta.get('mentions', []),
+        'body': body,
+        'excerpt': {'is': _excerpt(original), 'en': _excerpt(body[english.end():]) if english else ''},
+    }
+
+
+def load_articles():
+    return [parse_article(path) for path in sorted(glob.glob(os.path.join(ARTICLES_DIR, '*.md')))]
+
+
+def article_url(article):
+    return f"{ARTICLES_DIR}/pages/{article['name']}.html"
+
+
+def format_date(date, lang):
+    """'2000-08-29' -> '29 August 2000' / '29. ágúst 2000'."""
+    parts = date.split('-')
+    if len(parts) != 3 or not all(p.isdigit() for p in parts) or not 1 <= int(parts[1]) <= 12:
+        return date
+    day, month = int(parts[2]), MONTHS[lang][int(parts[1]) - 1]
+    return f"{day}. {month} {parts[0]}" if lang == 'is' else f"{day} {month} {parts[0]}"
+
+
+# ---------------------------------------------------------------------------
+# Links to works and exhibitions
+
+class LinkIndex:
+    """Titles and kinds of works and exhibitions for resolving an article's mentions."""
+
+    def __init__(self, works, exhibitions_data, registry):
+        self.registry = registry
+        self.records = {}  # id -> (kind, {lang: title}, year)
+        for work in works:
+            self.records.setdefault(work.id, ('work', {'en': work.title.en or work.title.is_,
+                                                       'is': work.title.is_ or work.title.en}, work.year))
+        for kind in ('solo', 'group'):
+            for exhibition in exhibitions_data.get(kind, []):
+                title = exhibition.title
+                self.records.setdefault(exhibition.id, (f'{kind}-exhibition', {'en': title.en or title.is_,
+                                                                               'is': title.is_ or title.en},
+                                                        exhibition.year))
+        # a title names a record if no other work (or no other exhibition) has it
+        by_title = {}
+        for record_id, (kind, titles, _) in self.records.items():
+            for key in {self.words(title) for title in titles.values()}:
+                if len(key.replace(' ', '')) >= 4:
+                    by_title.setdefault((kind == 'work', key), []).append(record_id)
+        self.by_title = {key: ids for key, ids in by_title.items() if len(ids) == 1}
+
+    @staticmethod
+    def words(text):
+        return ' '.join(WORD.findall(fold(text or '')))
+
+    def resolve(self, mention):
+        """The registered id for a mentioned id, or None."""
+        if mention in self.registry.ids:
+            return mention
+        twins = self.registry.keys.get(id_key(mention), [])
+        return twins[0] if len(twins) == 1 else None
+
+    def links(self, article):
+        """Ids linked from an article: its resolved mentions, then titles found in its text."""
+        found = []
+        for mention in article['mentions']:
+            record_id = self.resolve(mention)
+            if record_id is None:
+                print(f"  {article['source']}: no work or exhibition with id {mention}")
+            elif record_id not in found:
+                found.append(record_id)
+        text = f" {self.words(article['body'])} "
+        for (_, key), (record_id,) in self.by_title.items():
+            span = parse_year(self.records[record_id][2])
+            recent = article['year'] is None or span.overlaps(article['year'] - MENTION_YEARS, article['year'])
+            if recent and record_id not in found and f" {key} " in text:
+                found.append(record_id)
+        return [record_id for record_id in found if record_id in self.records]
+
+    def link(self, record_id, lang):
+        kind, titles, year = self.records[record_id]
+        url = f"works.html?work={record_id}" if kind == 'work' else EXHIBITION_PAGES[kind]
+        return {'id': record_id, 'kind': kind, 'title': titles[lang], 'year': year, 'url': url}
+
+
+# ---------------------------------------------------------------------------
+# Output
+
+def _page_lang(article):
+    return article['lang'] if article['lang'] in LANGUAGES else 'is'
+
+
+def render_page(article, links):
+    """The static page of an article; links are the linked records in the article's language."""
+    lang = _page_lang(article)
+    sections = ''
+    for group in ('works', 'exhibitions'):
+        items = [link for link in links if (link['kind'] == 'work') == (group == 'works')]
+        if items:
+            rows = ''
+            for link in items:
+                year = f" ({link['year']})" if link['year'] else ''
+                rows += f'<li><a href="{html.escape(link["url"])}">{html.escape(link["title"])}</a>{year}</li>'
+            sections += (f'      <section class="article-links">\n        <h3>{LABELS[lang][group]}</h3>\n'
+                         f'        <ul>{rows}</ul>\n      </section>\n')
+    body = '\n'.join(f'      {line}' for line in render_markdown(article['body']).splitlines())
+    return PAGE_TEMPLATE.format(source=article['source'], lang=lang, title=html.escape(article['title']),
+                                body=body, links=sections)
+
+
+def listing(articles, links, lang):
+    """Listing data for one language, newest first."""
+    entries = []
+    for article in sorted(articles, key=lambda a: a['date'], reverse=True):
+        entries.append({
+            'name': article['name'],
+            'url': article_url(article),
+            'title': article['title'],
+            'author': article['author'],
+            'publication': article['publication'],
+            'date': article['date'],
+            'dateText': format_date(article['date'], lang),
+            'year': article['year'],
+            'lang': article['lang'],
+            'excerpt': article['excerpt'][lang] or article['excerpt']['is'],
+            'links': links[article['name']][lang],
+        })
+    return {'articles': entries}
+
+
+def _write_text(path, text):
+    """Write path if its content differs; returns whether it was written."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            if f.read() == text:
+                return False
+    except FileNotFoundError:
+        pass
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+    return True
+
+
+def build_articles(changed=None, works=None, exhibitions_data=None, registry=None):
+    """Render the pages of changed article paths (all when None) and both listings; returns written paths."""
+    from models import load_exhibitions, load_works
+    works = load_works() if works is None else works
+    exhibitions_data = load_exhibitions() if exhibitions_data is None else exhibitions_data
+    index = LinkIndex(works, exhibitions_data, registry or IdRegistry.from_files())
+    articles = load_articles()
+    os.makedirs(PAGES_DIR, exist_ok=True)
+
+    written = []
+    links = {}
+    for article in articles:
+        ids = index.links(article)
+        links[article['name']] = {lang: [index.link(record_id, lang) for record_id in ids] for lang in LANGUAGES}
+        if changed is not None and article['source'] not in changed:
+            continue
+        path = os.path.join(PAGES_DIR, f"{article['name']}.html")
+        if _write_text(path, render_page(article, links[article['name']][_page_lang(article)])):
+            written.append(path)
+
+    for lang in LANGUAGES:
+        path = os.path.join(PAGES_DIR, f'index-{lang}.json')
+        data = listing(articles, links, lang)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                current = json.load(f)
+        except (FileNotFoundError, ValueError):
+            current = None
+        if current != data:
+            write_json_atomic(path, data)
+            written.append(path)
+
+    expected = {f"{article['name']}.html" for article in articles}
+    for stale in glob.glob(os.path.join(PAGES_DIR, '*.html')):
+        if os.path.basename(stale) not in expected:
+            os.remove(stale)  # the Markdown was removed or renamed
+            written.append(stale)
+    return written
+
+
+def article_search_entries():
+    """Search index entries for every article (see rebuild_search_index.extract_documents)."""
+    entries = []
+    for article in load_articles():
+        excerpt_is = article['excerpt']['is']
+        entries.append({
+            "type": "review",
+            "title": {"en": article['title'], "is": article['title']},
+            "snippet": {"en": article['excerpt']['en'] or excerpt_is, "is": excerpt_is},
+            "content": ' '.join(filter(None, [article['title'], article['author'], article['publication'],
+                                              format_date(article['date'], 'is'), plain_text(article['body'])])),
+            "url": article_url(article),
+            "year": article['year'],
+            "page": "articles",
+        })
+    return entries
+
+
+def main():
+    written = build_articles()
+    for path in written:
+        print(f"  {path}")
+    print(f"{len(load_articles())} articles, {len(written)} files written to {PAGES_DIR}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
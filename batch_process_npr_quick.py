@@ -4,51 +4,18 @@ Batch process N, P, R quick win works (1-5 images) from images-not-used folder.
 """
 
 import os
-import json
 import glob
 import subprocess
 import shutil
 import re
 from pathlib import Path
+import sys
 
-def clean_work_id(work_name):
-    """Convert work name to clean ID format."""
-    # Extract year
-    year = "unknown"
-    for word in work_name.split():
-        if word.isdigit() and len(word) == 4 and word.startswith(('19', '20')):
-            year = word
-            break
-        elif '-' in word and any(part.isdigit() and len(part) == 4 for part in word.split('-')):
-            parts = word.split('-')
-            for part in parts:
-                if part.isdigit() and len(part) == 4:
-                    year = part
-                    break
-
-    # Clean the name
-    clean_name = work_name.lower()
-    clean_name = re.sub(r'[áàäâ]', 'a', clean_name)
-    clean_name = re.sub(r'[éèëê]', 'e', clean_name)
-    clean_name = re.sub(r'[íìïî]', 'i', clean_name)
-    clean_name = re.sub(r'[óòöô]', 'o', clean_name)
-    clean_name = re.sub(r'[úùüû]', 'u', clean_name)
-    clean_name = re.sub(r'[ýÿ]', 'y', clean_name)
-    clean_name = re.sub(r'[þ]', 'th', clean_name)
-    clean_name = re.sub(r'[ð]', 'd', clean_name)
-    clean_name = re.sub(r'[æ]', 'ae', clean_name)
-    clean_name = re.sub(r'[ø]', 'o', clean_name)
-
-    # Remove special characters and replace with hyphens
-    clean_name = re.sub(r'[^a-z0-9\s]', '', clean_name)
-    clean_name = re.sub(r'\s+', '-', clean_name)
-    clean_name = clean_name.strip('-')
-
-    # Add year if we found one
-    if year != "unknown":
-        return f"{clean_name}-{year}"
-    else:
-        return clean_name
+from settings import source_dir
+from slugs import ingest_work_id
+from store import WorksStore
+from validate_references import validate_after_ingest
+from years import first_year
 
 def process_single_work(work_name, source_path, max_images=5):
     """Process a single work: images + JSON entry."""
@@ -56,7 +23,10 @@ def process_single_work(work_name, source_path, max_images=5):
     print(f"\n=== Processing: {work_name} ===")
 
     # Generate work ID
-    work_id = clean_work_id(work_name)
+    work_id = ingest_work_id(work_name)
+    if work_id is None:
+        print(f"{work_name} is already in works.json; skipped")
+        return None
     print(f"Work ID: {work_id}")
 
     # Get image files
@@ -136,17 +106,7 @@ def process_single_work(work_name, source_path, max_images=5):
         return None
 
     # Extract year for JSON
-    year = "Unknown"
-    for word in work_name.split():
-        if word.isdigit() and len(word) == 4 and word.startswith(('19', '20')):
-            year = int(word)
-            break
-        elif '-' in word:
-            parts = word.split('-')
-            for part in parts:
-                if part.isdigit() and len(part) == 4:
-                    year = int(part)
-                    break
+    year = first_year(work_name) or "Unknown"
 
     # Determine materials based on work content
     materials = []
@@ -178,7 +138,7 @@ def process_single_work(work_name, source_path, max_images=5):
 def batch_process_npr_quick_wins():
     """Process N, P, R works with 1-5 images."""
 
-    base_path = r"C:\Users\VeigaMagnusdottir\projects\magnusPalsson\images-not-used"
+    base_path = source_dir()
 
     # Get all N, P, R folders
     all_items = os.listdir(base_path)
@@ -199,8 +159,8 @@ def batch_process_npr_quick_wins():
     print(f"Found {len(quick_wins)} N, P, R quick win works to process")
 
     # Read current works.json
-    with open('works.json', 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    store = WorksStore()
+    data = store.data
 
     processed_count = 0
     new_entries = []
@@ -214,9 +174,9 @@ def batch_process_npr_quick_wins():
     # Add new entries to JSON (at the beginning for chronological order)
     data['works'] = new_entries + data['works']
 
-    # Write updated JSON
-    with open('works.json', 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    # Write updated JSON through the store (atomic, and journalled per work)
+    store.changed()
+    store.save()
 
     print(f"\n=== BATCH PROCESSING COMPLETE ===")
     print(f"Successfully processed: {processed_count} N, P, R quick win works")
@@ -226,4 +186,5 @@ def batch_process_npr_quick_wins():
     return processed_count
 
 if __name__ == "__main__":
-    count = batch_process_npr_quick_wins()
\ No newline at end of file
+    count = batch_process_npr_quick_wins()
+    sys.exit(validate_after_ingest())
\ No newline at end of file
@@ -0,0 +1,589 @@
+#!/usr/bin/env python3
+"""
+Declarative build graph for everything derived from works.json and images/.
+
+Each stage declares the sources it reads and writes. Sources are
+fingerprinted per record - works by id, image folders by name, other files by
+size and mtime - and a stage only runs when one of its input fingerprints
+changed since its last successful run. It is told which keys changed, so a
+one-work edit re-processes that work only. A stage depends on every earlier
+stage that writes something it reads (or reads something it writes);
+independent stages run in parallel. Fingerprints are kept in .build.cache.
+
+Stages, replacing the manual post-ingest sequence:
+  derivatives     images -> images                 medium/ and thumbs/ renditions
+  ensure-fields   works -> works                   was fix_missing_exhibitions.py
+  exhibition-ids  works, exhibitions -> works      was convert_works_to_exhibition_ids.py
+  medium-urls     works, images -> works           was perform_json_updates.py
+  year-fields     works, exhibitions -> works, exhibitions   yearStart/yearEnd/yearDisplay (years.py)
+  search-index    works, exhibitions, translations, document-files, articles -> search-index
+                                                   also search-vocabulary.json, search-passages.json
+  articles        articles, works, exhibitions -> article-pages   press article pages (article_pages.py)
+  facet-index     works -> facet-index             works page filter bitsets (facet_index.py)
+  ui-strings      translations, html, scripts -> ui-strings   per-page i18n bundles (ui_strings.py)
+  validate        everything -> report             read-only replacement for fix_broken_references.py
+
+Usage:
+  python build.py                   - Build whatever is out of date
+  python build.py search-index      - Build one stage and the stages it depends on
+  python build.py --graph           - Show stages, inputs, outputs, dependencies and what is out of date
+  python build.py --dot             - Print the graph in Graphviz dot format
+  python build.py --force           - Ignore the fingerprint cache
+  python build.py -j 4              - Limit the number of parallel workers
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+
+from site_index import IMAGES_DIR, normalize_path, work_folder
+from store import WorksStore
+
+CACHE_FILE = '.build.cache'
+FAILED = ('failed', 'still-failing', 'blocked')
+
+STAGES = []
+SOURCES = {}
+
+
+@dataclass
+class Stage:
+    name: str
+    inputs: tuple
+    outputs: tuple
+    run: object
+    version: int = 1
+    description: str = ''
+
+
+def stage(name, inputs, outputs=(), version=1):
+    """Register a build stage; bump version when its logic changes to force a rerun."""
+    def register(func):
+        description = (func.__doc__ or '').strip().splitlines()[0] if func.__doc__ else ''
+        STAGES.append(Stage(name, tuple(inputs), tuple(outputs), func, version, description))
+        return func
+    return register
+
+
+def source(name):
+    """Register a fingerprint function returning {key: digest} for one source."""
+    def register(func):
+        SOURCES[name] = func
+        return func
+    return register
+
+
+# ---------------------------------------------------------------------------
+# Sources
+
+def _digest(text):
+    return hashlib.sha1(text.encode('utf-8', 'surrogateescape')).hexdigest()
+
+
+def _file_stamps(paths):
+    stamps = {}
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        stamps[path] = f"{stat.st_size}:{stat.st_mtime_ns}"
+    return stamps
+
+
+@source('works')
+def works_fingerprint(build):
+    """One digest per work record; repeated ids get a '#' suffix per repeat."""
+    prints = {}
+    for work in build.store.works:
+        key = str(work.get('id') or '?')
+        while key in prints:
+            key += '#'
+        prints[key] = _digest(json.dumps(work, sort_keys=True, ensure_ascii=False))
+    return prints
+
+
+@source('exhibitions')
+def exhibitions_fingerprint(build):
+    return _file_stamps([build.store.exhibitions_path])
+
+
+@source('translations')
+def translations_fingerprint(build):
+    return _file_stamps(sorted(glob.glob('translations/*.json')))
+
+
+@source('html')
+def html_fingerprint(build):
+    return _file_stamps(sorted(glob.glob('*.html')))
+
+
+@source('scripts')
+def scripts_fingerprint(build):
+    return _file_stamps(sorted(glob.glob('*.js')))
+
+
+@source('ui-strings')
+def ui_strings_fingerprint(build):
+    return _file_stamps(sorted(glob.glob('translations/pages/*.json')))
+
+
+@source('document-files')
+def document_files_fingerprint(build):
+    """PDF, Word and text documents under images/, whose text goes into the search index."""
+    from document_text import document_files, pdf_reader
+    stamps = _file_stamps(document_files())
+    # PDFs are skipped without pypdf, so installing (or upgrading) it changes them
+    reader = pdf_reader()
+    return {path: f"{stamp}:{reader}" if path.lower().endswith('.pdf') else stamp
+            for path, stamp in stamps.items()}
+
+
+@source('articles')
+def articles_fingerprint(build):
+    return _file_stamps(sorted(glob.glob('articles/*.md')))
+
+
+@source('article-pages')
+def article_pages_fingerprint(build):
+    return _file_stamps(sorted(glob.glob('articles/pages/*')))
+
+
+@source('facet-index')
+def facet_index_fingerprint(build):
+    return _file_stamps(['facet-index.json'])
+
+
+@source('search-index')
+def search_index_fingerprint(build):
+    return _file_stamps(['search-index.json'])
+
+
+@source('images')
+def images_fingerprint(build):
+    """One digest per image folder over every file's path, size and mtime."""
+    entries = {}
+
+    def walk(directory, folder):
+        with os.scandir(directory) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    walk(entry.path, folder if folder is not None else normalize_path(entry.name))
+                elif entry.is_file():
+                    stat = entry.stat()
+                    path = normalize_path(entry.path.replace(os.sep, '/'))
+                    entries.setdefault(folder or '', []).append(f"{path}\0{stat.st_size}\0{stat.st_mtime_ns}")
+
+    if os.path.isdir(IMAGES_DIR):
+        walk(IMAGES_DIR, None)
+    return {folder: _digest('\n'.join(sorted(lines))) for folder, lines in entries.items()}
+
+
+# ---------------------------------------------------------------------------
+# Stages
+
+class Changes:
+    """Keys whose fingerprint changed, per input source. `full` means there is no usable previous run."""
+
+    def __init__(self, full, keys):
+        self.full = full
+        self.keys = keys
+
+    def __getitem__(self, source_name):
+        return self.keys.get(source_name, set())
+
+    def __bool__(self):
+        return self.full or any(self.keys.values())
+
+    def work_ids(self):
+        return {key.rstrip('#') for key in self['works']}
+
+    def summary(self):
+        if self.full:
+            return 'full build'
+        return ', '.join(f"{name}: {len(keys)}" for name, keys in self.keys.items() if keys)
+
+
+def changed_works(build, changes, folders=()):
+    """Work dicts to process: all on a full run, otherwise changed ids plus works using the given folders."""
+    works = build.store.works
+    if changes.full:
+        return works
+    ids = changes.work_ids()
+    folders = set(folders)
+    return [w for w in works if w.get('id') in ids or
+            (folders and any(work_folder(normalize_path(img.get('url', ''))) in folders
+                             for img in w.get('images', [])))]
+
+
+@stage('derivatives', inputs=['images', 'works'], outputs=['images'], version=2)
+def derive_images(build, changes):
+    """Create the missing or stale medium/ and thumbs/ renditions the site references"""
+    from derivatives import derive_folders
+    folders = set(changes['images'])
+    if changes['works'] and not changes.full:
+        # a work may now point at images that had no renditions because nothing used them
+        folders |= {work_folder(normalize_path(img.get('url', '')))
+                    for work in changed_works(build, changes) for img in work.get('images', [])}
+    folders = sorted(folders - {''})
+    written = derive_folders(folders, workers=build.workers)
+    print(f"  {len(written)} derivatives written ({len(folders)} folders checked)")
+
+
+@stage('ensure-fields', inputs=['works'], outputs=['works'])
+def ensure_fields(build, changes):
+    """Give every work exhibitions and materials fields"""
+    fixed = 0
+    for work in changed_works(build, changes):
+        if 'exhibitions' not in work:
+            work['exhibitions'] = []
+            fixed += 1
+        if 'materials' not in work:
+            work['materials'] = {'en': [], 'is': []}
+            fixed += 1
+    if fixed:
+        build.store.changed()
+    print(f"  {fixed} missing fields added")
+
+
+@stage('exhibition-ids', inputs=['works', 'exhibitions'], outputs=['works'])
+def exhibition_ids(build, changes):
+    """Replace inline exhibitions with exhibitions.json ids"""
+    from convert_works_to_exhibition_ids import convert_work_exhibitions
+    exhibitions = build.store.exhibitions_data
+    if not exhibitions:
+        return
+    if changes['exhibitions']:
+        changes = Changes(True, changes.keys)
+    matched = 0
+    for work in changed_works(build, changes):
+        count, _ = convert_work_exhibitions(work, exhibitions)
+        matched += count
+    if matched:
+        build.store.changed()
+    print(f"  {matched} exhibitions converted to ids")
+
+
+@stage('medium-urls', inputs=['works', 'images'], outputs=['works'])
+def medium_urls(build, changes):
+    """Point image urls at their medium/ rendition where one exists"""
+    from perform_json_updates import MEDIUM_FOLDER_RULES
+    from rewrite_urls import RewriteRules
+    rules = RewriteRules(rules=MEDIUM_FOLDER_RULES)
+    updated = 0
+    for work in changed_works(build, changes, folders=changes['images']):
+        for image in work.get('images', []):
+            new = rules.rewrite(image.get('url', ''))
+            if new:
+                image['url'] = new
+                updated += 1
+    if updated:
+        build.store.changed()
+    print(f"  {updated} image urls updated")
+
+
+@stage('year-fields', inputs=['works', 'exhibitions'], outputs=['works', 'exhibitions'], version=2)
+def year_fields(build, changes):
+    """Store each work's and exhibition's parsed year range"""
+    from years import set_year_fields
+    works = sum(set_year_fields(work) for work in changed_works(build, changes))
+    exhibitions = 0
+    if changes.full or changes['exhibitions']:
+        exhibitions = sum(set_year_fields(exhibition) for kind in ('solo', 'group')
+                          for exhibition in build.store.exhibitions_data.get(kind, []) if isinstance(exhibition, dict))
+    if works or exhibitions:
+        build.store.changed(works=bool(works), exhibitions=bool(exhibitions))
+    print(f"  year fields updated on {works} works and {exhibitions} exhibitions")
+
+
+@stage('search-index', inputs=['works', 'exhibitions', 'translations', 'document-files', 'articles'],
+       outputs=['search-index'], version=4)
+def search_index(build, changes):
+    """Rebuild search-index.json entries for changed works and page documents"""
+    import rebuild_search_index
+    from document_text import work_folders
+    store = build.store
+    if changes.full or changes['exhibitions'] or not os.path.exists('search-index.json'):
+        rebuild_search_index.rebuild_search_index(store.records(), store.exhibition_records())
+    else:
+        ids = changes.work_ids()
+        present = {work.id for work in store.records()}
+        folders = {work_folder(path) for path in changes['document-files']}
+        if folders:
+            ids |= {work.id for work in store.records() if work_folders(work) & folders}
+        documents = rebuild_search_index.translation_documents(changes['translations'])
+        if changes['articles']:
+            documents.append('articles')
+        if ids or documents:
+            rebuild_search_index.update_work_entries(ids & present, removed_ids=ids - present,
+                                                     works=store.records(), documents=documents)
+
+
+@stage('articles', inputs=['articles', 'works', 'exhibitions'], outputs=['article-pages'])
+def articles(build, changes):
+    """Render articles/*.md to static pages and per-language listings"""
+    from article_pages import build_articles
+    from slugs import IdRegistry
+    # link titles come from works and exhibitions, so a change there re-renders every article
+    changed = None if changes.full or changes['works'] or changes['exhibitions'] else changes['articles']
+    written = build_articles(changed, works=build.store.records(), exhibitions_data=build.store.exhibition_records(),
+                             registry=IdRegistry.from_files(build.store.works_path, build.store.exhibitions_path))
+    print(f"  {len(written)} article files written")
+
+
+@stage('facet-index', inputs=['works'], outputs=['facet-index'])
+def facet_index(build, changes):
+    """Write facet-index.json for the works page filters"""
+    from facet_index import write_facet_index
+    index = write_facet_index(build.store.records())
+    print(f"  {sum(len(facet['values']) for facet in index['facets'].values())} facet values")
+
+
+@stage('ui-strings', inputs=['translations', 'html', 'scripts'], outputs=['ui-strings'])
+def ui_strings(build, changes):
+    """Write the per-page UI string bundles loaded by i18n.js"""
+    from ui_strings import build_bundles
+    build_bundles()
+
+
+@stage('validate', inputs=['works', 'exhibitions', 'translations', 'images', 'html', 'search-index'])
+def validate(build, changes):
+    """Check every asset and id reference"""
+    from validate_references import validate_after_ingest
+    return validate_after_ingest(build.store.data, build.store.exhibitions_data) == 0
+
+
+# ---------------------------------------------------------------------------
+# Graph and runner
+
+def dependencies(stages):
+    """Stage name -> earlier stages it must wait for (write/read, read/write or write/write overlap)."""
+    deps = {}
+    for i, current in enumerate(stages):
+        reads, writes = set(current.inputs), set(current.outputs)
+        deps[current.name] = [earlier.name for earlier in stages[:i]
+                              if set(earlier.outputs) & (reads | writes) or set(earlier.inputs) & writes]
+    return deps
+
+
+def select(targets, stages=None, upstream=True):
+    """The target stages plus (with upstream) everything they depend on, in declaration order."""
+    stages = stages or STAGES
+    if not targets:
+        return list(stages)
+    by_name = {s.name: s for s in stages}
+    unknown = [t for t in targets if t not in by_name]
+    if unknown:
+        raise ValueError(f"Unknown stage: {', '.join(unknown)} (stages: {', '.join(by_name)})")
+    if not upstream:
+        return [s for s in stages if s.name in targets]
+    deps = dependencies(stages)
+    wanted = set()
+    todo = list(targets)
+    while todo:
+        name = todo.pop()
+        if name not in wanted:
+            wanted.add(name)
+            todo.extend(deps[name])
+    return [s for s in stages if s.name in wanted]
+
+
+def record_stages(stages=None):
+    """Stages that write something derived from works.json or exhibitions.json, other than images."""
+    return [s.name for s in stages or STAGES
+            if {'works', 'exhibitions'} & set(s.inputs) and s.outputs and 'images' not in s.outputs]
+
+
+def diff_keys(old, new):
+    return {key for key in old.keys() | new.keys() if old.get(key) != new.get(key)}
+
+
+class Build:
+    def __init__(self, store=None, force=False, workers=None, cache_file=CACHE_FILE):
+        self.store = store or WorksStore()
+        self.force = force
+        self.workers = workers
+        self.cache_file = cache_file
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                self.cache = json.load(f)
+        except (FileNotFoundError, ValueError):
+            self.cache = {}
+        self._prints = {}
+        self._lock = threading.Lock()
+
+    def fingerprint(self, source_name):
+        with self._lock:
+            if source_name not in self._prints:
+                self._prints[source_name] = SOURCES[source_name](self)
+            return self._prints[source_name]
+
+    def invalidate(self, source_names):
+        with self._lock:
+            for name in source_names:
+                self._prints.pop(name, None)
+
+    def changes(self, current_stage):
+        """(Changes, current input fingerprints) for a stage."""
+        current = {name: self.fingerprint(name) for name in current_stage.inputs}
+        record = self.cache.get(current_stage.name)
+        if self.force or not record or record.get('version') != current_stage.version:
+            return Changes(True, {name: set(prints) for name, prints in current.items()}), current
+        previous = record.get('inputs', {})
+        return Changes(False, {name: diff_keys(previous.get(name, {}), prints)
+                               for name, prints in current.items()}), current
+
+    def execute(self, current_stage):
+        """Run one stage if it is out of date; returns 'ran', 'skipped', 'failed' or 'still-failing'."""
+        changes, current = self.changes(current_stage)
+        if not changes:
+            if self.cache[current_stage.name].get('failed'):
+                return 'still-failing'
+            return 'skipped'
+        print(f"[{current_stage.name}] {changes.summary()}")
+        start = time.perf_counter()
+        ok = current_stage.run(self, changes) is not False
+        if {'works', 'exhibitions'} & set(current_stage.outputs):
+            self.store.save()
+        self.invalidate(current_stage.outputs)
+        print(f"[{current_stage.name}] {'done' if ok else 'FAILED'} in {(time.perf_counter() - start) * 1000:.0f} ms")
+        if not ok and current_stage.outputs:
+            return 'failed'
+        # A failed check (a stage without outputs) is remembered with its inputs,
+        # so it is reported again but not re-run until something changes.
+        self.cache[current_stage.name] = {
+            'version': current_stage.version,
+            'inputs': {name: prints for name, prints in current.items() if name not in current_stage.outputs},
+            'failed': not ok,
+        }
+        return 'ran' if ok else 'failed'
+
+    def run(self, targets=None, upstream=True):
+        """Run the selected stages in dependency order, in parallel where possible; returns {stage: status}."""
+        stages = select(targets, upstream=upstream)
+        deps = dependencies(stages)
+        pending = {s.name: s for s in stages}
+        status = {}
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            running = {}
+            while pending or running:
+                for name, current_stage in list(pending.items()):
+                    if any(status.get(dep) in FAILED for dep in deps[name]):
+                        status[name] = 'blocked'
+                        del pending[name]
+                        print(f"[{name}] not run: a dependency failed")
+                    elif all(dep in status for dep in deps[name]):
+                        running[pool.submit(self.execute, current_stage)] = name
+                        del pending[name]
+                if not running:
+                    break
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    try:
+                        status[name] = future.result()
+                    except Exception as e:
+                        print(f"[{name}] FAILED: {e}")
+                        status[name] = 'failed'
+
+        self.finish(stages, status)
+        return status
+
+    def finish(self, stages, status):
+        """Record final fingerprints of sources a stage writes itself, then save the cache.
+
+        Stages writing the same source are idempotent fix-ups, so a later
+        stage's edit does not make an earlier one out of date.
+        """
+        for current_stage in stages:
+            record = self.cache.get(current_stage.name)
+            if status.get(current_stage.name) in FAILED or not record:
+                continue
+            for name in set(current_stage.inputs) & set(current_stage.outputs):
+                record['inputs'][name] = self.fingerprint(name)
+        with open(self.cache_file, 'w', encoding='utf-8') as f:
+            json.dump(self.cache, f, ensure_ascii=False)
+
+
+def update_records(store, workers=None):
+    """
+    Bring what is derived from the records up to date after an edit (admin API, CSV import).
+
+    Only the changed works are reprocessed. Image derivation is left to the
+    next full build, so a save never renders images.
+    """
+    return Build(store=store, workers=workers).run(record_stages(), upstream=False)
+
+
+def print_graph(build, stages):
+    deps = dependencies(stages)
+    for current_stage in stages:
+        changes, _ = build.changes(current_stage)
+        state = f"out of date ({changes.summary()})" if changes else 'up to date'
+        print(f"{current_stage.name} - {current_stage.description}")
+        print(f"  inputs:     {', '.join(current_stage.inputs)}")
+        print(f"  outputs:    {', '.join(current_stage.outputs) or '-'}")
+        print(f"  after:      {', '.join(deps[current_stage.name]) or '-'}")
+        print(f"  state:      {state}")
+
+
+def print_dot(stages):
+    deps = dependencies(stages)
+    print('digraph build {')
+    print('  rankdir=LR;')
+    for current_stage in stages:
+        print(f'  "{current_stage.name}" [shape=box];')
+        for name in current_stage.inputs:
+            print(f'  "{name}" -> "{current_stage.name}";')
+        for name in current_stage.outputs:
+            print(f'  "{current_stage.name}" -> "{name}";')
+        for dep in deps[current_stage.name]:
+            print(f'  "{dep}" -> "{current_stage.name}" [style=dashed];')
+    print('}')
+
+
+def main(argv=None, store=None):
+    parser = argparse.ArgumentParser(description="Build out-of-date derivatives, data fix-ups and the search index")
+    parser.add_argument('stages', nargs='*', help='Stages to build (default: all)')
+    parser.add_argument('--graph', action='store_true', help='Show the build graph and what is out of date')
+    parser.add_argument('--dot', action='store_true', help='Print the graph in Graphviz dot format')
+    parser.add_argument('--force', action='store_true', help='Ignore the fingerprint cache')
+    parser.add_argument('-j', '--jobs', type=int, help='Maximum parallel workers')
+    args = parser.parse_args(argv)
+
+    try:
+        stages = select(args.stages)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.dot:
+        print_dot(stages)
+        return 0
+
+    build = Build(store=store, force=args.force, workers=args.jobs)
+    if args.graph:
+        print_graph(build, stages)
+        return 0
+
+    start = time.perf_counter()
+    status = build.run(args.stages)
+    ran = [name for name, state in status.items() if state == 'ran']
+    failed = [name for name, state in status.items() if state in FAILED]
+    still_failing = [name for name, state in status.items() if state == 'still-failing']
+    if still_failing:
+        print(f"Still failing with unchanged inputs: {', '.join(still_failing)}")
+    print(f"\nBuild finished in {time.perf_counter() - start:.2f} s: "
+          f"{len(ran)} ran, {len(status) - len(ran) - len(failed)} up to date, {len(failed)} failed")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -3,14 +3,14 @@
 Clean up duplicate restored works and add missing master-plaster-caster work.
 """
 
-import json
+from store import WorksStore
 
 def clean_and_complete_restored_works():
     """Remove duplicates and add missing works."""
 
     # Read current works.json
-    with open('works.json', 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    store = WorksStore()
+    data = store.data
 
     # Track seen IDs to remove duplicates
     seen_ids = set()
@@ -63,9 +63,9 @@ def clean_and_complete_restored_works():
     # Update data
     data['works'] = cleaned_works
 
-    # Write updated JSON
-    with open('works.json', 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    # Write updated JSON (journalled, so the clean-up can be reverted)
+    store.changed()
+    store.save()
 
     print(f"\nOK: Cleaned works list")
     print(f"Total works now: {len(cleaned_works)}")
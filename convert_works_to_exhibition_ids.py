@@ -4,7 +4,7 @@ Convert works.json exhibitions from full data to ID references
 by matching with exhibitions.json
 """
 
-import json
+from store import WorksStore
 
 def normalize_string(s):
     """Normalize string for comparison"""
@@ -53,23 +53,56 @@ def find_exhibition_id(work_ex, all_exhibitions):
 
     return None
 
+def convert_work_exhibitions(work, exhibitions):
+    """Replace one work's inline exhibitions with ID references where a match exists.
+
+    Returns (number matched, list of unmatched "title (year)" strings); unmatched
+    exhibitions are kept as full objects.
+    """
+    if not work.get('exhibitions'):
+        return 0, []
+
+    matched = 0
+    unmatched = []
+    new_exhibitions = []
+
+    for ex in work['exhibitions']:
+        # Already an ID reference
+        if isinstance(ex, str):
+            new_exhibitions.append(ex)
+            continue
+
+        # Try to match with exhibitions.json
+        ex_id = find_exhibition_id(ex, exhibitions)
+
+        if ex_id:
+            new_exhibitions.append(ex_id)
+            matched += 1
+        else:
+            # Keep the full exhibition object for now
+            title = ex.get('title', {}).get('en', '') if isinstance(ex.get('title'), dict) else ex.get('title', '')
+            unmatched.append(f"{title} ({ex.get('year', '')})")
+            new_exhibitions.append(ex)
+
+    work['exhibitions'] = new_exhibitions
+    return matched, unmatched
+
 def convert_works_exhibitions():
     """Convert all works to use exhibition ID references"""
 
+    store = WorksStore()
+
     # Load exhibitions
     print("Loading exhibitions.json...")
-    with open('exhibitions.json', 'r', encoding='utf-8') as f:
-        exhibitions = json.load(f)
+    exhibitions = store.exhibitions_data
 
     # Load works
     print("Loading works.json...")
-    with open('works.json', 'r', encoding='utf-8') as f:
-        works = json.load(f)
+    works = store.data
 
-    # Backup
-    print("Creating backup...")
-    with open('backups/works.json.pre-exhibition-ids', 'w', encoding='utf-8') as f:
-        json.dump(works, f, indent=2, ensure_ascii=False)
+    # Snapshot (undo with: python snapshots.py restore latest)
+    from snapshots import take
+    take('before convert_works_to_exhibition_ids')
 
     matched_count = 0
     unmatched_count = 0
@@ -78,39 +111,15 @@ def convert_works_exhibitions():
     # Process each work
     print(f"\nProcessing {len(works['works'])} works...")
     for work in works['works']:
-        if not work.get('exhibitions'):
-            continue
-
-        new_exhibitions = []
-
-        for ex in work['exhibitions']:
-            # Skip string format
-            if isinstance(ex, str):
-                print(f"  WARNING: String exhibition in {work['id']}: {ex}")
-                continue
-
-            # Try to match with exhibitions.json
-            ex_id = find_exhibition_id(ex, exhibitions)
-
-            if ex_id:
-                new_exhibitions.append(ex_id)
-                matched_count += 1
-            else:
-                # Keep original data if no match found
-                unmatched_count += 1
-                title = ex.get('title', {}).get('en', '') if isinstance(ex.get('title'), dict) else ex.get('title', '')
-                year = ex.get('year', '')
-                unmatched_list.append(f"{work['id']}: {title} ({year})")
-
-                # Keep the full exhibition object for now
-                new_exhibitions.append(ex)
-
-        work['exhibitions'] = new_exhibitions
+        matched, unmatched = convert_work_exhibitions(work, exhibitions)
+        matched_count += matched
+        unmatched_count += len(unmatched)
+        unmatched_list.extend(f"{work['id']}: {item}" for item in unmatched)
 
-    # Save updated works.json
+    # Save updated works.json through the store (atomic, and journalled per work)
     print("\nSaving updated works.json...")
-    with open('works.json', 'w', encoding='utf-8') as f:
-        json.dump(works, f, indent=2, ensure_ascii=False)
+    store.changed()
+    store.save()
 
     print(f"\nConversion complete!")
     print(f"  Matched: {matched_count} exhibitions converted to IDs")
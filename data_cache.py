@@ -0,0 +1,98 @@
+"""
+Binary cache of parsed JSON data for fast script startup.
+
+load_json() keeps a pickle of the parsed (and optionally normalised) data next
+to the source file, e.g. works.json -> .works.json.cache. The cache is reused
+while the source's size and mtime are unchanged; if they changed but the
+content hash did not (a checkout, a touch) the cache is re-stamped instead of
+re-parsed. Only a real content change costs a JSON parse.
+"""
+
+import json
+import os
+import pickle
+
+CACHE_FORMAT = 1
+
+
+def cache_path(path, tag=''):
+    """Cache file for path, e.g. works.json -> .works.json.cache (or .works.json.model.cache)."""
+    directory, name = os.path.split(path)
+    suffix = f".{tag}.cache" if tag else '.cache'
+    return os.path.join(directory, f".{name}{suffix}")
+
+
+def transform_id(transform):
+    """Identify a transform so caches are invalidated when it changes."""
+    if transform is None:
+        return ''
+    version = getattr(transform, 'CACHE_VERSION', 0)
+    return f"{transform.__module__}.{transform.__qualname__}:{version}"
+
+
+def _read_cache(path):
+    try:
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+
+
+def _write_cache(path, entry):
+    """Write atomically so a concurrent reader never sees a partial pickle."""
+    import tempfile  # only needed when the cache is rewritten
+    directory = os.path.dirname(path) or '.'
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-', suffix='.cache')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+
+
+def load_json(path, transform=None, tag=''):
+    """
+    Return the parsed JSON at path, passed through transform, using the binary cache.
+
+    Callers get a fresh object on every call, so mutating the result is safe.
+    """
+    stat = os.stat(path)
+    cache_file = cache_path(path, tag)
+    key = transform_id(transform)
+
+    entry = _read_cache(cache_file)
+    if entry and entry.get('format') == CACHE_FORMAT and entry.get('transform') == key:
+        if entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+            return entry['data']
+
+    import hashlib  # only needed when the stat stamp changed; loading OpenSSL is slow
+    with open(path, 'rb') as f:
+        raw = f.read()
+    digest = hashlib.sha256(raw).hexdigest()
+
+    if entry and entry.get('format') == CACHE_FORMAT and entry.get('transform') == key and entry.get('sha256') == digest:
+        data = entry['data']
+    else:
+        data = json.loads(raw.decode('utf-8'))
+        if transform is not None:
+            data = transform(data)
+
+    _write_cache(cache_file, {
+        'format': CACHE_FORMAT,
+        'transform': key,
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'sha256': digest,
+        'data': data,
+    })
+    return data
+
+
+def clear(path, tag=''):
+    """Remove the cache for path, if any."""
+    try:
+        os.unlink(cache_path(path, tag))
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,262 @@
+"""
+Shared image derivative engine.
+
+A Rendition describes one output size (bounding box, crop, quality, format);
+render() writes it from a source image with Pillow. The site keeps two
+renditions per image, following the paths the front end asks for:
+
+  images/<work>/<name>.jpg                -> images/<work>/medium/<name>-medium.jpg  (800x600 box)
+  images/<work>/medium/<name>-medium.jpg  -> images/<work>/thumbs/<name>-thumb.jpg   (150x150 crop)
+
+plan_folder() lists the derivatives of one work folder that are missing or
+were built from a different version of their source. derive_folders() only
+makes those the site references (site_index.collect_references: paths in the
+JSON and HTML sources plus the thumbs and medium images works.js derives from
+works.json urls), so folders no work uses, such as studio photos kept under
+images/, get no renditions that gc_orphans would then report. The manifest
+(.derivatives.cache) remembers the size and mtime of the source each output
+was made from; outputs that predate the manifest are adopted as they are, so
+a fresh checkout does not re-encode the whole tree. Pillow is imported on
+first use.
+"""
+
+import json
+import os
+from dataclasses import dataclass
+
+from site_index import IMAGES_DIR, get_thumb_path, normalize_path
+
+MANIFEST_FILE = '.derivatives.cache'
+SOURCE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.tif', '.tiff', '.webp')
+
+# format name -> (Pillow format, file extension, content type)
+FORMATS = {
+    'jpeg': ('JPEG', '.jpg', 'image/jpeg'),
+    'jpg': ('JPEG', '.jpg', 'image/jpeg'),
+    'webp': ('WEBP', '.webp', 'image/webp'),
+    'png': ('PNG', '.png', 'image/png'),
+}
+
+
+class DerivativeError(Exception):
+    pass
+
+
+@dataclass(frozen=True, slots=True)
+class Rendition:
+    width: int
+    height: int
+    crop: bool = False
+    quality: int = 85
+    format: str = 'jpeg'
+
+    @property
+    def extension(self):
+        return FORMATS[self.format][1]
+
+    @property
+    def content_type(self):
+        return FORMATS[self.format][2]
+
+
+MEDIUM = Rendition(800, 600, quality=85)
+THUMB = Rendition(150, 150, crop=True, quality=80)
+
+
+def _pillow():
+    try:
+        from PIL import Image, ImageOps
+    except ImportError:
+        raise DerivativeError("Pillow is needed for image derivatives: pip install -r requirements.txt")
+    return Image, ImageOps
+
+
+def _flatten(img, Image):
+    """Convert to RGB, putting transparent images on a white background."""
+    if img.mode in ('RGBA', 'LA', 'P'):
+        if img.mode == 'P':
+            img = img.convert('RGBA')
+        background = Image.new('RGB', img.size, (255, 255, 255))
+        background.paste(img, mask=img.split()[-1] if img.mode in ('RGBA', 'LA') else None)
+        return background
+    if img.mode != 'RGB':
+        return img.convert('RGB')
+    return img
+
+
+def resize(img, rendition):
+    """Return img scaled for rendition (never enlarged unless cropping)."""
+    Image, ImageOps = _pillow()
+    img = ImageOps.exif_transpose(img)
+    if rendition.format in ('jpeg', 'jpg'):
+        img = _flatten(img, Image)
+    if rendition.crop:
+        return ImageOps.fit(img, (rendition.width, rendition.height), Image.Resampling.LANCZOS)
+    img = img.copy()
+    img.thumbnail((rendition.width, rendition.height), Image.Resampling.LANCZOS)
+    return img
+
+
+def encode(img, fp, rendition):
+    pil_format = FORMATS[rendition.format][0]
+    options = {'optimize': True} if pil_format in ('JPEG', 'PNG') else {}
+    if pil_format != 'PNG':
+        options['quality'] = rendition.quality
+    img.save(fp, pil_format, **options)
+
+
+def render_bytes(src, rendition):
+    """Encoded bytes of one rendition of src (for serving without writing a file)."""
+    import io
+    Image, _ = _pillow()
+    with Image.open(src) as img:
+        out = resize(img, rendition)
+    buffer = io.BytesIO()
+    encode(out, buffer, rendition)
+    return buffer.getvalue()
+
+
+def render(src, dst, rendition):
+    """Write one rendition of src to dst atomically; returns the output size."""
+    Image, _ = _pillow()
+    with Image.open(src) as img:
+        out = resize(img, rendition)
+    os.makedirs(os.path.dirname(dst) or '.', exist_ok=True)
+    tmp_path = f"{dst}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            encode(out, f, rendition)
+        os.replace(tmp_path, dst)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    return out.size
+
+
+def medium_path(path):
+    """images/<work>/<name>.ext -> images/<work>/medium/<name>-medium.jpg"""
+    folder, name = path.rsplit('/', 1)
+    return f"{folder}/medium/{os.path.splitext(name)[0]}-medium.jpg"
+
+
+def is_source_image(name):
+    return name.lower().endswith(SOURCE_EXTENSIONS) and not name.endswith(('-medium.jpg', '-thumb.jpg'))
+
+
+def _stamp(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+class Manifest:
+    """Output path -> [source path, source size, source mtime_ns] it was built from."""
+
+    def __init__(self, path=MANIFEST_FILE):
+        self.path = path
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+        except (FileNotFoundError, ValueError):
+            self.entries = {}
+        self.changed = False
+
+    def is_current(self, src, dst):
+        if not os.path.exists(dst):
+            return False
+        entry = self.entries.get(dst)
+        if entry is None:
+            self.record(src, dst)  # built before the manifest existed
+            return True
+        return entry == [src] + _stamp(src)
+
+    def record(self, src, dst):
+        self.entries[dst] = [src] + _stamp(src)
+        self.changed = True
+
+    def save(self):
+        if self.changed:
+            with open(self.path, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f, ensure_ascii=False, sort_keys=True)
+            self.changed = False
+
+
+def plan_folder(folder, manifest):
+    """
+    Derivatives of images/<folder> that are missing or stale.
+
+    Returns a list of (source path, output path, Rendition).
+    """
+    base = f"{IMAGES_DIR}/{folder}"
+    if not os.path.isdir(base):
+        return []
+
+    def needed(src, dst):
+        return not manifest.is_current(src, dst)
+
+    plan = []
+    from_originals = set()
+    with os.scandir(base) as entries:
+        originals = sorted(e.name for e in entries if e.is_file() and is_source_image(e.name))
+    for name in originals:
+        src = f"{base}/{name}"
+        medium = medium_path(src)
+        from_originals.add(medium)
+        if needed(src, medium):
+            plan.append((src, medium, MEDIUM))
+        thumb = get_thumb_path(medium)
+        if needed(src, thumb):
+            plan.append((src, thumb, THUMB))
+
+    medium_dir = f"{base}/medium"
+    if os.path.isdir(medium_dir):
+        with os.scandir(medium_dir) as entries:
+            mediums = sorted(e.name for e in entries if e.is_file() and e.name.lower().endswith(SOURCE_EXTENSIONS))
+        for name in mediums:
+            src = f"{medium_dir}/{name}"
+            if src in from_originals:
+                continue  # its thumb is made from the original above
+            thumb = get_thumb_path(src)
+            if thumb != src and needed(src, thumb):
+                plan.append((src, thumb, THUMB))
+    return plan
+
+
+def derive_folders(folders, workers=None, manifest=None, referenced=None):
+    """
+    Create missing/stale derivatives for the given work folders in parallel; returns written paths.
+
+    Only outputs in referenced (normalised paths, default: collect_references())
+    are made.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    if referenced is None:
+        from site_index import collect_references
+        referenced = collect_references()
+    manifest = manifest or Manifest()
+    jobs = [job for folder in folders for job in plan_folder(folder, manifest)
+            if normalize_path(job[1]) in referenced]
+    if not jobs:
+        manifest.save()
+        return []
+
+    def run(job):
+        src, dst, rendition = job
+        try:
+            render(src, dst, rendition)
+            manifest.record(src, dst)
+            return dst
+        except DerivativeError:
+            raise
+        except Exception as e:
+            print(f"  Error deriving {dst} from {src}: {e}")
+            return None
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        written = [dst for dst in pool.map(run, jobs) if dst]
+    manifest.save()
+    return written
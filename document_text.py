@@ -0,0 +1,272 @@
+"""
+Text of the documents kept with works (PDF, Word and plain text files in
+images/<work>/) for the search index.
+
+Works made by process_pdf_work / process_documentation_work were indexed by
+folder name and a generic description only. extract_texts() reads each
+document once - in a process pool, since PDF parsing is pure Python - and
+keeps the text in .document-text.cache keyed by the file's SHA-1, with the
+size and mtime of every path so unchanged files are not even re-hashed.
+Copies of one file in several folders share an entry.
+
+work_document_text() turns a work's documents into what the index gets:
+paragraphs with whitespace collapsed, short fragments and repeats (by folded
+text, across all of the work's files) dropped, capped at TEXT_LIMIT
+characters.
+
+Formats:
+  .txt    UTF-8, falling back to Windows-1252
+  .docx   word/document.xml read with zipfile
+  .pdf    pypdf, imported on first use; without it PDFs are skipped (and
+          not cached, so they are read once it is installed - pdf_reader()
+          is part of the build's fingerprint of PDF files for that reason)
+  .doc    antiword when it is on PATH, otherwise the runs of text stored
+          in the file, which is where Word 97-2003 keeps a document's text
+"""
+
+import hashlib
+import importlib.util
+import json
+import os
+import re
+import shutil
+import subprocess
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from xml.etree import ElementTree
+
+from site_index import IMAGES_DIR, normalize_path, work_folder
+from slugs import fold
+from store import write_json_atomic
+
+CACHE_FILE = '.document-text.cache'
+CACHE_FORMAT = 1
+DOCUMENT_EXTENSIONS = ('.pdf', '.txt', '.doc', '.docx')
+TEXT_LIMIT = 8000        # characters of document text per work
+MIN_PARAGRAPH_LENGTH = 20
+
+PARAGRAPH_BREAK = re.compile(r'\s*(?:\r\n?|\n)\s*(?:(?:\r\n?|\n)\s*)*')
+WORD_8BIT_RUN = re.compile(rb'[\x20-\x7e\x91-\x97\xc0-\xfe\t\r\n]{20,}')
+WORD_16BIT_RUN = re.compile(rb'(?:[\x20-\x7e\xc0-\xfe\t\r\n]\x00){20,}')
+DOCX_NAMESPACE = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+
+
+class DocumentTextError(Exception):
+    pass
+
+
+def document_files(root=IMAGES_DIR):
+    """Every document under images/, as normalised paths."""
+    paths = []
+    for directory, _, names in os.walk(root):
+        paths.extend(normalize_path(os.path.join(directory, name).replace(os.sep, '/'))
+                     for name in names if name.lower().endswith(DOCUMENT_EXTENSIONS))
+    return sorted(paths)
+
+
+def pdf_reader():
+    """'pypdf <version>', or 'none' when PDFs cannot be read."""
+    if importlib.util.find_spec('pypdf') is None:
+        return 'none'
+    from importlib.metadata import PackageNotFoundError, version
+    try:
+        return f"pypdf {version('pypdf')}"
+    except PackageNotFoundError:
+        return 'pypdf'
+
+
+def work_folders(work):
+    """Folders under images/ holding a work's files: those of its image and document urls, and images/<id>."""
+    urls = [img.url for img in work.images] + [doc.get('url', '') for doc in (work.extra or {}).get('documents') or []
+                                               if isinstance(doc, dict)]
+    folders = {work_folder(normalize_path(url)) for url in urls} - {''}
+    if work.id and os.path.isdir(os.path.join(IMAGES_DIR, work.id)):
+        folders.add(normalize_path(work.id))
+    return folders
+
+
+# ---------------------------------------------------------------------------
+# Extraction (runs in worker processes)
+
+def _pdf_text(path):
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        raise DocumentTextError("pypdf is needed for PDF text: pip install -r requirements.txt")
+    return '\n\n'.join(page.extract_text() or '' for page in PdfReader(path).pages)
+
+
+def _docx_text(path):
+    with zipfile.ZipFile(path) as archive:
+        root = ElementTree.fromstring(archive.read('word/document.xml'))
+    return '\n'.join(''.join(node.text or '' for node in paragraph.iter(f'{DOCX_NAMESPACE}t'))
+                     for paragraph in root.iter(f'{DOCX_NAMESPACE}p'))
+
+
+def _doc_text(path):
+    if shutil.which('antiword'):
+        result = subprocess.run(['antiword', '-w', '0', path], capture_output=True)
+        if result.returncode == 0:
+            return result.stdout.decode('utf-8', 'replace')
+    with open(path, 'rb') as f:
+        data = f.read()
+    runs = [m.group().decode('cp1252', 'replace') for m in WORD_8BIT_RUN.finditer(data)]
+    runs += [m.group().decode('utf-16-le') for m in WORD_16BIT_RUN.finditer(data)]
+    # keep runs that read as text: several words, not file paths or fill bytes
+    return '\n'.join(run for run in runs if run.count(' ') >= 4 and ':\\' not in run)
+
+
+def _txt_text(path):
+    with open(path, 'rb') as f:
+        data = f.read()
+    try:
+        return data.decode('utf-8')
+    except UnicodeDecodeError:
+        return data.decode('cp1252', 'replace')
+
+
+READERS = {'.pdf': _pdf_text, '.docx': _docx_text, '.doc': _doc_text, '.txt': _txt_text}
+
+
+def read_document(path):
+    """(path, text or None, error message or None) for one document."""
+    try:
+        return path, READERS[os.path.splitext(path)[1].lower()](path), None
+    except DocumentTextError as e:
+        return path, None, str(e)
+    except Exception as e:
+        return path, '', f"{path}: {e}"  # unreadable file: cached as empty so it is not retried
+
+
+# ---------------------------------------------------------------------------
+# Cache
+
+class TextCache:
+    """path -> [size, mtime_ns, sha1] and sha1 -> text, in .document-text.cache."""
+
+    def __init__(self, path=CACHE_FILE):
+        self.path = path
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            data = {}
+        if data.get('format') != CACHE_FORMAT:
+            data = {}
+        self.files = data.get('files', {})
+        self.texts = data.get('texts', {})
+        self.dirty = False
+
+    def digest(self, path):
+        """SHA-1 of a file, reusing the recorded one while its size and mtime are unchanged."""
+        stat = os.stat(path)
+        recorded = self.files.get(path)
+        if recorded and recorded[:2] == [stat.st_size, stat.st_mtime_ns]:
+            return recorded[2]
+        sha = hashlib.sha1()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                sha.update(block)
+        self.files[path] = [stat.st_size, stat.st_mtime_ns, sha.hexdigest()]
+        self.dirty = True
+        return sha.hexdigest()
+
+    def save(self):
+        if not self.dirty:
+            return
+        live = {entry[2] for entry in self.files.values()}
+        self.texts = {sha: text for sha, text in self.texts.items() if sha in live}
+        write_json_atomic(self.path, {'format': CACHE_FORMAT, 'files': self.files, 'texts': self.texts})
+        self.dirty = False
+
+
+def extract_texts(paths, workers=None, cache=None):
+    """{path: text} for the given documents, reading only files whose content is not cached yet."""
+    cache = cache or TextCache()
+    digests = {}
+    for path in paths:
+        try:
+            digests[path] = cache.digest(path)
+        except FileNotFoundError:
+            continue
+    for path in set(cache.files) - set(document_files()):
+        del cache.files[path]  # the file was removed or renamed
+        cache.dirty = True
+
+    cached = sum(1 for sha in set(digests.values()) if sha in cache.texts)
+    todo = {}
+    for path, sha in digests.items():
+        if sha not in cache.texts:
+            todo.setdefault(sha, path)
+    if importlib.util.find_spec('pypdf') is None:
+        skipped = [sha for sha, path in todo.items() if path.lower().endswith('.pdf')]
+        for sha in skipped:
+            del todo[sha]
+        if skipped:
+            print(f"  {len(skipped)} PDFs skipped: pypdf is needed for PDF text (pip install -r requirements.txt)")
+    if todo:
+        notes = set()
+        jobs = sorted(todo.values())
+        if len(jobs) == 1:
+            results = [read_document(jobs[0])]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(read_document, jobs))
+        for path, text, error in results:
+            if error:
+                notes.add(error)
+            if text is not None:
+                cache.texts[digests[path]] = text
+                cache.dirty = True
+        for note in sorted(notes):
+            print(f"  {note}")
+        print(f"  Read {len(jobs)} documents ({cached} already cached)")
+    cache.save()
+    return {path: cache.texts[sha] for path, sha in digests.items() if sha in cache.texts}
+
+
+# ---------------------------------------------------------------------------
+# Search text
+
+def passages(texts, limit=TEXT_LIMIT):
+    """Paragraphs of texts, in order, without short fragments or repeats, up to limit characters."""
+    kept, seen, size = [], set(), 0
+    for text in texts:
+        for paragraph in PARAGRAPH_BREAK.split(text):
+            paragraph = ' '.join(paragraph.split())
+            key = fold(paragraph)
+            if len(paragraph) < MIN_PARAGRAPH_LENGTH or key in seen:
+                continue
+            if size + len(paragraph) > limit:
+                return kept
+            seen.add(key)
+            kept.append(paragraph)
+            size += len(paragraph) + 1
+    return kept
+
+
+def work_document_text(works, workers=None):
+    """{work id: capped, deduplicated document text} for works with documents in their folders."""
+    by_folder = {}
+    for path in document_files():
+        by_folder.setdefault(work_folder(path), []).append(path)
+    wanted = {}
+    for work in works:
+        paths = [path for folder in sorted(work_folders(work)) for path in by_folder.get(folder, [])]
+        if paths:
+            wanted[work.id] = paths
+    if not wanted:
+        return {}
+    texts = extract_texts(sorted({path for paths in wanted.values() for path in paths}), workers=workers)
+    result = {}
+    for work_id, paths in wanted.items():
+        kept = passages(texts[path] for path in paths if texts.get(path))
+        if kept:
+            result[work_id] = '\n'.join(kept)
+    return result
+
+
+if __name__ == '__main__':
+    from models import load_works
+    for work_id, text in sorted(work_document_text(load_works()).items()):
+        print(f"{work_id}: {len(text):,} characters")
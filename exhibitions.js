@@ -39,18 +39,20 @@ class ExhibitionsManager {
     }
 
 
-    // Group exhibitions by year
+    // Group exhibitions by year as displayed ("1978–79"), remembering where each group starts
     const exhibitionsByYear = {};
+    const yearStarts = {};
     exhibitions.forEach(exhibition => {
-      const year = exhibition.year;
+      const year = exhibition.yearDisplay || exhibition.year;
       if (!exhibitionsByYear[year]) {
         exhibitionsByYear[year] = [];
+        yearStarts[year] = exhibition.yearStart ?? parseInt(year);
       }
       exhibitionsByYear[year].push(exhibition);
     });
 
-    // Sort years in descending order
-    const years = Object.keys(exhibitionsByYear).sort((a, b) => b - a);
+    // Sort years in descending order by their precomputed first year
+    const years = Object.keys(exhibitionsByYear).sort((a, b) => yearStarts[b] - yearStarts[a]);
 
     // Build HTML
     let html = '<h1>' + (this.type === 'solo' ? i18n.te('soloExhibitions') : i18n.te('groupExhibitions')) + '</h1>';
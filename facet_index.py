@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Facet index for the filter panel on the works page (facet-index.json).
+
+works.js used to test every work's categories, mediums, tags and year on
+each pill click, and rebuilt the pill lists from all works whenever the
+panel was drawn. The build now lists each facet's values with their counts
+and a bitset of the works that have them: bit i (word i >> 5, bit i & 31)
+stands for the i-th work in works.json. Filtering is then an OR of the
+selected values' bitsets within a facet and an AND across facets, and the
+pill counts are population counts of the same words.
+
+Facets, named as the pills' data-filter attribute:
+  category  work.category
+  medium    work.medium.en
+  tag       work.tags
+  decade    work.yearStart (years.py), rounded down to the decade
+
+Works are identified by position, so the file also carries the ids in
+order and a fingerprint: FNV-1a (32 bit) over the UTF-8 JSON of each
+work's id and facet values. works.js hashes the works it loaded the same
+way and computes the index itself when facet-index.json is missing or its
+fingerprint differs, so a tag or year edit never leaves stale filters.
+
+Usage:
+  python facet_index.py             - Write facet-index.json
+"""
+
+import json
+import sys
+
+from models import load_works
+from store import write_json_atomic
+
+FACET_INDEX_FILE = 'facet-index.json'
+FORMAT = 2
+FNV_OFFSET, FNV_PRIME = 0x811c9dc5, 0x01000193
+
+
+def _decades(work):
+    decade = work.years.decade
+    return [] if decade is None else [decade]
+
+
+FACETS = {
+    'category': lambda work: work.category,
+    'medium': lambda work: work.medium.en,
+    'tag': lambda work: work.tags,
+    'decade': _decades,
+}
+
+
+def fingerprint(works):
+    """Hex FNV-1a of the works' ids and facet values (works.js facetFingerprint)."""
+    value = FNV_OFFSET
+    for work in works:
+        record = [work.id, *(list(values_of(work)) for values_of in FACETS.values())]
+        for byte in json.dumps(record, ensure_ascii=False, separators=(',', ':')).encode('utf-8'):
+            value = ((value ^ byte) * FNV_PRIME) & 0xffffffff
+    return f"{value:08x}"
+
+
+def facet_index(works):
+    """{'format', 'ids', 'fingerprint', 'facets': {facet: {'values', 'counts', 'bits'}}} for works in works.json order."""
+    words = (len(works) + 31) // 32
+    facets = {}
+    for name, values_of in FACETS.items():
+        members = {}
+        for position, work in enumerate(works):
+            for value in set(values_of(work)):
+                members.setdefault(value, []).append(position)
+        values = sorted(members)
+        bits = []
+        for value in values:
+            row = [0] * words
+            for position in members[value]:
+                row[position >> 5] |= 1 << (position & 31)
+            bits.append(row)
+        facets[name] = {'values': values, 'counts': [len(members[value]) for value in values], 'bits': bits}
+    return {'format': FORMAT, 'ids': [work.id for work in works], 'fingerprint': fingerprint(works), 'facets': facets}
+
+
+def write_facet_index(works=None, path=FACET_INDEX_FILE):
+    """Write the facet index; returns it."""
+    index = facet_index(load_works() if works is None else works)
+    write_json_atomic(path, index, compact=True)
+    return index
+
+
+def main():
+    index = write_facet_index()
+    for name, facet in index['facets'].items():
+        print(f"  {name}: {len(facet['values'])} values")
+    print(f"Facet index for {len(index['ids'])} works written to {FACET_INDEX_FILE}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -3,10 +3,11 @@
 Fix broken image references in works.json by removing entries that point to missing files.
 """
 
-import json
 import os
 import sys
 
+from store import WorksStore
+
 def file_exists(file_path):
     """Check if a file exists."""
     return os.path.isfile(file_path)
@@ -15,8 +16,8 @@ def fix_works_json():
     """Remove broken image references from works.json."""
 
     # Read the current works.json
-    with open('works.json', 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    store = WorksStore()
+    data = store.data
 
     # Track statistics
     total_images = 0
@@ -58,9 +59,9 @@ def fix_works_json():
     # Update the data
     data['works'] = works_to_keep
 
-    # Write the fixed JSON back
-    with open('works.json', 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    # Write the fixed JSON back through the store (atomic, and journalled per work)
+    store.changed()
+    store.save()
 
     # Print summary
     print(f"\nSummary:")
@@ -1,11 +1,7 @@
 #!/usr/bin/env python3
 
-import json
-import os
-
-# Load the works.json file
-with open('works.json', 'r', encoding='utf-8') as f:
-    data = json.load(f)
+from rewrite_urls import RewriteRules, rewrite_files
+from snapshots import take
 
 # Define the mappings for files that need to be updated
 updates = [
@@ -51,24 +47,17 @@ updates = [
     }
 ]
 
-# Create backup
-with open('works.json.backup-before-medium-fix', 'w', encoding='utf-8') as f:
-    json.dump(data, f, indent=2, ensure_ascii=False)
+# Snapshot works.json and exhibitions.json so the fix can be undone
+take('before fix_json_references')
 
-# Apply updates
-updated_count = 0
-for work in data['works']:
-    for image in work.get('images', []):
-        for update in updates:
-            if image['url'] == update['old']:
-                print(f"Updating: {update['old']} -> {update['new']}")
-                image['url'] = update['new']
-                updated_count += 1
+# Apply updates in one pass over every file that can reference these images
+rules = RewriteRules(exact={update['old']: update['new'] for update in updates})
+changed = rewrite_files(rules, apply=True, show_diff=False)
 
-print(f"\nTotal updates made: {updated_count}")
+for name, changes in changed.items():
+    for old, new in changes:
+        print(f"Updating ({name}): {old} -> {new}")
 
-# Save the updated works.json
-with open('works.json', 'w', encoding='utf-8') as f:
-    json.dump(data, f, indent=2, ensure_ascii=False)
+print(f"\nTotal updates made: {sum(len(c) for c in changed.values())}")
 
 print("JSON references updated successfully!")
\ No newline at end of file
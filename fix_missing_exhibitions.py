@@ -3,14 +3,14 @@
 Fix missing exhibitions property for restored works that are causing JavaScript errors.
 """
 
-import json
+from store import WorksStore
 
 def fix_missing_exhibitions():
     """Add missing exhibitions arrays to works that don't have them."""
 
     # Read current works.json
-    with open('works.json', 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    store = WorksStore()
+    data = store.data
 
     fixed_count = 0
 
@@ -27,9 +27,9 @@ def fix_missing_exhibitions():
             work['materials'] = []
             print(f"Added empty materials array to: {work.get('title', 'Unknown')} ({work.get('id', 'no-id')})")
 
-    # Write updated JSON
-    with open('works.json', 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    # Write updated JSON through the store (atomic, and journalled per work)
+    store.changed()
+    store.save()
 
     print(f"\nOK: Fixed {fixed_count} works missing exhibitions property")
     print("All works now have exhibitions and materials arrays (empty if no data)")
@@ -0,0 +1,8 @@
+// fold-table.js - generated by slugs.py (python slugs.py emit-js), do not edit by hand.
+// Same character folding as fold() in slugs.py, used by global search.
+var ICELANDIC_FOLD_MAP = {"ß": "ss", "à": "a", "á": "a", "â": "a", "ã": "a", "ä": "a", "å": "a", "æ": "ae", "ç": "c", "è": "e", "é": "e", "ê": "e", "ë": "e", "ì": "i", "í": "i", "î": "i", "ï": "i", "ð": "d", "ñ": "n", "ò": "o", "ó": "o", "ô": "o", "õ": "o", "ö": "o", "ø": "o", "ù": "u", "ú": "u", "û": "u", "ü": "u", "ý": "y", "þ": "th", "ÿ": "y"};
+var ICELANDIC_FOLD_PATTERN = /[ßàáâãäåæçèéêëìíîïðñòóôõöøùúûüýþÿ]/g;
+
+function foldIcelandic(text) {
+  return text.toLowerCase().replace(ICELANDIC_FOLD_PATTERN, char => ICELANDIC_FOLD_MAP[char]);
+}
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Find files under images/ that nothing on the site references and report the
+space they take, grouped by work folder. Optionally move them to a trash folder.
+
+Usage:
+  python gc_orphans.py                 - Dry run: report orphans and reclaimable bytes
+  python gc_orphans.py --archive       - Move orphans to <trashDir>/orphans-<timestamp>/ (toolkit.json)
+  python gc_orphans.py --archive DIR   - Move orphans to DIR
+"""
+
+import argparse
+import os
+import shutil
+import time
+
+from settings import trash_dir
+from site_index import collect_references, scan_images, work_folder
+
+DERIVATIVE_FOLDERS = ('medium', 'thumbs')
+
+
+def format_bytes(size):
+    """Human readable byte count."""
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def is_derivative(path):
+    """True for files inside a medium/ or thumbs/ folder."""
+    return any(f"/{folder}/" in path for folder in DERIVATIVE_FOLDERS)
+
+
+def find_orphans(derivatives_only=False):
+    """
+    Diff the on-disk index against every reference on the site.
+
+    Returns {work folder: {'files': [(path, real path, size)], 'bytes': int, 'whole_folder': bool}}.
+    """
+    referenced = collect_references()
+    on_disk = scan_images()
+
+    files_per_folder = {}
+    for path in on_disk:
+        folder = work_folder(path)
+        files_per_folder[folder] = files_per_folder.get(folder, 0) + 1
+
+    orphans = {}
+    for path, (real_path, size) in sorted(on_disk.items()):
+        if path in referenced:
+            continue
+        if derivatives_only and not is_derivative(path):
+            continue
+        group = orphans.setdefault(work_folder(path), {'files': [], 'bytes': 0, 'whole_folder': False})
+        group['files'].append((path, real_path, size))
+        group['bytes'] += size
+
+    for folder, group in orphans.items():
+        group['whole_folder'] = len(group['files']) == files_per_folder.get(folder, 0)
+
+    return orphans
+
+
+def print_report(orphans, verbose=False):
+    """Print orphans grouped by work, largest first."""
+    total_files = sum(len(g['files']) for g in orphans.values())
+    total_bytes = sum(g['bytes'] for g in orphans.values())
+
+    if not orphans:
+        print("No orphaned files found.")
+        return
+
+    for folder, group in sorted(orphans.items(), key=lambda item: -item[1]['bytes']):
+        label = folder or '(images root)'
+        marker = '  [entire folder unreferenced]' if group['whole_folder'] else ''
+        print(f"{label}: {len(group['files'])} files, {format_bytes(group['bytes'])}{marker}")
+        if verbose:
+            for path, _, size in group['files']:
+                print(f"    {path} ({format_bytes(size)})")
+
+    print(f"\nSummary:")
+    print(f"Work folders with orphans: {len(orphans)}")
+    print(f"Orphaned files: {total_files}")
+    print(f"Reclaimable: {format_bytes(total_bytes)}")
+
+
+def archive_orphans(orphans, trash_dir):
+    """Move orphaned files into trash_dir, keeping their images/ layout."""
+    moved = 0
+    for group in orphans.values():
+        for path, real_path, _ in group['files']:
+            dest_path = os.path.join(trash_dir, path)
+            os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+            shutil.move(real_path, dest_path)
+            moved += 1
+
+    # Drop folders left empty by the move
+    for folder in orphans:
+        if not folder:
+            continue
+        for dirpath, _, _ in sorted(os.walk(os.path.join('images', folder)), reverse=True):
+            if not os.listdir(dirpath):
+                os.rmdir(dirpath)
+
+    print(f"\nMoved {moved} files to {trash_dir}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report or archive unreferenced files under images/")
+    parser.add_argument("--archive", nargs='?', const='', metavar='DIR',
+                        help="Move orphans to DIR (default: <trashDir>/orphans-<timestamp>)")
+    parser.add_argument("--derivatives-only", action='store_true',
+                        help="Only consider files in medium/ and thumbs/ folders")
+    parser.add_argument("-v", "--verbose", action='store_true', help="List every orphaned file")
+    args = parser.parse_args()
+
+    orphans = find_orphans(derivatives_only=args.derivatives_only)
+    print_report(orphans, verbose=args.verbose)
+
+    if args.archive is None:
+        if orphans:
+            print("\nDry run - nothing moved. Use --archive to move these files to the trash folder.")
+        return
+
+    destination = args.archive or os.path.join(trash_dir(), time.strftime('orphans-%Y%m%d-%H%M%S'))
+    archive_orphans(orphans, destination)
+
+
+if __name__ == '__main__':
+    main()
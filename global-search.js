@@ -1,6 +1,5 @@
 class GlobalSearch {
   constructor() {
-    this.searchIndex = [];
     this.searchInput = null;
     this.searchResults = null;
     this.searchFilters = null;
@@ -38,37 +37,73 @@ class GlobalSearch {
     this.loadSearchIndex();
   }
 
+  // Searching runs in search-worker.js: in a Web Worker where possible, otherwise in the page
   loadSearchIndex() {
-    // Edge-compatible version using XMLHttpRequest instead of fetch
-    const xhr = new XMLHttpRequest();
-    xhr.open('GET', 'search-index.json', true);
-    const self = this; // Edge compatibility: store 'this' reference
-    xhr.onreadystatechange = function() {
-      if (xhr.readyState === 4) {
-        if (xhr.status === 200) {
-          try {
-            const data = JSON.parse(xhr.responseText);
-            self.searchIndex = data.searchableContent;
-            self.setupEventListeners();
-            self.restoreSearchState();
-          } catch (error) {
-            console.error('Error parsing search index:', error);
-            self.showSearchError('Unable to load search data. Please refresh the page.');
-            self.searchIndex = [];
-          }
-        } else {
-          console.error('Error loading search index:', xhr.status, xhr.statusText);
-          self.showSearchError('Search is temporarily unavailable. Please try again later.');
-          self.searchIndex = [];
-        }
+    this.searchId = 0;
+    let worker = null;
+    if (typeof Worker !== 'undefined') {
+      try {
+        worker = new Worker('search-worker.js');
+      } catch (error) {
+        worker = null; // e.g. pages opened from file://
       }
+    }
+    if (!worker) {
+      this.loadSearchInPage();
+      return;
+    }
+    worker.onmessage = (e) => this.handleSearchMessage(e.data);
+    worker.onerror = (e) => {
+      console.error('Search worker failed, searching in the page instead:', e.message);
+      e.preventDefault();
+      worker.terminate();
+      this.loadSearchInPage();
     };
-    xhr.onerror = function() {
-      console.error('Network error loading search index');
-      self.showSearchError('Network error. Please check your connection and try again.');
-      self.searchIndex = [];
+    this.sendSearchMessage = (message) => worker.postMessage(message);
+    this.sendSearchMessage({ type: 'load' });
+  }
+
+  loadSearchInPage() {
+    const start = () => {
+      const engine = new SearchEngine((message) => this.handleSearchMessage(message));
+      this.sendSearchMessage = (message) => engine.receive(message);
+      this.sendSearchMessage({ type: 'load' });
     };
-    xhr.send();
+    if (typeof SearchEngine !== 'undefined') {
+      start();
+      return;
+    }
+    const script = document.createElement('script');
+    script.src = 'search-worker.js';
+    script.onload = start;
+    script.onerror = () => this.showSearchError('Search is temporarily unavailable. Please try again later.');
+    document.head.appendChild(script);
+  }
+
+  handleSearchMessage(message) {
+    if (message.type === 'ready') {
+      if (this.searchReady) return; // a restarted engine
+      this.searchReady = true;
+      this.setupEventListeners();
+      this.restoreSearchState();
+    } else if (message.type === 'error') {
+      this.showSearchError(message.message);
+    } else if (message.type === 'results' && message.id === this.searchId) {
+      this.currentResults = message.results;
+      this.displayResults(message.results, this.searchQuery);
+      this.saveSearchState();
+    } else if (message.type === 'data') {
+      this.refreshResults();
+    }
+  }
+
+  // Answered asynchronously by handleSearchMessage; answers to superseded queries are ignored
+  performSearch(query) {
+    this.searchId += 1;
+    this.searchQuery = query;
+    this.sendSearchMessage({
+      type: 'search', id: this.searchId, query, filters: this.currentFilters, lang: this.getCurrentLang()
+    });
   }
 
   showSearchError(message) {
@@ -165,7 +200,7 @@ class GlobalSearch {
   setupSearchInput(searchInput, searchResults) {
     if (!searchInput || !searchResults) return;
 
-    // Create a debounced search function to improve iOS performance
+    // Debounce coalesces the input/keyup events of one keystroke; the search itself runs off the main thread
     let searchTimeout;
     const debouncedSearch = (query) => {
       clearTimeout(searchTimeout);
@@ -184,10 +219,11 @@ class GlobalSearch {
           this.showFilters();
           this.performSearch(query);
         } else {
+          this.searchId += 1; // drop the answer to a query still in the worker
           this.hideFilters();
           this.hideResults();
         }
-      }, 150); // 150ms debounce for better iOS performance
+      }, 50);
     };
 
     // Primary input event (works on most browsers)
@@ -312,150 +348,17 @@ class GlobalSearch {
 
   // Normalize Icelandic characters for better searching
   normalizeIcelandic(text) {
-    const charMap = {
-      'á': 'a', 'à': 'a', 'ä': 'a', 'â': 'a',
-      'é': 'e', 'è': 'e', 'ë': 'e', 'ê': 'e',
-      'í': 'i', 'ì': 'i', 'ï': 'i', 'î': 'i',
-      'ó': 'o', 'ò': 'o', 'ö': 'o', 'ô': 'o',
-      'ú': 'u', 'ù': 'u', 'ü': 'u', 'û': 'u',
-      'ý': 'y', 'ÿ': 'y',
-      'þ': 'th', 'ð': 'd',
-      'æ': 'ae'
-    };
-    
-    return text.toLowerCase().replace(/[áàäâéèëêíìïîóòöôúùüûýÿþðæ]/g, char => charMap[char] || char);
-  }
-
-  // Calculate similarity between two strings (for fuzzy matching)
-  calculateSimilarity(str1, str2) {
-    const longer = str1.length > str2.length ? str1 : str2;
-    const shorter = str1.length > str2.length ? str2 : str1;
-    
-    if (longer.length === 0) return 1.0;
-    
-    const levenshteinDistance = this.levenshteinDistance(longer, shorter);
-    return (longer.length - levenshteinDistance) / longer.length;
+    // Fold table generated from slugs.py (fold-table.js) so search matches the Python tools
+    return foldIcelandic(text);
   }
 
-  // Levenshtein distance algorithm for fuzzy matching
-  levenshteinDistance(str1, str2) {
-    const matrix = [];
-    for (let i = 0; i <= str2.length; i++) {
-      matrix[i] = [i];
-    }
-    for (let j = 0; j <= str1.length; j++) {
-      matrix[0][j] = j;
-    }
-    for (let i = 1; i <= str2.length; i++) {
-      for (let j = 1; j <= str1.length; j++) {
-        if (str2.charAt(i - 1) === str1.charAt(j - 1)) {
-          matrix[i][j] = matrix[i - 1][j - 1];
-        } else {
-          matrix[i][j] = Math.min(
-            matrix[i - 1][j - 1] + 1,
-            matrix[i][j - 1] + 1,
-            matrix[i - 1][j] + 1
-          );
-        }
-      }
+  // Re-run the shown query once the vocabulary or passages have arrived
+  refreshResults() {
+    const query = this.getCurrentQuery();
+    if (query.length >= 2 && this.searchResults && this.searchResults.style.display === 'block') {
+      this.lastDisplayedQuery = null;
+      this.performSearch(query);
     }
-    return matrix[str2.length][str1.length];
-  }
-
-  performSearch(query) {
-    const queryLower = query.toLowerCase();
-    const queryNormalized = this.normalizeIcelandic(queryLower);
-    const queryWords = queryLower.split(' ').filter(word => word.length > 2);
-
-    const results = this.searchIndex
-      .filter(item => this.passesFilters(item))
-      .map(item => {
-        let score = 0;
-
-        // Get BOTH language titles for searching (bilingual search)
-        const titleEn = (typeof item.title === 'object' ? (item.title.en || '') : (item.title || '')).toLowerCase();
-        const titleIs = (typeof item.title === 'object' ? (item.title.is || '') : '').toLowerCase();
-        const titleEnNorm = this.normalizeIcelandic(titleEn);
-        const titleIsNorm = this.normalizeIcelandic(titleIs);
-
-        const contentLower = item.content.toLowerCase();
-        const contentNormalized = this.normalizeIcelandic(contentLower);
-
-        // Exact title match gets highest score - check BOTH languages
-        if (titleEn === queryLower || titleIs === queryLower ||
-            titleEnNorm === queryNormalized || titleIsNorm === queryNormalized) {
-          score += 1000;
-        } else if (titleEn.includes(queryLower) || titleIs.includes(queryLower) ||
-                   titleEnNorm.includes(queryNormalized) || titleIsNorm.includes(queryNormalized)) {
-          score += 500;
-        }
-
-        // Fuzzy title matching for typos - check both languages, use best score
-        const titleEnSimilarity = this.calculateSimilarity(titleEnNorm, queryNormalized);
-        const titleIsSimilarity = this.calculateSimilarity(titleIsNorm, queryNormalized);
-        const bestTitleSimilarity = Math.max(titleEnSimilarity, titleIsSimilarity);
-        if (bestTitleSimilarity > 0.7 && bestTitleSimilarity < 1) {
-          score += Math.floor(bestTitleSimilarity * 300);
-        }
-
-        // Exact content phrase match
-        if (contentLower.includes(queryLower) || contentNormalized.includes(queryNormalized)) {
-          score += 200;
-        }
-
-        // Significant word matches in title (avoid common words)
-        const significantWords = queryWords.filter(word =>
-          !['the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'have', 'it', 'my', 'i'].includes(word)
-        );
-
-        significantWords.forEach(word => {
-          if (word.length > 3) { // Only meaningful words
-            const wordNormalized = this.normalizeIcelandic(word);
-
-            // Regular matches - check both language titles
-            if (titleEn.includes(word) || titleIs.includes(word) ||
-                titleEnNorm.includes(wordNormalized) || titleIsNorm.includes(wordNormalized)) {
-              score += 50;
-            }
-            if (contentLower.includes(word) || contentNormalized.includes(wordNormalized)) {
-              score += 20;
-            }
-
-            // Fuzzy word matching against both language titles
-            const allTitleWords = (titleEnNorm + ' ' + titleIsNorm).split(' ');
-            const contentWords = contentNormalized.split(' ');
-
-            allTitleWords.forEach(titleWord => {
-              if (!titleWord) return;
-              const similarity = this.calculateSimilarity(titleWord, wordNormalized);
-              if (similarity > 0.75 && similarity < 1) {
-                score += Math.floor(similarity * 30);
-              }
-            });
-
-            contentWords.forEach(contentWord => {
-              const similarity = this.calculateSimilarity(contentWord, wordNormalized);
-              if (similarity > 0.75 && similarity < 1) {
-                score += Math.floor(similarity * 15);
-              }
-            });
-          }
-        });
-
-        // Year matches
-        if (query.match(/^\d{4}$/) && item.year.toString() === query) {
-          score += 100;
-        }
-
-        return { ...item, score };
-      })
-      .filter(item => item.score > 0)
-      .sort((a, b) => b.score - a.score)
-      .slice(0, 8); // Limit to 8 results
-
-    this.currentResults = results;
-    this.displayResults(results, query);
-    this.saveSearchState();
   }
 
   displayResults(results, query) {
@@ -499,7 +402,7 @@ class GlobalSearch {
               ${result.year ? `<div class="search-result-year">${result.year}</div>` : ''}
             </div>
             <div class="search-result-title" style="pointer-events: none;">${this.highlightQueryAdvanced(this.getLocalizedTitle(result.title), query)}</div>
-            <div class="search-result-snippet" style="pointer-events: none;">${this.highlightQueryAdvanced(this.getLocalizedValue(result.snippet, ''), query)}</div>
+            <div class="search-result-snippet" style="pointer-events: none;">${result.passage || this.highlightQueryAdvanced(this.getLocalizedValue(result.snippet, ''), query)}</div>
             <div class="search-result-meta" style="pointer-events: none;">
               <span class="search-result-page">${this.getPageLabel(result.type, result.page)}</span>
               ${result.score ? `<span class="search-result-relevance">${isIcelandic ? 'Samsvörun' : 'Relevance'}: ${Math.round(result.score/10)}/100</span>` : ''}
@@ -628,6 +531,7 @@ class GlobalSearch {
     if (this.searchInputDesktop) this.searchInputDesktop.value = '';
 
     // Clear results
+    this.searchId += 1;
     this.currentResults = [];
     this.hideResults();
     this.hideFilters();
@@ -636,55 +540,6 @@ class GlobalSearch {
     sessionStorage.removeItem('globalSearchState');
   }
 
-  passesFilters(item) {
-    // Type filter
-    if (this.currentFilters.type !== 'all') {
-      if (this.currentFilters.type === 'exhibition') {
-        if (!item.type.includes('exhibition')) return false;
-      } else if (this.currentFilters.type === 'collection') {
-        if (item.type !== 'collections' && item.type !== 'collection-work') return false;
-      } else if (this.currentFilters.type === 'work') {
-        if (item.type !== 'work') return false;
-      }
-    }
-
-    // Year filter
-    if (item.year && item.year > this.currentFilters.year) return false;
-
-    // Medium filter (based on content keywords)
-    if (this.currentFilters.medium !== 'all') {
-      const contentLower = item.content.toLowerCase();
-      const mediumMap = {
-        'sculpture': ['sculpture', 'sculptural'],
-        'sound': ['sound', 'audio', 'voice', 'poetry'],
-        'installation': ['installation', 'mixed media'],
-        'performance': ['performance', 'body']
-      };
-      
-      const mediumKeywords = mediumMap[this.currentFilters.medium];
-      if (mediumKeywords && !mediumKeywords.some(keyword => contentLower.includes(keyword))) {
-        return false;
-      }
-    }
-
-    // Institution filter (based on content keywords)
-    if (this.currentFilters.institution !== 'all') {
-      const contentLower = item.content.toLowerCase();
-      const institutionMap = {
-        'living-art': ['living art museum', 'nýlistasafnið'],
-        'national-gallery': ['national gallery', 'listasafn íslands'],
-        'reykjavik-art': ['reykjavik art museum', 'reykjavík art museum', 'hafnarhús', 'kjarvalstaðir']
-      };
-      
-      const institutionKeywords = institutionMap[this.currentFilters.institution];
-      if (institutionKeywords && !institutionKeywords.some(keyword => contentLower.includes(keyword))) {
-        return false;
-      }
-    }
-
-    return true;
-  }
-
   clearAllFilters() {
     // Reset filter state
     this.currentFilters = {
@@ -16,10 +16,30 @@ class I18n {
     this.initialized = true;
   }
 
+  // Page name for the string bundle: works.html -> works, / -> index
+  pageName() {
+    const file = window.location.pathname.split('/').pop();
+    return file ? file.replace(/\.html$/, '') : 'index';
+  }
+
+  // Just the UI strings this page uses (built by ui_strings.py); the full
+  // file, with the legacy works map, only if the page has no bundle yet
+  async fetchTranslations(lang) {
+    try {
+      const response = await fetch(`translations/pages/${this.pageName()}-${lang}.json`);
+      if (response.ok) return await response.json();
+    } catch (error) {
+      // fall through to the full file
+    }
+    const response = await fetch(`translations/${lang}.json`);
+    const translations = await response.json();
+    translations.exhibitions = true;
+    return translations;
+  }
+
   async loadTranslations(lang) {
     try {
-      const response = await fetch(`translations/${lang}.json`);
-      this.translations = await response.json();
+      this.translations = await this.fetchTranslations(lang);
       this.currentLang = lang;
       localStorage.setItem('language', lang);
       this.updateHtmlLang();
@@ -36,6 +56,11 @@ class I18n {
   }
 
   async loadExhibitionsTranslations(lang) {
+    if (!this.translations.exhibitions) {
+      // This page does not render exhibitions
+      this.exhibitionsTranslations = { ui: {}, solo: [], group: [] };
+      return true;
+    }
     try {
       // Load single bilingual exhibitions.json file if not already loaded
       if (!this.exhibitionsData) {
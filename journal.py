@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""
+Record-level change journal for works.json and exhibitions.json.
+
+Every save through the WorksStore appends one line per changed file to the
+journal (.journal.jsonl by default, see toolkit.json). The line holds the
+time, the command that made the change, the RFC 6902 JSON Patch that turns
+the old file into the new one, and, per work or exhibition touched, the patch
+that undoes it. Tools that keep derived data can read just the changed paths
+(changed_ids) instead of diffing whole files, and a bad run can be reverted
+record by record: `revert` undoes one entry for every record that has not
+been changed again since, and refuses (or with --force skips) the others.
+
+Usage:
+  python journal.py log [-n 20]          - Recent entries, newest last
+  python journal.py show ENTRY           - The JSON Patch of one entry
+  python journal.py revert ENTRY         - Undo one entry (refuses if its records changed since)
+  python journal.py revert ENTRY --force - Undo what can be undone, skipping conflicts
+"""
+
+import argparse
+import copy
+import json
+import os
+import sys
+import time
+from difflib import SequenceMatcher
+
+from settings import setting
+
+_command = None
+
+
+class JournalError(Exception):
+    pass
+
+
+def set_command(name):
+    """Name recorded with the following saves (default: the script's command line)."""
+    global _command
+    _command = name
+
+
+def current_command():
+    return _command or ' '.join([os.path.basename(sys.argv[0])] + sys.argv[1:])
+
+
+# ---------------------------------------------------------------------------
+# JSON Patch (RFC 6902)
+
+def _escape(key):
+    return str(key).replace('~', '~0').replace('/', '~1')
+
+
+def _unescape(token):
+    return token.replace('~1', '/').replace('~0', '~')
+
+
+def _list_key(item):
+    if isinstance(item, dict) and 'id' in item:
+        return ('id', json.dumps(item['id']))
+    return ('value', json.dumps(item, sort_keys=True, ensure_ascii=False))
+
+
+def _diff(old, new, path, ops):
+    if old == new:
+        return
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key in old:
+            if key not in new:
+                ops.append({'op': 'remove', 'path': f"{path}/{_escape(key)}"})
+        for key, value in new.items():
+            if key not in old:
+                ops.append({'op': 'add', 'path': f"{path}/{_escape(key)}", 'value': value})
+            else:
+                _diff(old[key], value, f"{path}/{_escape(key)}", ops)
+    elif isinstance(old, list) and isinstance(new, list):
+        _diff_list(old, new, path, ops)
+    else:
+        ops.append({'op': 'replace', 'path': path, 'value': new})
+
+
+def _diff_list(old, new, path, ops):
+    """Records with ids are matched by id, so inserting one work does not rewrite every later one."""
+    has_ids = any(isinstance(item, dict) and 'id' in item for item in old + new)
+    if not has_ids and len(old) == len(new):
+        for i, (a, b) in enumerate(zip(old, new)):
+            _diff(a, b, f"{path}/{i}", ops)
+        return
+    matcher = SequenceMatcher(None, [_list_key(x) for x in old], [_list_key(x) for x in new], autojunk=False)
+    shift = 0  # positions gained or lost by the ops emitted so far
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            for k in range(i2 - i1):
+                _diff(old[i1 + k], new[j1 + k], f"{path}/{i1 + k + shift}", ops)
+            continue
+        for _ in range(i2 - i1):
+            ops.append({'op': 'remove', 'path': f"{path}/{i1 + shift}"})
+        for k in range(j2 - j1):
+            ops.append({'op': 'add', 'path': f"{path}/{i1 + shift + k}", 'value': new[j1 + k]})
+        shift += (j2 - j1) - (i2 - i1)
+
+
+def diff(old, new):
+    """RFC 6902 operations turning old into new."""
+    ops = []
+    _diff(old, new, '', ops)
+    return ops
+
+
+def apply_patch(doc, ops):
+    """Apply RFC 6902 add/remove/replace/test operations to a copy of doc; returns the copy."""
+    doc = copy.deepcopy(doc)
+    for op in ops:
+        tokens = [_unescape(t) for t in op['path'].split('/')[1:]]
+        if not tokens:
+            if op['op'] == 'test':
+                if doc != op['value']:
+                    raise JournalError("test failed at the document root")
+                continue
+            doc = copy.deepcopy(op['value'])
+            continue
+        parent = doc
+        try:
+            for token in tokens[:-1]:
+                parent = parent[int(token)] if isinstance(parent, list) else parent[token]
+            last = tokens[-1]
+            if isinstance(parent, list):
+                index = len(parent) if last == '-' else int(last)
+                if op['op'] == 'add':
+                    parent.insert(index, copy.deepcopy(op['value']))
+                elif op['op'] == 'remove':
+                    del parent[index]
+                elif op['op'] == 'replace':
+                    parent[index] = copy.deepcopy(op['value'])
+                elif parent[index] != op['value']:
+                    raise JournalError(f"test failed at {op['path']}")
+            else:
+                if op['op'] in ('add', 'replace'):
+                    if op['op'] == 'replace' and last not in parent:
+                        raise KeyError(last)
+                    parent[last] = copy.deepcopy(op['value'])
+                elif op['op'] == 'remove':
+                    del parent[last]
+                elif parent[last] != op['value']:
+                    raise JournalError(f"test failed at {op['path']}")
+        except (KeyError, IndexError, ValueError, TypeError):
+            raise JournalError(f"cannot {op['op']} {op['path']}")
+    return doc
+
+
+# ---------------------------------------------------------------------------
+# Journal entries
+
+def journal_path():
+    return setting('journalFile')
+
+
+def _record_lists(doc):
+    """List name -> list, for the top-level lists of records with ids (works, solo, group)."""
+    return {key: value for key, value in doc.items()
+            if isinstance(value, list) and all(isinstance(item, dict) and 'id' in item for item in value)}
+
+
+def _rest(doc):
+    lists = _record_lists(doc)
+    return {key: value for key, value in doc.items() if key not in lists}
+
+
+def _records(doc):
+    """(list name, id) -> (position, record); the first record wins on duplicate ids."""
+    index = {}
+    for name, items in _record_lists(doc).items():
+        for position, item in enumerate(items):
+            index.setdefault((name, item['id']), (position, item))
+    return index
+
+
+def record_changes(old, new):
+    """Per-record undo information between two versions of a file."""
+    from store import record_version
+    before, after = _records(old), _records(new)
+    changes = []
+    for key in sorted(before.keys() | after.keys(), key=lambda k: (k[0], str(k[1]))):
+        (old_pos, old_rec), (_, new_rec) = before.get(key, (None, None)), after.get(key, (None, None))
+        if old_rec == new_rec:
+            continue
+        change = {'list': key[0], 'id': key[1]}
+        if new_rec is None:
+            change.update(removed=True, index=old_pos, value=old_rec)
+        elif old_rec is None:
+            change.update(added=True, version=record_version(new_rec))
+        else:
+            change.update(version=record_version(new_rec), revert=diff(new_rec, old_rec))
+        changes.append(change)
+    return changes
+
+
+def record(path, new_doc, old_doc=None, command=None):
+    """Append the change from old_doc (default: the file on disk) to new_doc; returns the entry or None."""
+    if old_doc is None:
+        from data_cache import load_json
+        old_doc = load_json(path) if os.path.exists(path) else {}
+    patch = diff(old_doc, new_doc)
+    if not patch:
+        return None
+    now = time.time()
+    entry = {
+        'id': f"{time.strftime('%Y%m%d-%H%M%S', time.localtime(now))}{int(now % 1 * 1000):03d}",
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(now)),
+        'command': command or current_command(),
+        'file': path,
+        'patch': patch,
+        'records': record_changes(old_doc, new_doc),
+        'revert_other': diff(_rest(new_doc), _rest(old_doc)),
+    }
+    with open(journal_path(), 'a', encoding='utf-8') as f:
+        f.write(json.dumps(entry, ensure_ascii=False, separators=(',', ':')) + '\n')
+    return entry
+
+
+def read_entries():
+    try:
+        with open(journal_path(), 'r', encoding='utf-8') as f:
+            return [json.loads(line) for line in f if line.strip()]
+    except FileNotFoundError:
+        return []
+
+
+def find_entry(ref, entries=None):
+    """Entry by id, unique id prefix or `last`."""
+    entries = read_entries() if entries is None else entries
+    if not entries:
+        raise JournalError('the journal is empty')
+    if ref == 'last':
+        return entries[-1]
+    matches = [e for e in entries if e['id'].startswith(ref)]
+    if len(matches) != 1:
+        raise JournalError(f"{ref} matches {len(matches)} journal entries")
+    return matches[0]
+
+
+def changed_ids(since=None):
+    """{file: {(list name, id), ...}} touched by the entries after the entry `since` (all if None)."""
+    entries = read_entries()
+    if since is not None:
+        entries = entries[entries.index(find_entry(since, entries)) + 1:]
+    changed = {}
+    for entry in entries:
+        changed.setdefault(entry['file'], set()).update((c['list'], c['id']) for c in entry['records'])
+    return changed
+
+
+def revert(ref, store=None, force=False):
+    """Undo one journal entry record by record; returns (reverted, conflicts) as lists of ids."""
+    from store import WorksStore, record_version
+    entry = find_entry(ref)
+    store = store or WorksStore()
+    works_file = entry['file'] == store.works_path
+    if not works_file and entry['file'] != store.exhibitions_path:
+        raise JournalError(f"{entry['file']} is not managed by the store")
+    doc = store.data if works_file else store.exhibitions_data
+
+    current = _records(doc)
+    reverted, conflicts, actions = [], [], []
+    for change in entry['records']:
+        key = (change['list'], change['id'])
+        position, record_now = current.get(key, (None, None))
+        if change.get('removed'):
+            ok = record_now is None
+        else:
+            ok = record_now is not None and record_version(record_now) == change['version']
+        if not ok:
+            conflicts.append(change['id'])
+            continue
+        actions.append((change, record_now))
+        reverted.append(change['id'])
+
+    try:
+        other = apply_patch(_rest(doc), entry['revert_other'])
+    except JournalError:
+        other = None
+        conflicts.append('(fields outside the record lists)')
+    if conflicts and not force:
+        raise JournalError(f"changed again since {entry['id']}: {', '.join(map(str, conflicts))} "
+                           f"(use --force to revert the rest)")
+
+    for change, record_now in actions:
+        items = doc[change['list']] if change['list'] in doc else doc.setdefault(change['list'], [])
+        if change.get('removed'):
+            items.insert(min(change['index'], len(items)), change['value'])
+        elif change.get('added'):
+            items.remove(record_now)
+        else:
+            items[items.index(record_now)] = apply_patch(record_now, change['revert'])
+    if other is not None:
+        doc.update(other)
+
+    set_command(f"journal revert {entry['id']}")
+    store.changed(works=works_file, exhibitions=not works_file)
+    store.save()
+    return reverted, conflicts
+
+
+# ---------------------------------------------------------------------------
+# Command line
+
+def print_log(limit):
+    for entry in read_entries()[-limit:]:
+        records = entry['records']
+        shown = ', '.join(str(c['id']) for c in records[:4]) + (' ...' if len(records) > 4 else '')
+        print(f"{entry['id']}  {entry['file']:17} {len(entry['patch']):5} ops  "
+              f"{len(records):3} records  {entry['command']}{'  [' + shown + ']' if records else ''}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Change journal of works.json and exhibitions.json")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    log_parser = subparsers.add_parser('log', help='Recent entries')
+    log_parser.add_argument('-n', type=int, default=20, help='How many (default: 20)')
+    show_parser = subparsers.add_parser('show', help='Print the JSON Patch of one entry')
+    show_parser.add_argument('entry')
+    revert_parser = subparsers.add_parser('revert', help='Undo one entry')
+    revert_parser.add_argument('entry')
+    revert_parser.add_argument('--force', action='store_true', help='Skip records changed again since')
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == 'log':
+            print_log(args.n)
+        elif args.command == 'show':
+            print(json.dumps(find_entry(args.entry)['patch'], indent=2, ensure_ascii=False))
+        else:
+            reverted, conflicts = revert(args.entry, force=args.force)
+            print(f"Reverted {len(reverted)} records" +
+                  (f"; skipped {len(conflicts)} changed since: {', '.join(map(str, conflicts))}" if conflicts else ''))
+    except JournalError as e:
+        print(f"ERROR: {e}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
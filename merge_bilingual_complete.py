@@ -5,16 +5,13 @@ Merge bilingual works (titles, descriptions) with bilingual exhibitions
 
 import json
 
+from store import WorksStore
+
 def load_json(filepath):
     """Load JSON file with UTF-8 encoding"""
     with open(filepath, 'r', encoding='utf-8') as f:
         return json.load(f)
 
-def save_json(filepath, data):
-    """Save JSON file with UTF-8 encoding"""
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
-
 def main():
     print("Merging bilingual titles with bilingual exhibitions...")
 
@@ -35,7 +32,9 @@ def main():
 
     # Save result
     print("Saving merged works.json...")
-    save_json('works.json', bilingual_works)
+    store = WorksStore()
+    store.replace_document(store.works_path, bilingual_works)
+    store.save()
 
     print("\nMerge complete!")
     print(f"Total works: {len(bilingual_works['works'])}")
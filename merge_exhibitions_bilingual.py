@@ -2,21 +2,39 @@
 """
 Merge exhibitions-en.json and exhibitions-is.json into single bilingual exhibitions.json
 with unique IDs for each exhibition.
+
+works.json refers to exhibitions by id, so an exhibition already in
+exhibitions.json (same list, English title and year) keeps its id; only new
+exhibitions get one from slugify().
 """
 
 import json
-import re
-
-def generate_exhibition_id(title, year):
-    """Generate a unique ID from title and year"""
-    # Take English title, lowercase, remove special chars, replace spaces with hyphens
-    id_base = re.sub(r'[^\w\s-]', '', title.lower())
-    id_base = re.sub(r'\s+', '-', id_base.strip())
-    # Remove multiple hyphens
-    id_base = re.sub(r'-+', '-', id_base)
-    # Limit length and add year
-    id_base = id_base[:50].strip('-')
-    return f"{id_base}-{year}"
+
+from slugs import IdRegistry, slugify
+from store import WorksStore
+
+def generate_exhibition_id(title, year, registry, existing=None):
+    """Reuse the id of the same exhibition in exhibitions.json, else generate a unique one from title and year"""
+    ids = (existing or {}).get((title, str(year)))
+    if ids:
+        return ids.pop(0)
+    return registry.claim(f"{slugify(title, max_length=50)}-{year}", 'exhibition')
+
+def existing_exhibition_ids(path='exhibitions.json'):
+    """{list name: {(English title, year): [ids in file order]}} from the current exhibitions.json"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return {}
+    existing = {}
+    for kind in ('solo', 'group'):
+        for exhibition in data.get(kind, []):
+            title = exhibition.get('title')
+            title = title.get('en', '') if isinstance(title, dict) else title or ''
+            if exhibition.get('id'):
+                existing.setdefault(kind, {}).setdefault((title, str(exhibition.get('year', ''))), []).append(exhibition['id'])
+    return existing
 
 def merge_exhibitions():
     """Merge EN and IS exhibition files into bilingual format with IDs"""
@@ -28,6 +46,18 @@ def merge_exhibitions():
     with open('translations/exhibitions-is.json', 'r', encoding='utf-8') as f:
         is_ex = json.load(f)
 
+    # Work ids and the ids being kept are registered first so new exhibition ids never shadow them
+    registry = IdRegistry()
+    with open('works.json', 'r', encoding='utf-8') as f:
+        for work in json.load(f)['works']:
+            if isinstance(work, dict) and work.get('id'):
+                registry.add(work['id'], 'work')
+    existing = existing_exhibition_ids()
+    for kind, ids_by_key in existing.items():
+        for ids in ids_by_key.values():
+            for exhibition_id in ids:
+                registry.add(exhibition_id, f"{kind}-exhibition")
+
     # Create bilingual exhibitions
     bilingual = {
         "ui": {
@@ -46,7 +76,8 @@ def merge_exhibitions():
             print(f"  WARNING: Year mismatch - EN:{en_item.get('year')} IS:{is_item.get('year')}")
 
         # Generate ID
-        exhibition_id = generate_exhibition_id(en_item.get("title", ""), en_item.get("year", ""))
+        exhibition_id = generate_exhibition_id(en_item.get("title", ""), en_item.get("year", ""), registry,
+                                               existing.get("solo"))
 
         exhibition = {
             "id": exhibition_id,
@@ -79,7 +110,8 @@ def merge_exhibitions():
             print(f"  WARNING: Year mismatch - EN:{en_item.get('year')} IS:{is_item.get('year')}")
 
         # Generate ID
-        exhibition_id = generate_exhibition_id(en_item.get("title", ""), en_item.get("year", ""))
+        exhibition_id = generate_exhibition_id(en_item.get("title", ""), en_item.get("year", ""), registry,
+                                               existing.get("group"))
 
         exhibition = {
             "id": exhibition_id,
@@ -104,9 +136,17 @@ def merge_exhibitions():
 
         bilingual["group"].append(exhibition)
 
-    # Save bilingual exhibitions.json
-    with open('exhibitions.json', 'w', encoding='utf-8') as f:
-        json.dump(bilingual, f, indent=2, ensure_ascii=False)
+    # Exhibitions edited in exhibitions.json since the translation files were written do not match
+    unmatched = sorted(exhibition_id for ids_by_key in existing.values() for ids in ids_by_key.values()
+                       for exhibition_id in ids)
+    if unmatched:
+        print(f"  WARNING: {len(unmatched)} ids in exhibitions.json have no matching translation entry "
+              f"and are dropped; works.json references to them will break: {', '.join(unmatched)}")
+
+    # Save bilingual exhibitions.json through the store (atomic, and journalled)
+    store = WorksStore()
+    store.replace_document(store.exhibitions_path, bilingual)
+    store.save()
 
     print(f"\n✓ Created exhibitions.json")
     print(f"  Solo: {len(bilingual['solo'])} exhibitions")
@@ -6,16 +6,13 @@ Migrate exhibitions in works.json to bilingual format by matching with exhibitio
 import json
 from pathlib import Path
 
+from store import WorksStore
+
 def load_json(filepath):
     """Load JSON file with UTF-8 encoding"""
     with open(filepath, 'r', encoding='utf-8') as f:
         return json.load(f)
 
-def save_json(filepath, data):
-    """Save JSON file with UTF-8 encoding"""
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
-
 def normalize_title(title):
     """Normalize title for matching - remove bilingual parts in parentheses and extra whitespace"""
     # Remove content in parentheses that looks like translations
@@ -169,9 +166,9 @@ def main():
     works_data = load_json('works.json')
     print(f"Loaded {len(works_data['works'])} works")
 
-    # Backup original
-    print("\nCreating backup...")
-    save_json('backups/works.json.pre-bilingual-exhibitions', works_data)
+    # Snapshot (undo with: python snapshots.py restore latest)
+    from snapshots import take
+    take('before migrate_exhibitions_bilingual')
 
     # Migrate
     print("\nMigrating exhibitions...")
@@ -179,7 +176,9 @@ def main():
 
     # Save result
     print("\nSaving updated works.json...")
-    save_json('works.json', works_data)
+    store = WorksStore()
+    store.replace_document(store.works_path, works_data)
+    store.save()
 
     print(f"\nMigration complete!")
     print(f"  Matched exhibitions: {matched}")
@@ -0,0 +1,455 @@
+#!/usr/bin/env python3
+"""
+Typed, slot-based model of works.json and exhibitions.json.
+
+normalise_works() upgrades every legacy shape once on load - plain-string
+titles, descriptions and captions, list or string materials, `thumb` instead
+of `thumbnail`, `city` instead of `location` - so consumers read canonical
+bilingual fields without type checks. Unknown keys are kept in `extra` and the
+original key order is remembered, so to_dict() writes records back unchanged
+apart from the upgraded shapes.
+
+Usage:
+  python models.py                     - Report legacy shapes still in works.json
+  python models.py --write-canonical   - Rewrite works.json in canonical form
+"""
+
+import json
+import sys
+from dataclasses import dataclass, field
+
+from data_cache import load_json
+from years import YearRange, parse_year
+
+LANGS = ('en', 'is')
+
+
+@dataclass(slots=True)
+class Text:
+    """Bilingual string; languages beyond en/is are kept in `other`."""
+    en: str = ''
+    is_: str = ''
+    other: dict = None
+
+    @classmethod
+    def from_value(cls, value):
+        if isinstance(value, cls):
+            return value
+        if isinstance(value, dict):
+            other = {k: v for k, v in value.items() if k not in LANGS} or None
+            return cls(value.get('en') or '', value.get('is') or '', other)
+        if value is None:
+            return cls()
+        return cls(str(value), str(value))
+
+    def get(self, lang='en'):
+        """Value in lang, falling back to the other language when empty."""
+        if lang == 'is':
+            return self.is_ or self.en
+        if lang == 'en':
+            return self.en or self.is_
+        return (self.other or {}).get(lang) or self.en or self.is_
+
+    def value(self, lang):
+        """Value in lang as stored, without falling back."""
+        if lang in LANGS:
+            return self.en if lang == 'en' else self.is_
+        return (self.other or {}).get(lang) or ''
+
+    def set(self, lang, value):
+        if lang in LANGS:
+            setattr(self, 'en' if lang == 'en' else 'is_', value)
+        else:
+            self.other = {**(self.other or {}), lang: value}
+
+    def __bool__(self):
+        return bool(self.en or self.is_)
+
+    def to_dict(self):
+        data = {'en': self.en, 'is': self.is_}
+        if self.other:
+            data.update(self.other)
+        return data
+
+
+@dataclass(slots=True)
+class TextList:
+    """Bilingual list of terms (materials, medium)."""
+    en: list = field(default_factory=list)
+    is_: list = field(default_factory=list)
+
+    @classmethod
+    def from_value(cls, value):
+        if isinstance(value, cls):
+            return value
+        if isinstance(value, dict):
+            return cls(_as_list(value.get('en')), _as_list(value.get('is')))
+        terms = _as_list(value)
+        return cls(terms, list(terms))
+
+    def get(self, lang='en'):
+        if lang == 'is':
+            return self.is_ or self.en
+        return self.en or self.is_
+
+    def value(self, lang):
+        """Terms in lang as stored, without falling back."""
+        return self.is_ if lang == 'is' else self.en
+
+    def set(self, lang, terms):
+        setattr(self, 'is_' if lang == 'is' else 'en', list(terms))
+
+    def __bool__(self):
+        return bool(self.en or self.is_)
+
+    def to_dict(self):
+        return {'en': self.en, 'is': self.is_}
+
+
+def _is_text(value):
+    """A Text as stored: a string, or a dict of language -> string."""
+    return isinstance(value, str) or (isinstance(value, dict) and all(isinstance(v, str) for v in value.values()))
+
+
+def _is_strings(value):
+    return isinstance(value, list) and all(isinstance(v, str) for v in value)
+
+
+def _is_terms(value):
+    """A TextList as stored: a list of strings, or a dict of language -> list of strings."""
+    return _is_strings(value) or (isinstance(value, dict) and all(_is_strings(v) for v in value.values()))
+
+
+def _is_year(value):
+    return value is None or (isinstance(value, (int, str)) and not isinstance(value, bool))
+
+
+def _problems(data, checks):
+    """Messages for fields of data that fail their (check, required, expected) entry in checks."""
+    problems = []
+    for key, (check, required, expected) in checks.items():
+        if key not in data:
+            if required:
+                problems.append(f"{key} is missing")
+        elif not check(data[key]):
+            problems.append(f"{key} must be {expected}, not {json.dumps(data[key], ensure_ascii=False)[:60]}")
+    return problems
+
+
+def _as_list(value):
+    if not value:
+        return []
+    if isinstance(value, list):
+        return [str(v) for v in value]
+    return [v.strip() for v in str(value).split(',') if v.strip()]
+
+
+@dataclass(slots=True)
+class Image:
+    url: str
+    caption: Text
+    thumbnail: str = None
+    photographer: str = None
+    year: str = None
+    extra: dict = None
+    keys: tuple = ()
+
+    FIELDS = {'url', 'caption', 'thumbnail', 'thumb', 'photographer', 'year'}
+
+    @classmethod
+    def from_dict(cls, data):
+        extra = {k: v for k, v in data.items() if k not in cls.FIELDS} or None
+        keys = tuple('thumbnail' if k == 'thumb' else k for k in data)
+        return cls(
+            url=data.get('url', ''),
+            caption=Text.from_value(data.get('caption')),
+            thumbnail=data.get('thumbnail') or data.get('thumb'),
+            photographer=data.get('photographer'),
+            year=data.get('year'),
+            extra=extra,
+            keys=keys,
+        )
+
+    def to_dict(self):
+        values = {
+            'url': self.url,
+            'caption': self.caption.to_dict(),
+            'thumbnail': self.thumbnail,
+            'photographer': self.photographer,
+            'year': self.year,
+        }
+        return _ordered(self.keys, values, self.extra, required=('url', 'caption'))
+
+
+@dataclass(slots=True)
+class Exhibition:
+    id: str
+    year: object
+    title: Text
+    venue: Text
+    location: str = ''
+    notes: Text = None
+    year_start: int = None
+    year_end: int = None
+    year_display: str = None
+    extra: dict = None
+    keys: tuple = ()
+
+    FIELDS = {'id', 'year', 'yearStart', 'yearEnd', 'yearDisplay', 'title', 'venue', 'location', 'city', 'notes'}
+
+    @staticmethod
+    def problems(data):
+        """Why data cannot be stored as an exhibition (wrong types, missing fields); empty if it can."""
+        return _problems(data, {
+            'id': (lambda v: isinstance(v, str) and v.strip() != '', True, 'a non-empty string'),
+            'year': (_is_year, True, 'a number or a string'),
+            'title': (_is_text, True, 'a string or {"en": ..., "is": ...}'),
+            'venue': (_is_text, True, 'a string or {"en": ..., "is": ...}'),
+            'location': (lambda v: isinstance(v, str), False, 'a string'),
+            'notes': (_is_text, False, 'a string or {"en": ..., "is": ...}'),
+        })
+
+    @classmethod
+    def from_dict(cls, data):
+        extra = {k: v for k, v in data.items() if k not in cls.FIELDS} or None
+        keys = tuple('location' if k == 'city' else k for k in data)
+        notes = data.get('notes')
+        return cls(
+            id=data.get('id'),
+            year=data.get('year'),
+            title=Text.from_value(data.get('title')),
+            venue=Text.from_value(data.get('venue')),
+            location=data.get('location') or data.get('city') or '',
+            notes=Text.from_value(notes) if notes else None,
+            year_start=data.get('yearStart'),
+            year_end=data.get('yearEnd'),
+            year_display=data.get('yearDisplay'),
+            extra=extra,
+            keys=keys,
+        )
+
+    @property
+    def years(self):
+        """YearRange of `year`: the stored yearStart/yearEnd/yearDisplay, or parsed when they are missing."""
+        if self.year_display is None:
+            return parse_year(self.year)
+        return YearRange(self.year_start, self.year_end, self.year_display)
+
+    def to_dict(self):
+        values = {
+            'id': self.id,
+            'year': self.year,
+            'yearStart': self.year_start,
+            'yearEnd': self.year_end,
+            'yearDisplay': self.year_display,
+            'title': self.title.to_dict(),
+            'venue': self.venue.to_dict(),
+            'location': self.location,
+            'notes': self.notes.to_dict() if self.notes else None,
+        }
+        return _ordered(self.keys, values, self.extra, required=('title', 'venue'))
+
+
+@dataclass(slots=True)
+class Work:
+    id: str
+    title: Text
+    year: object
+    description: Text
+    images: list
+    tags: list
+    exhibitions: list          # exhibition id strings or inline Exhibition records
+    materials: TextList
+    medium: TextList
+    category: list
+    dimensions: str = None
+    ownership: dict = None
+    content_status: str = None
+    media_status: str = None
+    search_text: str = None
+    year_start: int = None     # yearStart/yearEnd/yearDisplay: `year` parsed by years.py at build time
+    year_end: int = None
+    year_display: str = None
+    extra: dict = None
+    keys: tuple = ()
+
+    # JSON key -> attribute for fields that are not spelled the same
+    RENAMED = {'contentStatus': 'content_status', 'mediaStatus': 'media_status', 'searchText': 'search_text',
+               'yearStart': 'year_start', 'yearEnd': 'year_end', 'yearDisplay': 'year_display'}
+    FIELDS = {'id', 'title', 'year', 'description', 'images', 'tags', 'exhibitions', 'materials',
+              'medium', 'category', 'dimensions', 'ownership', 'contentStatus', 'mediaStatus', 'searchText',
+              'yearStart', 'yearEnd', 'yearDisplay'}
+
+    @staticmethod
+    def problems(data):
+        """Why data cannot be stored as a work (wrong types, missing fields); empty if it can."""
+        problems = _problems(data, {
+            'id': (lambda v: isinstance(v, str) and v.strip() != '', True, 'a non-empty string'),
+            'title': (_is_text, True, 'a string or {"en": ..., "is": ...}'),
+            'year': (_is_year, True, 'a number, a string or null'),
+            'description': (_is_text, True, 'a string or {"en": ..., "is": ...}'),
+            'images': (lambda v: isinstance(v, list) and all(isinstance(img, dict) for img in v), True,
+                       'a list of images'),
+            'tags': (_is_strings, False, 'a list of strings'),
+            'exhibitions': (lambda v: isinstance(v, list) and all(isinstance(ex, (str, dict)) for ex in v), False,
+                            'a list of exhibition ids'),
+            'materials': (_is_terms, False, 'a list of strings or {"en": [...], "is": [...]}'),
+            'medium': (_is_terms, False, 'a list of strings or {"en": [...], "is": [...]}'),
+            'category': (_is_strings, False, 'a list of strings'),
+            'dimensions': (lambda v: v is None or isinstance(v, str), False, 'a string or null'),
+            'ownership': (lambda v: v is None or isinstance(v, dict), False, 'an object or null'),
+        })
+        for i, image in enumerate(data.get('images') if isinstance(data.get('images'), list) else []):
+            if isinstance(image, dict):
+                problems += [f"images[{i}].{problem}" for problem in _problems(image, {
+                    'url': (lambda v: isinstance(v, str) and v != '', True, 'a non-empty string'),
+                    'caption': (_is_text, False, 'a string or {"en": ..., "is": ...}'),
+                })]
+        return problems
+
+    @classmethod
+    def from_dict(cls, data):
+        extra = {k: v for k, v in data.items() if k not in cls.FIELDS} or None
+        return cls(
+            id=data.get('id', ''),
+            title=Text.from_value(data.get('title')),
+            year=data.get('year'),
+            description=Text.from_value(data.get('description')),
+            images=[Image.from_dict(img) for img in data.get('images', []) if isinstance(img, dict)],
+            tags=list(data.get('tags') or []),
+            exhibitions=[ex if isinstance(ex, str) else Exhibition.from_dict(ex)
+                         for ex in data.get('exhibitions', [])],
+            materials=TextList.from_value(data.get('materials')),
+            medium=TextList.from_value(data.get('medium')),
+            category=_as_list(data.get('category')),
+            dimensions=data.get('dimensions'),
+            ownership=data.get('ownership'),
+            content_status=data.get('contentStatus'),
+            media_status=data.get('mediaStatus'),
+            search_text=data.get('searchText'),
+            year_start=data.get('yearStart'),
+            year_end=data.get('yearEnd'),
+            year_display=data.get('yearDisplay'),
+            extra=extra,
+            keys=tuple(data),
+        )
+
+    @property
+    def years(self):
+        """YearRange of `year`: the stored yearStart/yearEnd/yearDisplay, or parsed when they are missing."""
+        if self.year_display is None:
+            return parse_year(self.year)
+        return YearRange(self.year_start, self.year_end, self.year_display)
+
+    def to_dict(self):
+        values = {
+            'id': self.id,
+            'title': self.title.to_dict(),
+            'year': self.year,
+            'yearStart': self.year_start,
+            'yearEnd': self.year_end,
+            'yearDisplay': self.year_display,
+            'dimensions': self.dimensions,
+            'description': self.description.to_dict(),
+            'images': [img.to_dict() for img in self.images],
+            'tags': self.tags,
+            'exhibitions': [ex if isinstance(ex, str) else ex.to_dict() for ex in self.exhibitions],
+            'materials': self.materials.to_dict(),
+            'ownership': self.ownership,
+            'contentStatus': self.content_status,
+            'mediaStatus': self.media_status,
+            'medium': self.medium.to_dict(),
+            'category': self.category,
+            'searchText': self.search_text,
+        }
+        return _ordered(self.keys, values, self.extra,
+                        required=('id', 'title', 'year', 'description', 'images', 'tags',
+                                  'exhibitions', 'materials', 'medium', 'category'))
+
+
+def _ordered(keys, values, extra, required=()):
+    """Rebuild a dict in its original key order; optional fields are only written if they were present or set."""
+    extra = extra or {}
+    data = {}
+    for key in keys:
+        if key in values:
+            data[key] = values[key]
+        elif key in extra:
+            data[key] = extra[key]
+    for key, value in values.items():
+        if key not in data and (key in required or value is not None):
+            data[key] = value
+    for key, value in extra.items():
+        data.setdefault(key, value)
+    return data
+
+
+def normalise_works(data):
+    """works.json document -> list of Work (non-record entries are dropped)."""
+    return [Work.from_dict(w) for w in data.get('works', []) if isinstance(w, dict)]
+
+normalise_works.CACHE_VERSION = 2
+
+
+def normalise_exhibitions(data):
+    """exhibitions.json document -> {'ui': dict, 'solo': [Exhibition], 'group': [Exhibition]}."""
+    return {
+        'ui': data.get('ui', {}),
+        'solo': [Exhibition.from_dict(ex) for ex in data.get('solo', [])],
+        'group': [Exhibition.from_dict(ex) for ex in data.get('group', [])],
+    }
+
+normalise_exhibitions.CACHE_VERSION = 2
+
+
+def load_works(path='works.json'):
+    """All works as Work records (cached)."""
+    return load_json(path, transform=normalise_works, tag='model')
+
+
+def load_exhibitions(path='exhibitions.json'):
+    """Exhibitions as Exhibition records (cached); empty lists if the file is missing."""
+    try:
+        return load_json(path, transform=normalise_exhibitions, tag='model')
+    except FileNotFoundError:
+        return {'ui': {}, 'solo': [], 'group': []}
+
+
+def exhibitions_by_id(exhibitions):
+    """Index solo and group exhibitions by id (first one wins on duplicates)."""
+    index = {}
+    for ex in exhibitions.get('solo', []) + exhibitions.get('group', []):
+        index.setdefault(ex.id, ex)
+    return index
+
+
+def canonical_works_document(path='works.json'):
+    """works.json with every record rewritten in canonical form."""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    data['works'] = [Work.from_dict(w).to_dict() if isinstance(w, dict) else w for w in data['works']]
+    return data
+
+
+def report_legacy_shapes(path='works.json'):
+    """Count records whose stored form differs from the canonical form."""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    changed = [w.get('id') for w in data['works'] if isinstance(w, dict) and Work.from_dict(w).to_dict() != w]
+    print(f"{len(changed)} of {len(data['works'])} works use legacy shapes")
+    for work_id in changed:
+        print(f"  - {work_id}")
+    return changed
+
+
+if __name__ == '__main__':
+    if '--write-canonical' in sys.argv:
+        from snapshots import take
+        from store import WorksStore
+        take('before models --write-canonical')  # undo with: python snapshots.py restore latest
+        store = WorksStore()
+        store.replace_document(store.works_path, canonical_works_document(store.works_path))
+        store.save()
+        print("Wrote canonical works.json")
+    else:
+        report_legacy_shapes()
@@ -0,0 +1,441 @@
+#!/usr/bin/env python3
+"""
+mp - single entry point for the site maintenance scripts.
+
+Every subcommand imports the module it needs only when it runs, so quick
+commands such as `mp validate` and `mp report` do not pay for PIL, the ingest
+scripts or the search index builder. Steps joined with `+` run in one process
+and share one WorksStore, so works.json is parsed once:
+
+  python mp.py validate + report + index
+
+Source/archive/trash paths come from toolkit.json (overridden by
+toolkit.local.json); see settings.py. Commands that can write works.json or
+exhibitions.json snapshot both files first (snapshots.py), so any run can be
+undone with `mp snapshot restore`.
+
+Usage:
+  python mp.py ingest BATCH          - Ingest originals from sourceDir (quick, medium, complex, npr-quick, ...)
+  python mp.py analyze GROUP         - Summarise unprocessed originals in sourceDir (ab, klm, npr)
+  python mp.py derive DIR            - Create medium renditions for the images in DIR
+  python mp.py build [STAGE...]      - Run the out-of-date build stages (see build.py; --graph to inspect)
+  python mp.py watch                 - Rebuild incrementally whenever images or data change
+  python mp.py serve [--watch]       - Local preview server with /_img/ resizing and the /api/ admin API
+  python mp.py index                 - Rebuild search-index.json
+  python mp.py validate [--json]     - Check every asset and id reference
+  python mp.py report                - Content and media status summary
+  python mp.py gc                    - Report unreferenced files under images/
+  python mp.py archive [DIR]         - Move unreferenced files to the trash folder
+  python mp.py export | import       - CSV round trip (works_export.csv)
+  python mp.py rename OLD NEW        - Rename a work and move its images
+  python mp.py ids                   - Report colliding work/exhibition ids
+  python mp.py rewrite MAPPING       - Bulk rewrite asset paths
+  python mp.py config                - Print the resolved settings
+  python mp.py snapshot ACTION ...   - List, diff and restore data snapshots (see snapshots.py)
+  python mp.py journal ACTION ...    - Show or revert recorded changes (see journal.py)
+  Add -k before the first command to keep going after a failing step.
+"""
+
+import argparse
+import sys
+import time
+
+COMMANDS = {}
+MUTATING = {}  # commands that may write works.json/exhibitions.json -> predicate on their parsed args
+
+# ingest batch -> (module, function)
+INGEST_BATCHES = {
+    'quick': ('batch_process_works', 'batch_process_quick_wins'),
+    'medium': ('batch_process_medium_works', 'batch_process_medium_works'),
+    'complex': ('batch_process_complex_works', 'batch_process_complex_works'),
+    'npr-quick': ('batch_process_npr_quick', 'batch_process_npr_quick_wins'),
+    'npr-medium': ('batch_process_npr_medium', 'batch_process_npr_medium_works'),
+    'klm-remaining': ('process_remaining_klm_works', 'process_remaining_klm_works'),
+    'npr-remaining': ('process_remaining_npr', 'process_remaining_npr_works'),
+}
+
+ANALYZE_GROUPS = {
+    'ab': ('analyze_ab_works', 'analyze_ab_works'),
+    'klm': ('analyze_new_works', 'analyze_new_works'),
+    'npr': ('analyze_npr_works', 'analyze_npr_works'),
+}
+
+
+class Context:
+    """State shared by the steps of one invocation."""
+
+    def __init__(self):
+        self._store = None
+
+    @property
+    def store(self):
+        if self._store is None:
+            from store import WorksStore
+            self._store = WorksStore()
+        return self._store
+
+    def files_changed(self):
+        """Call after a step rewrote works.json/exhibitions.json outside the store."""
+        if self._store is not None:
+            self._store.reload()
+
+    def close(self):
+        if self._store is not None:
+            self._store.save()
+
+
+def command(name, help, arguments=(), mutates=False):
+    """Register a subcommand; arguments are (flags, kwargs) pairs for add_argument.
+
+    mutates is True for a command that may write the data files, or a function
+    of the parsed arguments for one that only writes in some of its actions.
+    """
+    def register(func):
+        COMMANDS[name] = (func, help, arguments)
+        if mutates:
+            MUTATING[name] = mutates if callable(mutates) else (lambda args: True)
+        return func
+    return register
+
+
+def mutates(args):
+    """True if this step may write works.json/exhibitions.json (so it is snapshotted and named in the journal)."""
+    return args.command in MUTATING and MUTATING[args.command](args)
+
+
+def call(module_name, function_name, *args, **kwargs):
+    """Import module_name on demand and call one of its functions."""
+    module = __import__(module_name)
+    return getattr(module, function_name)(*args, **kwargs)
+
+
+@command('ingest', 'Ingest original images from sourceDir into images/ and works.json', [
+    (('batch',), {'choices': sorted(INGEST_BATCHES), 'help': 'Which batch script to run'}),
+    (('--source',), {'help': 'Source folder (default: sourceDir setting)'}),
+    (('--no-validate',), {'action': 'store_true', 'help': 'Skip reference validation afterwards'}),
+], mutates=True)
+def cmd_ingest(ctx, args):
+    from settings import override
+    override(sourceDir=args.source)
+    ctx.close()
+    call(*INGEST_BATCHES[args.batch])
+    ctx.files_changed()
+    if args.no_validate:
+        return 0
+    return call('validate_references', 'validate_after_ingest',
+                ctx.store.data, ctx.store.exhibitions_data)
+
+
+@command('analyze', 'Summarise unprocessed originals in sourceDir', [
+    (('group',), {'choices': sorted(ANALYZE_GROUPS)}),
+    (('--source',), {'help': 'Source folder (default: sourceDir setting)'}),
+])
+def cmd_analyze(ctx, args):
+    from settings import override
+    override(sourceDir=args.source)
+    call(*ANALYZE_GROUPS[args.group])
+
+
+@command('derive', 'Create medium renditions for the images in a folder', [
+    (('input_dir',), {'help': 'Folder containing original images'}),
+    (('--output-dir',), {'help': 'Output folder (default: INPUT_DIR/medium)'}),
+    (('--width',), {'type': int, 'default': 800, 'help': 'Maximum width (default: 800)'}),
+    (('--height',), {'type': int, 'default': 600, 'help': 'Maximum height (default: 600)'}),
+])
+def cmd_derive(ctx, args):
+    import os
+    output_dir = args.output_dir or os.path.join(args.input_dir, 'medium')
+    os.makedirs(output_dir, exist_ok=True)
+    call('resize_images', 'process_directory', args.input_dir, output_dir, args.width, args.height)
+
+
+@command('build', 'Run the build stages whose inputs changed (derivatives, fix-ups, search index, validation)', [
+    (('stages',), {'nargs': '*', 'help': 'Stages to build (default: all)'}),
+    (('--graph',), {'action': 'store_true', 'help': 'Show the build graph and what is out of date'}),
+    (('--dot',), {'action': 'store_true', 'help': 'Print the graph in Graphviz dot format'}),
+    (('--force',), {'action': 'store_true', 'help': 'Ignore the fingerprint cache'}),
+    (('-j', '--jobs'), {'type': int, 'help': 'Maximum parallel workers'}),
+], mutates=True)
+def cmd_build(ctx, args):
+    argv = list(args.stages) + [flag for flag, on in (('--graph', args.graph), ('--dot', args.dot),
+                                                     ('--force', args.force)) if on]
+    if args.jobs:
+        argv += ['-j', str(args.jobs)]
+    return call('build', 'main', argv, store=ctx.store)
+
+
+@command('watch', 'Watch images and data files and rebuild what changed', [
+    (('--poll',), {'action': 'store_true', 'help': 'Poll file stamps instead of using watchdog'}),
+    (('--interval',), {'type': float, 'default': 0.5, 'help': 'Polling interval in seconds (default: 0.5)'}),
+    (('--debounce',), {'type': float, 'default': 0.3, 'help': 'Quiet period before rebuilding (default: 0.3)'}),
+    (('-j', '--jobs'), {'type': int, 'help': 'Maximum parallel workers'}),
+])
+def cmd_watch(ctx, args):
+    ctx.close()
+    call('watch', 'watch', poll=args.poll, interval=args.interval, debounce=args.debounce, jobs=args.jobs)
+
+
+@command('serve', 'Serve the site locally with image resizing at /_img/ and the admin API at /api/', [
+    (('--port',), {'type': int, 'help': 'Port (default: previewPort setting)'}),
+    (('--watch',), {'action': 'store_true', 'help': 'Also rebuild on changes'}),
+    (('--cache-mb',), {'type': float, 'help': 'Resize cache cap in MB (default: previewCacheMB setting)'}),
+])
+def cmd_serve(ctx, args):
+    ctx.close()
+    call('preview_server', 'serve', port=args.port, watch=args.watch, max_mb=args.cache_mb)
+
+
+@command('index', 'Rebuild search-index.json from works.json and exhibitions.json')
+def cmd_index(ctx, args):
+    ctx.close()
+    call('rebuild_search_index', 'rebuild_search_index',
+         ctx.store.records(), ctx.store.exhibition_records())
+
+
+@command('validate', 'Check every asset and id reference (read only)', [
+    (('--json',), {'action': 'store_true', 'help': 'Print a structured JSON report'}),
+    (('--strict',), {'action': 'store_true', 'help': 'Exit non-zero on warnings too'}),
+])
+def cmd_validate(ctx, args):
+    import validate_references
+    start = time.perf_counter()
+    report = validate_references.validate(ctx.store.data, ctx.store.exhibitions_data)
+    elapsed = time.perf_counter() - start
+    if args.json:
+        import json
+        json.dump(report.to_dict(), sys.stdout, indent=2, ensure_ascii=False)
+        print()
+    else:
+        validate_references.print_report(report, elapsed)
+    return validate_references.exit_code(report, args.strict)
+
+
+@command('report', 'Content and media status summary')
+def cmd_report(ctx, args):
+    call('check_status', 'print_status_report', ctx.store.works)
+
+
+@command('gc', 'Report unreferenced files under images/ (dry run)', [
+    (('--derivatives-only',), {'action': 'store_true', 'help': 'Only consider medium/ and thumbs/ files'}),
+    (('-v', '--verbose'), {'action': 'store_true', 'help': 'List every orphaned file'}),
+])
+def cmd_gc(ctx, args):
+    report_orphans(args)
+
+
+def report_orphans(args):
+    import gc_orphans
+    orphans = gc_orphans.find_orphans(derivatives_only=args.derivatives_only)
+    gc_orphans.print_report(orphans, verbose=args.verbose)
+    return orphans
+
+
+@command('archive', 'Move unreferenced files under images/ to the trash folder', [
+    (('destination',), {'nargs': '?', 'help': 'Target folder (default: <trashDir>/orphans-<timestamp>)'}),
+    (('--derivatives-only',), {'action': 'store_true', 'help': 'Only consider medium/ and thumbs/ files'}),
+    (('-v', '--verbose'), {'action': 'store_true', 'help': 'List every orphaned file'}),
+])
+def cmd_archive(ctx, args):
+    import os
+    from gc_orphans import archive_orphans
+    from settings import trash_dir
+    orphans = report_orphans(args)
+    if orphans:
+        archive_orphans(orphans, args.destination or
+                        os.path.join(trash_dir(), time.strftime('orphans-%Y%m%d-%H%M%S')))
+
+
+@command('export', 'Export works to works_export.csv', [
+    (('--columns',), {'help': 'all, or a comma separated list of columns (default: titles, year, '
+                              'dimensions, materials, statuses)'}),
+    (('-o', '--output'), {'default': 'works_export.csv', 'help': 'CSV file (default: works_export.csv)'}),
+])
+def cmd_export(ctx, args):
+    from works_csv_export import parse_columns
+    try:
+        columns = parse_columns(args.columns)
+    except ValueError as e:
+        print(f"ERROR: {e}")
+        return 1
+    call('works_csv_export', 'export_to_csv', args.output, columns, store=ctx.store)
+
+
+@command('import', 'Import the changed cells of works_export.csv into works.json', [
+    (('-i', '--input'), {'default': 'works_export.csv', 'help': 'CSV file (default: works_export.csv)'}),
+    (('--dry-run',), {'action': 'store_true', 'help': 'Report the changes without saving'}),
+], mutates=True)
+def cmd_import(ctx, args):
+    call('works_csv_export', 'import_from_csv', args.input, store=ctx.store, dry_run=args.dry_run)
+
+
+@command('rename', 'Rename a work and/or move its image folder in one transaction', [
+    (('old_id',), {'nargs': '?', 'help': 'Current work id'}),
+    (('new_id',), {'nargs': '?', 'help': 'New work id'}),
+    (('--folder',), {'help': 'Target image folder name (default: NEW_ID)'}),
+    (('--keep-folder',), {'action': 'store_true', 'help': 'Do not move image folders'}),
+    (('--move-folder',), {'nargs': 2, 'metavar': ('OLD', 'NEW'), 'help': 'Move/merge an image folder only'}),
+    (('--dry-run',), {'action': 'store_true', 'help': 'Print the plan without changing anything'}),
+], mutates=True)
+def cmd_rename(ctx, args):
+    from rename_work import RenameError, rename
+    if not args.move_folder and not (args.old_id and args.new_id):
+        print('ERROR: give OLD_ID NEW_ID and/or --move-folder OLD NEW')
+        return 2
+    ctx.close()
+    try:
+        actions = rename(args.old_id, args.new_id, folder=args.folder, keep_folder=args.keep_folder,
+                         move_folder=tuple(args.move_folder) if args.move_folder else None,
+                         dry_run=args.dry_run)
+    except RenameError as e:
+        print(f"ERROR: {e}")
+        return 1
+    for action in actions:
+        print(action)
+    if not args.dry_run:
+        ctx.files_changed()
+
+
+@command('ids', 'Report colliding work and exhibition ids')
+def cmd_ids(ctx, args):
+    return call('slugs', 'check_collisions')
+
+
+@command('rewrite', 'Bulk rewrite asset paths from a mapping file (dry run by default)', [
+    (('mapping',), {'help': 'Mapping JSON file (exact table and/or rules)'}),
+    (('--apply',), {'action': 'store_true', 'help': 'Write changes'}),
+    (('--files',), {'nargs': '+', 'help': 'Target files or globs'}),
+    (('--no-diff',), {'action': 'store_true', 'help': 'Only print the summary'}),
+], mutates=True)
+def cmd_rewrite(ctx, args):
+    import rewrite_urls
+    ctx.close()
+    rules = rewrite_urls.RewriteRules.from_file(args.mapping)
+    changed = rewrite_urls.rewrite_files(rules, args.files, apply=args.apply, show_diff=not args.no_diff,
+                                         store=ctx.store)
+    rewrite_urls.print_summary(changed, rules, args.apply)
+
+
+@command('config', 'Print the resolved toolkit settings')
+def cmd_config(ctx, args):
+    import json
+    from settings import load_settings
+    print(json.dumps(load_settings(), indent=2, ensure_ascii=False))
+
+
+@command('snapshot', 'List, take, diff, restore or prune snapshots of works.json and exhibitions.json', [
+    (('action',), {'choices': ['list', 'take', 'diff', 'restore', 'prune']}),
+    (('refs',), {'nargs': '*', 'help': 'take: LABEL; diff: REF [REF2]; restore: REF [WORK_ID...]'}),
+    (('--work',), {'help': 'diff: show the field changes of one work'}),
+    (('--keep',), {'type': int, 'help': 'prune: snapshots to keep (default: snapshotKeep setting)'}),
+])
+def cmd_snapshot(ctx, args):
+    import snapshots
+    ctx.close()
+    refs = args.refs
+    try:
+        if args.action == 'list':
+            snapshots.print_list()
+        elif args.action == 'take':
+            snapshots.take(' '.join(refs) or 'manual')
+        elif args.action == 'prune':
+            snapshots.prune(args.keep)
+        elif not refs:
+            print(f"ERROR: snapshot {args.action} needs a snapshot reference")
+            return 2
+        elif args.action == 'diff':
+            snapshots.print_diff(refs[0], refs[1] if len(refs) > 1 else None, args.work)
+        else:
+            restored = snapshots.restore(refs[0], refs[1:], store=ctx.store)
+            print(f"Restored {', '.join(restored)}")
+    except snapshots.SnapshotError as e:
+        print(f"ERROR: {e}")
+        return 1
+
+
+@command('journal', 'Show or revert the recorded changes to works.json and exhibitions.json', [
+    (('action',), {'choices': ['log', 'show', 'revert']}),
+    (('entry',), {'nargs': '?', 'help': 'show/revert: entry id, id prefix or last'}),
+    (('-n',), {'type': int, 'default': 20, 'help': 'log: how many entries (default: 20)'}),
+    (('--force',), {'action': 'store_true', 'help': 'revert: skip records changed again since'}),
+], mutates=lambda args: args.action == 'revert')
+def cmd_journal(ctx, args):
+    import journal
+    if args.action == 'log':
+        journal.print_log(args.n)
+        return 0
+    if not args.entry:
+        print(f"ERROR: journal {args.action} needs an entry")
+        return 2
+    argv = [args.action, args.entry] + (['--force'] if args.force and args.action == 'revert' else [])
+    ctx.close()
+    code = journal.main(argv)
+    ctx.files_changed()
+    return code
+
+
+def build_parser(names=None):
+    """The command line parser, with subparsers for just the given commands (default: all)."""
+    parser = argparse.ArgumentParser(
+        prog='mp', description="Magnús Pálsson site toolkit. Join steps with '+' to share one loaded store.")
+    subparsers = parser.add_subparsers(dest='command', metavar='COMMAND', required=True)
+    for name, (func, help, arguments) in COMMANDS.items():
+        if names is not None and name not in names:
+            continue
+        sub = subparsers.add_parser(name, help=help, description=help)
+        for flags, kwargs in arguments:
+            sub.add_argument(*flags, **kwargs)
+        sub.set_defaults(func=func)
+    return parser
+
+
+def split_steps(argv):
+    """['validate', '+', 'report'] -> [['validate'], ['report']]"""
+    steps = [[]]
+    for arg in argv:
+        if arg == '+':
+            steps.append([])
+        else:
+            steps[-1].append(arg)
+    return [step for step in steps if step]
+
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    keep_going = False
+    while argv and argv[0] in ('-k', '--keep-going'):
+        keep_going = True
+        argv.pop(0)
+
+    steps = split_steps(argv)
+    if not steps:
+        build_parser().print_help()
+        return 2
+    # Only the commands being run get a subparser; building all of them is a noticeable part of startup.
+    # Help and unknown commands get the full parser so its messages list every command.
+    names = {step[0] for step in steps}
+    parser = build_parser(names if names <= COMMANDS.keys() else None)
+    parsed = [parser.parse_args(step) for step in steps]
+
+    ctx = Context()
+    status = 0
+    try:
+        for step, args in zip(steps, parsed):
+            if len(parsed) > 1:
+                print(f"\n=== mp {args.command} ===")
+            if mutates(args):
+                ctx.close()
+                call('snapshots', 'take', f"before mp {' '.join(step)}")
+                call('journal', 'set_command', f"mp {' '.join(step)}")
+            result = args.func(ctx, args)
+            code = result if isinstance(result, int) else 0
+            if code:
+                status = status or code
+                if not keep_going:
+                    break
+    finally:
+        ctx.close()
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -13,10 +13,15 @@ document.addEventListener("DOMContentLoaded", () => {
 
         // Load global search functionality after nav is loaded
         if (!document.getElementById('global-search-script')) {
-          const script = document.createElement('script');
-          script.id = 'global-search-script';
-          script.src = 'global-search.js';
-          document.head.appendChild(script);
+          const foldScript = document.createElement('script');
+          foldScript.src = 'fold-table.js';
+          foldScript.onload = () => {
+            const script = document.createElement('script');
+            script.id = 'global-search-script';
+            script.src = 'global-search.js';
+            document.head.appendChild(script);
+          };
+          document.head.appendChild(foldScript);
         }
       })
       .catch(error => console.error("Error loading navigation:", error));
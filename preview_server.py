@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Local preview server for the site with an on-demand image resizing endpoint.
+
+Serves the site folder like `python -m http.server`, plus
+
+  /_img/<path under images/>?w=400&h=300&fmt=webp&q=80&fit=crop
+
+which renders the image through the shared derivative engine (derivatives.py)
+and keeps the result in a disk cache capped in size (least recently used files
+are evicted first). Designers can try a grid size or format without
+re-encoding the images/ tree; `warm` renders a size for every work image
+ahead of time through the same code path.
+
+/api/ is the admin API (admin_api.py), so the admin-*.html pages opened from
+this server save records directly instead of producing JSON to paste.
+
+Usage:
+  python preview_server.py                    - Serve on previewPort (toolkit.json)
+  python preview_server.py --port 8080        - Serve on another port
+  python preview_server.py --watch            - Also rebuild on changes (see watch.py)
+  python preview_server.py warm -w 400 --fmt webp  - Pre-render every work image at that size
+"""
+
+import argparse
+import hashlib
+import os
+import sys
+import threading
+from collections import OrderedDict
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from admin_api import API_PREFIX, AdminAPI
+from derivatives import FORMATS, SOURCE_EXTENSIONS, Rendition, render_bytes
+from settings import setting
+from site_index import IMAGES_DIR, normalize_path
+
+IMAGE_PREFIX = '/_img/'
+MAX_DIMENSION = 4000
+UNBOUNDED = 100000  # box edge used when only one dimension is given
+
+
+class RequestError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class DiskCache:
+    """Files in one directory, evicted least recently used first once over max_bytes."""
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()   # file name -> size, oldest first
+        self.total = 0
+        os.makedirs(directory, exist_ok=True)
+        existing = []
+        with os.scandir(directory) as it:
+            for entry in it:
+                if entry.is_file() and not entry.name.startswith('.tmp-'):
+                    stat = entry.stat()
+                    existing.append((stat.st_mtime_ns, entry.name, stat.st_size))
+        for _, name, size in sorted(existing):
+            self.entries[name] = size
+            self.total += size
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def get(self, name):
+        """Cached bytes for name, or None; a hit makes it most recently used."""
+        with self.lock:
+            if name not in self.entries:
+                return None
+            self.entries.move_to_end(name)
+        try:
+            with open(self.path(name), 'rb') as f:
+                data = f.read()
+            os.utime(self.path(name))  # keeps LRU order across restarts
+            return data
+        except FileNotFoundError:
+            with self.lock:
+                self.total -= self.entries.pop(name, 0)
+            return None
+
+    def put(self, name, data):
+        tmp_path = self.path(f".tmp-{threading.get_ident()}-{name}")
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, self.path(name))
+        with self.lock:
+            self.total += len(data) - self.entries.pop(name, 0)
+            self.entries[name] = len(data)
+            while self.total > self.max_bytes and len(self.entries) > 1:
+                oldest, size = self.entries.popitem(last=False)
+                self.total -= size
+                try:
+                    os.unlink(self.path(oldest))
+                except FileNotFoundError:
+                    pass
+
+
+def parse_rendition(query):
+    """Rendition from ?w=&h=&fmt=&q=&fit= query values."""
+    def number(name, low, high):
+        value = query.get(name, [None])[0]
+        if value is None or value == '':
+            return None
+        try:
+            value = int(value)
+        except ValueError:
+            raise RequestError(400, f"{name} must be a whole number")
+        if not low <= value <= high:
+            raise RequestError(400, f"{name} must be between {low} and {high}")
+        return value
+
+    width = number('w', 1, MAX_DIMENSION)
+    height = number('h', 1, MAX_DIMENSION)
+    if not width and not height:
+        raise RequestError(400, 'give w and/or h')
+    fmt = query.get('fmt', ['jpeg'])[0].lower()
+    if fmt not in FORMATS:
+        raise RequestError(400, f"fmt must be one of {', '.join(FORMATS)}")
+    crop = query.get('fit', [''])[0] == 'crop'
+    if crop and not (width and height):
+        raise RequestError(400, 'fit=crop needs both w and h')
+    quality = number('q', 1, 100) or 85
+    return Rendition(width or UNBOUNDED, height or UNBOUNDED, crop=crop, quality=quality, format=fmt)
+
+
+def resolve_image(root, path):
+    """URL path of an image under images/ -> (site path, file path), refusing anything outside it."""
+    site_path = normalize_path(unquote(path)).lstrip('/')
+    parts = site_path.split('/')
+    if parts[0] != IMAGES_DIR or '..' in parts or '' in parts:
+        raise RequestError(404, 'not an image path')
+    file_path = os.path.join(root, *parts)
+    if not os.path.isfile(file_path):
+        raise RequestError(404, 'image not found')
+    return site_path, file_path
+
+
+def cache_key(site_path, file_path, rendition):
+    """Cache file name; changes whenever the source file or the requested rendition does."""
+    stat = os.stat(file_path)
+    raw = f"{site_path}\0{stat.st_size}\0{stat.st_mtime_ns}\0{rendition!r}"
+    return hashlib.sha1(raw.encode('utf-8', 'surrogateescape')).hexdigest() + rendition.extension
+
+
+def rendered(cache, site_path, file_path, rendition):
+    """(cache key, bytes) for a rendition, rendering and caching it on a miss."""
+    key = cache_key(site_path, file_path, rendition)
+    data = cache.get(key)
+    if data is None:
+        data = render_bytes(file_path, rendition)
+        cache.put(key, data)
+    return key, data
+
+
+class PreviewHandler(SimpleHTTPRequestHandler):
+    cache = None
+    api = None
+
+    def do_GET(self):
+        if self.path.startswith(IMAGE_PREFIX):
+            self.send_image()
+        elif self.path.startswith(API_PREFIX):
+            self.send_api('GET')
+        else:
+            super().do_GET()
+
+    def do_POST(self):
+        self.send_api('POST')
+
+    def do_PATCH(self):
+        self.send_api('PATCH')
+
+    def do_DELETE(self):
+        self.send_api('DELETE')
+
+    def send_api(self, method):
+        if not self.path.startswith(API_PREFIX):
+            self.send_error(405)
+            return
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        status, headers, data = self.api.handle(method, urlsplit(self.path).path, self.headers.get('If-Match'), body,
+                                                self.headers)
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.send_header('Cache-Control', 'no-store')
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def send_image(self):
+        url = urlsplit(self.path)
+        try:
+            site_path, file_path = resolve_image(self.directory, url.path[len(IMAGE_PREFIX) - 1:])
+            rendition = parse_rendition(parse_qs(url.query))
+            key, data = rendered(self.cache, site_path, file_path, rendition)
+        except RequestError as e:
+            self.send_error(e.status, str(e))
+            return
+        except Exception as e:
+            self.send_error(500, f"could not render image: {e}")
+            return
+
+        etag = f'"{key}"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', rendition.content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.send_header('ETag', etag)
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def open_cache(max_mb=None):
+    return DiskCache(setting('previewCacheDir'), int((max_mb or setting('previewCacheMB')) * 1024 * 1024))
+
+
+def serve(port=None, root='.', watch=False, max_mb=None):
+    port = port or setting('previewPort')
+    PreviewHandler.cache = open_cache(max_mb)
+    PreviewHandler.api = AdminAPI()
+    if watch:
+        import watch as watcher
+        threading.Thread(target=watcher.watch, daemon=True).start()
+    server = ThreadingHTTPServer(('127.0.0.1', port), partial(PreviewHandler, directory=os.path.abspath(root)))
+    print(f"Serving {os.path.abspath(root)} at http://127.0.0.1:{port}/ "
+          f"(resizing at {IMAGE_PREFIX}<path>?w=&h=&fmt=&q=&fit=crop, admin API at {API_PREFIX})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopped")
+    finally:
+        server.server_close()
+
+
+def warm(rendition, max_mb=None, workers=None):
+    """Render rendition for every image referenced by works.json into the preview cache."""
+    from concurrent.futures import ThreadPoolExecutor
+    from store import WorksStore
+
+    cache = open_cache(max_mb)
+    paths = sorted({normalize_path(img.get('url', '')) for work in WorksStore().works
+                    for img in work.get('images', [])})
+    files = [p for p in paths if p.startswith(IMAGES_DIR + '/') and p.lower().endswith(SOURCE_EXTENSIONS)
+             and os.path.isfile(p)]
+
+    def run(path):
+        try:
+            rendered(cache, path, path, rendition)
+            return True
+        except Exception as e:
+            print(f"  Error rendering {path}: {e}")
+            return False
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        done = sum(pool.map(run, files))
+    print(f"Rendered {done} of {len(files)} images; cache holds {cache.total / 1024 / 1024:.1f} MB")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local preview server with on-demand image resizing")
+    subparsers = parser.add_subparsers(dest='command')
+    parser.add_argument('--port', type=int, help='Port (default: previewPort setting)')
+    parser.add_argument('--watch', action='store_true', help='Rebuild derivatives and the index on changes')
+    parser.add_argument('--cache-mb', type=float, help='Cache size cap in MB (default: previewCacheMB setting)')
+    warm_parser = subparsers.add_parser('warm', help='Pre-render one size for every work image')
+    warm_parser.add_argument('-w', '--width', type=int, help='Maximum width')
+    warm_parser.add_argument('--height', type=int, help='Maximum height')
+    warm_parser.add_argument('--fmt', default='jpeg', choices=sorted(FORMATS), help='Output format')
+    warm_parser.add_argument('-q', '--quality', type=int, default=85, help='Encoder quality')
+    warm_parser.add_argument('--crop', action='store_true', help='Crop to exactly width x height')
+    warm_parser.add_argument('--cache-mb', type=float, help='Cache size cap in MB (default: previewCacheMB setting)')
+    args = parser.parse_args(argv)
+
+    if args.command == 'warm':
+        query = {'w': [str(args.width or '')], 'h': [str(args.height or '')], 'fmt': [args.fmt],
+                 'q': [str(args.quality)], 'fit': ['crop' if args.crop else '']}
+        try:
+            rendition = parse_rendition(query)
+        except RequestError as e:
+            parser.error(str(e))
+        warm(rendition, max_mb=args.cache_mb)
+        return 0
+
+    serve(port=args.port, watch=args.watch, max_mb=args.cache_mb)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -5,48 +5,23 @@ These include PDF-only works, single files, and collections with non-image files
 """
 
 import os
-import json
 import subprocess
 import shutil
-import re
+import sys
 
-def clean_work_id(work_name):
-    """Convert work name to clean ID format."""
-    # Extract year
-    year = "unknown"
-    for word in work_name.split():
-        if word.isdigit() and len(word) == 4 and word.startswith(('19', '20')):
-            year = word
-            break
-
-    # Clean the name
-    clean_name = work_name.lower()
-    clean_name = re.sub(r'[áàäâ]', 'a', clean_name)
-    clean_name = re.sub(r'[éèëê]', 'e', clean_name)
-    clean_name = re.sub(r'[íìïî]', 'i', clean_name)
-    clean_name = re.sub(r'[óòöô]', 'o', clean_name)
-    clean_name = re.sub(r'[úùüû]', 'u', clean_name)
-    clean_name = re.sub(r'[ýÿ]', 'y', clean_name)
-    clean_name = re.sub(r'[þ]', 'th', clean_name)
-    clean_name = re.sub(r'[ð]', 'd', clean_name)
-    clean_name = re.sub(r'[æ]', 'ae', clean_name)
-    clean_name = re.sub(r'[ø]', 'o', clean_name)
-
-    # Remove special characters and replace with hyphens
-    clean_name = re.sub(r'[^a-z0-9\s]', '', clean_name)
-    clean_name = re.sub(r'\s+', '-', clean_name)
-    clean_name = clean_name.strip('-')
-
-    # Add year if we found one
-    if year != "unknown":
-        return f"{clean_name}-{year}"
-    else:
-        return clean_name
+from settings import source_dir
+from slugs import ingest_work_id
+from store import WorksStore
+from validate_references import validate_after_ingest
+from years import first_year
 
 def process_single_tif_as_work(file_path, work_name):
     """Process a single TIF file as a complete work."""
 
-    work_id = clean_work_id(work_name)
+    work_id = ingest_work_id(work_name)
+    if work_id is None:
+        print(f"{work_name} is already in works.json; skipped")
+        return None
     print(f"\nProcessing single TIF work: {work_name} -> {work_id}")
 
     # Create folder structure
@@ -74,11 +49,7 @@ def process_single_tif_as_work(file_path, work_name):
         ], check=True, capture_output=True)
 
         # Extract year
-        year = "Unknown"
-        for word in work_name.split():
-            if word.isdigit() and len(word) == 4 and word.startswith(('19', '20')):
-                year = int(word)
-                break
+        year = first_year(work_name) or "Unknown"
 
         # Create JSON entry
         work_entry = {
@@ -108,7 +79,10 @@ def process_single_tif_as_work(file_path, work_name):
 def process_pdf_work(folder_path, work_name):
     """Process a work that consists mainly of PDFs."""
 
-    work_id = clean_work_id(work_name)
+    work_id = ingest_work_id(work_name)
+    if work_id is None:
+        print(f"{work_name} is already in works.json; skipped")
+        return None
     print(f"\nProcessing PDF work: {work_name} -> {work_id}")
 
     # Create folder structure
@@ -129,11 +103,7 @@ def process_pdf_work(folder_path, work_name):
         return None
 
     # Extract year
-    year = "Unknown"
-    for word in work_name.split():
-        if word.isdigit() and len(word) == 4 and word.startswith(('19', '20')):
-            year = int(word)
-            break
+    year = first_year(work_name) or "Unknown"
 
     # Create JSON entry
     work_entry = {
@@ -154,7 +124,10 @@ def process_pdf_work(folder_path, work_name):
 def process_documentation_work(folder_path, work_name):
     """Process a work with documentation files (videos, texts, etc.)."""
 
-    work_id = clean_work_id(work_name)
+    work_id = ingest_work_id(work_name)
+    if work_id is None:
+        print(f"{work_name} is already in works.json; skipped")
+        return None
     print(f"\nProcessing documentation work: {work_name} -> {work_id}")
 
     # Create folder structure
@@ -171,11 +144,7 @@ def process_documentation_work(folder_path, work_name):
             doc_files.append(file)
 
     # Extract year
-    year = "Unknown"
-    for word in work_name.split():
-        if word.isdigit() and len(word) == 4 and word.startswith(('19', '20')):
-            year = int(word)
-            break
+    year = first_year(work_name) or "Unknown"
 
     # Create JSON entry
     work_entry = {
@@ -196,11 +165,11 @@ def process_documentation_work(folder_path, work_name):
 def process_remaining_klm_works():
     """Process the remaining K, L, M works that were missed."""
 
-    base_path = r"C:\Users\VeigaMagnusdottir\projects\magnusPalsson\images-not-used"
+    base_path = source_dir()
 
     # Read current works.json
-    with open('works.json', 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    store = WorksStore()
+    data = store.data
 
     new_entries = []
 
@@ -238,9 +207,9 @@ def process_remaining_klm_works():
     # Add new entries to JSON
     data['works'] = new_entries + data['works']
 
-    # Write updated JSON
-    with open('works.json', 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    # Write updated JSON through the store (atomic, and journalled per work)
+    store.changed()
+    store.save()
 
     print(f"\n=== REMAINING K, L, M PROCESSING COMPLETE ===")
     print(f"Successfully processed: {len(new_entries)} additional works")
@@ -249,4 +218,5 @@ def process_remaining_klm_works():
     return len(new_entries)
 
 if __name__ == "__main__":
-    count = process_remaining_klm_works()
\ No newline at end of file
+    count = process_remaining_klm_works()
+    sys.exit(validate_after_ingest())
\ No newline at end of file
@@ -4,50 +4,16 @@ Process the remaining N, P, R works: complex (20+ images) and documentation-only
 """
 
 import os
-import json
 import glob
 import subprocess
 import shutil
-import re
+import sys
 
-def clean_work_id(work_name):
-    """Convert work name to clean ID format."""
-    # Extract year
-    year = "unknown"
-    for word in work_name.split():
-        if word.isdigit() and len(word) == 4 and word.startswith(('19', '20')):
-            year = word
-            break
-        elif '-' in word and any(part.isdigit() and len(part) == 4 for part in word.split('-')):
-            parts = word.split('-')
-            for part in parts:
-                if part.isdigit() and len(part) == 4:
-                    year = part
-                    break
-
-    # Clean the name
-    clean_name = work_name.lower()
-    clean_name = re.sub(r'[áàäâ]', 'a', clean_name)
-    clean_name = re.sub(r'[éèëê]', 'e', clean_name)
-    clean_name = re.sub(r'[íìïî]', 'i', clean_name)
-    clean_name = re.sub(r'[óòöô]', 'o', clean_name)
-    clean_name = re.sub(r'[úùüû]', 'u', clean_name)
-    clean_name = re.sub(r'[ýÿ]', 'y', clean_name)
-    clean_name = re.sub(r'[þ]', 'th', clean_name)
-    clean_name = re.sub(r'[ð]', 'd', clean_name)
-    clean_name = re.sub(r'[æ]', 'ae', clean_name)
-    clean_name = re.sub(r'[ø]', 'o', clean_name)
-
-    # Remove special characters and replace with hyphens
-    clean_name = re.sub(r'[^a-z0-9\s]', '', clean_name)
-    clean_name = re.sub(r'\s+', '-', clean_name)
-    clean_name = clean_name.strip('-')
-
-    # Add year if we found one
-    if year != "unknown":
-        return f"{clean_name}-{year}"
-    else:
-        return clean_name
+from settings import source_dir
+from slugs import ingest_work_id
+from store import WorksStore
+from validate_references import validate_after_ingest
+from years import first_year
 
 def select_best_images(image_files, max_images=10):
     """Select the best images from a large collection."""
@@ -93,7 +59,10 @@ def process_complex_work(work_name, source_path, max_images=10):
     print(f"\n=== Processing Complex Work: {work_name} ===")
 
     # Generate work ID
-    work_id = clean_work_id(work_name)
+    work_id = ingest_work_id(work_name)
+    if work_id is None:
+        print(f"{work_name} is already in works.json; skipped")
+        return None
     print(f"Work ID: {work_id}")
 
     # Get image files
@@ -169,11 +138,7 @@ def process_complex_work(work_name, source_path, max_images=10):
         return None
 
     # Extract year for JSON
-    year = "Unknown"
-    for word in work_name.split():
-        if word.isdigit() and len(word) == 4 and word.startswith(('19', '20')):
-            year = int(word)
-            break
+    year = first_year(work_name) or "Unknown"
 
     # Create JSON entry
     work_entry = {
@@ -197,7 +162,10 @@ def process_documentation_work(work_name, source_path):
     print(f"\n=== Processing Documentation Work: {work_name} ===")
 
     # Generate work ID
-    work_id = clean_work_id(work_name)
+    work_id = ingest_work_id(work_name)
+    if work_id is None:
+        print(f"{work_name} is already in works.json; skipped")
+        return None
     print(f"Work ID: {work_id}")
 
     # Create folder structure
@@ -215,11 +183,7 @@ def process_documentation_work(work_name, source_path):
             print(f"  Copied: {file}")
 
     # Extract year
-    year = "Unknown"
-    for word in work_name.split():
-        if word.isdigit() and len(word) == 4 and word.startswith(('19', '20')):
-            year = int(word)
-            break
+    year = first_year(work_name) or "Unknown"
 
     # Create JSON entry
     work_entry = {
@@ -240,11 +204,11 @@ def process_documentation_work(work_name, source_path):
 def process_remaining_npr_works():
     """Process the remaining N, P, R works."""
 
-    base_path = r"C:\Users\VeigaMagnusdottir\projects\magnusPalsson\images-not-used"
+    base_path = source_dir()
 
     # Read current works.json
-    with open('works.json', 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    store = WorksStore()
+    data = store.data
 
     new_entries = []
 
@@ -267,9 +231,9 @@ def process_remaining_npr_works():
     # Add new entries to JSON
     data['works'] = new_entries + data['works']
 
-    # Write updated JSON
-    with open('works.json', 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    # Write updated JSON through the store (atomic, and journalled per work)
+    store.changed()
+    store.save()
 
     print(f"\n=== REMAINING N, P, R PROCESSING COMPLETE ===")
     print(f"Successfully processed: {len(new_entries)} additional works")
@@ -278,4 +242,5 @@ def process_remaining_npr_works():
     return len(new_entries)
 
 if __name__ == "__main__":
-    count = process_remaining_npr_works()
\ No newline at end of file
+    count = process_remaining_npr_works()
+    sys.exit(validate_after_ingest())
\ No newline at end of file
@@ -1,78 +1,61 @@
 #!/usr/bin/env python3
 """
 Rebuild search index from all content sources with bilingual support.
+
+Alongside search-index.json this writes search-vocabulary.json for typo
+tolerant search: every folded word of four or more letters in the titles and
+content, and a table from each trigram of a word (padded with a space on
+either side) to the words containing it, with the word numbers delta-encoded.
+global-search.js looks a misspelt query word's trigrams up in the table and
+checks the edit distance of only the few words sharing most of them.
+
+It also writes search-passages.json: per work url and language, the
+description shown under a result split into sentence-level passages, each
+listing its words (by vocabulary number) with their offsets. Passages point
+into the entry's content, so no text is repeated. The results list picks the
+passage with the most query words and highlights them from the offsets,
+without scanning the text.
+
+Entries other than works are extracted from the documents their pages are
+rendered from: exhibitions.json for the exhibition lists, articles/*.md for
+the press articles (article_pages.py) and, for reviews,
+publications, biography and the other pages, translations/<page>-en.json with
+its -is.json counterpart. Each extractor owns the entries on its pages, so an
+edited document replaces just those (update_work_entries(documents=...));
+entries on pages no extractor knows are kept as they are.
+
+A work's entry also carries the text of the PDF, Word and text documents in
+its image folders (document_text.py, cached by file hash and capped per work).
 """
 
 import json
 import os
-from pathlib import Path
-
-def load_works():
-    """Load all works from works.json"""
-    with open('works.json', 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    return data['works']
-
-def load_exhibitions():
-    """Load exhibitions from exhibitions.json"""
-    try:
-        with open('exhibitions.json', 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        return data
-    except FileNotFoundError:
-        return {'solo': [], 'group': []}
-
-def lookup_exhibition(exhibition_id, exhibitions_data):
-    """Look up exhibition by ID"""
-    all_exhibitions = exhibitions_data.get('solo', []) + exhibitions_data.get('group', [])
-    for ex in all_exhibitions:
-        if ex.get('id') == exhibition_id:
-            return ex
-    return None
-
-def get_localized_value(field, lang='en'):
-    """Extract value from bilingual field or return string if legacy format"""
-    if not field:
-        return ''
-    if isinstance(field, dict) and (lang in field):
-        return field[lang]
-    if isinstance(field, dict):
-        # Fallback to any available language
-        return field.get('en', field.get('is', ''))
-    return str(field)  # Legacy string format
-
-def get_materials_string(materials, lang='en'):
-    """Convert materials to searchable string, handling various formats"""
-    if not materials:
-        return ''
-
-    # If it's a bilingual object with language keys
-    if isinstance(materials, dict) and (lang in materials or 'en' in materials or 'is' in materials):
-        mat = materials.get(lang, materials.get('en', materials.get('is', [])))
-        if isinstance(mat, list):
-            return ' '.join(mat)
-        return str(mat)
-
-    # If it's a simple list
-    if isinstance(materials, list):
-        return ' '.join(materials)
-
-    # If it's a string
-    return str(materials)
-
-def create_work_search_entry(work, exhibitions_data):
-    """Create a search entry for a work with bilingual content"""
-    work_id = work.get('id', '')
-
-    # Extract bilingual fields
-    title_en = get_localized_value(work.get('title'), 'en')
-    title_is = get_localized_value(work.get('title'), 'is')
-    desc_en = get_localized_value(work.get('description'), 'en')
-    desc_is = get_localized_value(work.get('description'), 'is')
-
-    # Handle materials in both languages
-    materials_en = get_materials_string(work.get('materials'), 'en')
-    materials_is = get_materials_string(work.get('materials'), 'is')
+import re
+
+from document_text import work_document_text
+from models import exhibitions_by_id, load_exhibitions, load_works
+from slugs import fold
+from years import first_year
+
+VOCABULARY_FILE = 'search-vocabulary.json'
+MIN_FUZZY_LENGTH = 4  # global-search.js only corrects words this long
+WORD_PATTERN = re.compile(r'[0-9a-z\u00c0-\u024f]+')  # same word split as global-search.js
+
+PASSAGES_FILE = 'search-passages.json'
+SENTENCE_END = re.compile(r'(?<=[.!?\u2026])\s+')
+MIN_PASSAGE_LENGTH = 60  # shorter sentences are joined to the next one
+ORIGINAL_WORD = re.compile(r'[0-9A-Za-z\u00c0-\u024f]+')  # WORD_PATTERN before folding
+
+SNIPPET_LENGTH = 150
+EXHIBITION_PAGES = {'solo': 'exhibitions-solo', 'group': 'exhibitions-group'}
+EXTRACTORS = {}  # translation document -> function (English, Icelandic content) -> entries on its page
+
+def create_work_search_entry(work, exhibitions_index, document_text=''):
+    """Create a search entry for a work with bilingual content (and the text of its documents)"""
+    title_en = work.title.en
+    title_is = work.title.is_
+    desc_en = work.description.en
+    desc_is = work.description.is_
 
     # Build searchable content (include both languages)
     content_parts = [
@@ -80,45 +63,34 @@ def create_work_search_entry(work, exhibitions_data):
         title_is,
         desc_en,
         desc_is,
-        str(work.get('year', '')),
-        ' '.join(work.get('tags', [])),
-        materials_en,
-        materials_is,
+        str(work.year) if work.year is not None else '',
+        ' '.join(work.tags),
+        ' '.join(work.materials.en),
+        ' '.join(work.materials.is_),
     ]
 
-    # Add exhibition info (handle ID references and bilingual objects)
-    for ex in work.get('exhibitions', []):
+    # Add exhibition info (ID references resolve through exhibitions.json)
+    for ex in work.exhibitions:
         if isinstance(ex, str):
-            # Exhibition ID reference - look up from exhibitions.json
-            exhibition = lookup_exhibition(ex, exhibitions_data)
-            if exhibition:
-                ex_title_en = get_localized_value(exhibition.get('title'), 'en')
-                ex_title_is = get_localized_value(exhibition.get('title'), 'is')
-                ex_venue_en = get_localized_value(exhibition.get('venue'), 'en')
-                ex_venue_is = get_localized_value(exhibition.get('venue'), 'is')
-                location = exhibition.get('location', '')
-                content_parts.extend([ex_title_en, ex_title_is, ex_venue_en, ex_venue_is, location])
-            else:
+            exhibition = exhibitions_index.get(ex)
+            if not exhibition:
                 # Legacy string exhibition (just add as-is)
                 content_parts.append(ex)
-        elif isinstance(ex, dict):
+                continue
+        else:
             # Unmatched exhibition with full bilingual data
-            ex_title_en = get_localized_value(ex.get('title'), 'en')
-            ex_title_is = get_localized_value(ex.get('title'), 'is')
-            ex_venue_en = get_localized_value(ex.get('venue'), 'en')
-            ex_venue_is = get_localized_value(ex.get('venue'), 'is')
-            location = ex.get('location', ex.get('city', ''))
-            content_parts.extend([ex_title_en, ex_title_is, ex_venue_en, ex_venue_is, location])
+            exhibition = ex
+        content_parts.extend([exhibition.title.en, exhibition.title.is_,
+                              exhibition.venue.en, exhibition.venue.is_, exhibition.location])
 
     # Add image captions
-    for img in work.get('images', []):
-        caption_en = get_localized_value(img.get('caption'), 'en')
-        caption_is = get_localized_value(img.get('caption'), 'is')
-        if caption_en:
-            content_parts.append(caption_en)
-        if caption_is:
-            content_parts.append(caption_is)
+    for img in work.images:
+        if img.caption.en:
+            content_parts.append(img.caption.en)
+        if img.caption.is_:
+            content_parts.append(img.caption.is_)
 
+    content_parts.append(document_text)
     content = ' '.join(filter(None, content_parts))
 
     # Create bilingual snippets
@@ -126,12 +98,12 @@ def create_work_search_entry(work, exhibitions_data):
     snippet_is = desc_is if desc_is else desc_en
     if len(snippet_en) > 150:
         snippet_en = snippet_en[:147] + '...'
-    elif not snippet_en and work.get('tags'):
-        snippet_en = ', '.join(work.get('tags', [])[:5])
+    elif not snippet_en and work.tags:
+        snippet_en = ', '.join(work.tags[:5])
     if len(snippet_is) > 150:
         snippet_is = snippet_is[:147] + '...'
-    elif not snippet_is and work.get('tags'):
-        snippet_is = ', '.join(work.get('tags', [])[:5])
+    elif not snippet_is and work.tags:
+        snippet_is = ', '.join(work.tags[:5])
 
     # Store both titles and snippets for bilingual display
     return {
@@ -145,13 +117,336 @@ def create_work_search_entry(work, exhibitions_data):
             "is": snippet_is
         },
         "content": content,
-        "url": f"works.html?work={work.get('id', '')}",
-        "year": work.get('year', ''),
+        "url": f"works.html?work={work.id}",
+        "year": work.year,
         "page": "works"
     }
 
-def rebuild_search_index():
-    """Rebuild the complete search index with bilingual support"""
+def _snippet(text):
+    return text[:SNIPPET_LENGTH - 3] + '...' if len(text) > SNIPPET_LENGTH else text
+
+
+def _both(en, is_):
+    """(English, Icelandic) with each falling back to the other when empty."""
+    return en or is_ or '', is_ or en or ''
+
+
+def _paired(en_items, is_items):
+    """Items of the English list with the Icelandic item at the same position ({} where there is none)."""
+    is_items = is_items or []
+    return [(item, is_items[i] if i < len(is_items) and isinstance(is_items[i], dict) else {})
+            for i, item in enumerate(en_items or [])]
+
+
+def document_entry(entry_type, page, title, snippet, content_parts, url=None, year=None):
+    """A non-work search entry; title and snippet are (English, Icelandic) pairs."""
+    title_en, title_is = _both(*title)
+    snippet_en, snippet_is = _both(*snippet)
+    return {
+        "type": entry_type,
+        "title": {"en": title_en or 'Untitled', "is": title_is or 'Untitled'},
+        "snippet": {"en": _snippet(snippet_en), "is": _snippet(snippet_is)},
+        "content": ' '.join(dict.fromkeys(str(part) for part in content_parts if part)),
+        "url": url or f"{page}.html",
+        "year": year,
+        "page": page,
+    }
+
+
+def extractor(document):
+    """Register the extractor of translations/<document>-en.json and -is.json (entries on <document>.html)."""
+    def register(func):
+        EXTRACTORS[document] = func
+        return func
+    return register
+
+
+def _listed_items(document, entry_type, en, is_, key):
+    """Entries for year-grouped {title, description, venue} items (reviews, publications, films)."""
+    entries = []
+    for group, is_group in _paired(en.get(key), is_.get(key)):
+        for item, is_item in _paired(group.get('items'), is_group.get('items')):
+            title = _both(item.get('title'), is_item.get('title'))
+            description = _both(item.get('description'), is_item.get('description'))
+            entries.append(document_entry(entry_type, document, title, description,
+                                          [*title, *description, item.get('venue'), group.get('year')],
+                                          year=first_year(group.get('year'))))
+    return entries
+
+
+def _yearly_lines(document, en, is_, key, title_key):
+    """One entry per year of plain-text items (activities, awards), titled '<page title> <year>'."""
+    page_title = _both(en.get('ui', {}).get(title_key), is_.get('ui', {}).get(title_key))
+    entries = []
+    for group, is_group in _paired(en.get(key), is_.get(key)):
+        year = group.get('year')
+        lines = [line for line in group.get('items') or [] if isinstance(line, str)]
+        is_lines = [line for line in is_group.get('items') or [] if isinstance(line, str)] or lines
+        entries.append(document_entry('page', document, tuple(f"{t} {year}" for t in page_title),
+                                      ('; '.join(lines), '; '.join(is_lines)), [year, *lines, *is_lines],
+                                      year=first_year(year)))
+    return entries
+
+
+@extractor('reviews')
+def review_entries(en, is_):
+    return _listed_items('reviews', 'review', en, is_, 'reviews')
+
+
+@extractor('publications')
+def publication_entries(en, is_):
+    return _listed_items('publications', 'publication', en, is_, 'publications')
+
+
+@extractor('films')
+def film_entries(en, is_):
+    return _listed_items('films', 'film', en, is_, 'films')
+
+
+@extractor('activities')
+def activity_entries(en, is_):
+    return _yearly_lines('activities', en, is_, 'activities', 'activitiesTitle')
+
+
+@extractor('awards')
+def award_entries(en, is_):
+    return _yearly_lines('awards', en, is_, 'awards', 'awardsTitle')
+
+
+@extractor('theater')
+def theater_entries(en, is_):
+    entries = []
+    for production, is_production in _paired(en.get('productions'), is_.get('productions')):
+        title = _both(production.get('title'), is_production.get('title'))
+        credits = ', '.join(filter(None, (production.get('author'), production.get('director'),
+                                          production.get('venue'))))
+        entries.append(document_entry('theater', 'theater', title, (credits, credits),
+                                      [*title, credits, production.get('year')],
+                                      year=first_year(production.get('year'))))
+    return entries
+
+
+@extractor('biography')
+def biography_entries(en, is_):
+    entries = []
+    for section, is_section in _paired(en.get('sections'), is_.get('sections')):
+        title = _both(section.get('title'), is_section.get('title'))
+        paragraphs = [p for p in section.get('paragraphs') or [] if p]
+        is_paragraphs = [p for p in is_section.get('paragraphs') or [] if p] or paragraphs
+        entries.append(document_entry('biography', 'biography', title,
+                                      (paragraphs[0] if paragraphs else '', is_paragraphs[0] if is_paragraphs else ''),
+                                      [*title, *paragraphs, *is_paragraphs]))
+    return entries
+
+
+@extractor('collections')
+def collection_entries(en, is_):
+    title = _both(en.get('ui', {}).get('collectionsTitle'), is_.get('ui', {}).get('collectionsTitle'))
+    introduction = en.get('introduction') or {}
+    paragraphs = [p for p in (introduction.get('paragraphs') or []) + (introduction.get('holdings') or []) if p]
+    first = paragraphs[0] if paragraphs else ''
+    entries = [document_entry('collections', 'collections', title, (first, first), [*title, *paragraphs])]
+    for institution, is_institution in _paired(en.get('institutions'), is_.get('institutions')):
+        name = _both(institution.get('name'), is_institution.get('name'))
+        for work, is_work in _paired(institution.get('works'), is_institution.get('works')):
+            work_title = _both(work.get('title'), is_work.get('title'))
+            kind = _both(work.get('type'), is_work.get('type'))
+            note = _both(work.get('note'), is_work.get('note'))
+            entries.append(document_entry('collection-work', 'collections', work_title,
+                                          tuple(', '.join(filter(None, parts)) for parts in zip(kind, name, note)),
+                                          [*work_title, *kind, *name, *note], year=first_year(work.get('note'))))
+    return entries
+
+
+@extractor('studios')
+def studio_entries(en, is_):
+    title = _both(en.get('ui', {}).get('studiosTitle'), is_.get('ui', {}).get('studiosTitle'))
+    introduction = [p for p in en.get('introduction') or [] if p]
+    is_introduction = [p for p in is_.get('introduction') or [] if p] or introduction
+    entries = [document_entry('page', 'studios', title,
+                              ((introduction or [''])[0], (is_introduction or [''])[0]),
+                              [*title, *introduction, *is_introduction])]
+    for studio, is_studio in _paired(en.get('studios'), is_.get('studios')):
+        studio_title = _both(studio.get('title'), is_studio.get('title'))
+        paragraphs = [p for p in studio.get('paragraphs') or [] if p]
+        is_paragraphs = [p for p in is_studio.get('paragraphs') or [] if p] or paragraphs
+        entries.append(document_entry('studio', 'studios', studio_title,
+                                      ((paragraphs or [''])[0], (is_paragraphs or [''])[0]),
+                                      [*studio_title, *paragraphs, *is_paragraphs, *(studio.get('tags') or []),
+                                       studio.get('period')],
+                                      url=f"studios.html#{studio['id']}" if studio.get('id') else None,
+                                      year=first_year(studio.get('period'))))
+    return entries
+
+
+def exhibition_entries(exhibitions_data):
+    """Entries for every solo and group exhibition in exhibitions.json (records from models)."""
+    entries = []
+    for kind, page in EXHIBITION_PAGES.items():
+        for exhibition in exhibitions_data.get(kind, []):
+            title = (exhibition.title.en, exhibition.title.is_)
+            venue = (exhibition.venue.en, exhibition.venue.is_)
+            notes = (exhibition.notes.en, exhibition.notes.is_) if exhibition.notes else ('', '')
+            snippet = tuple(notes[i] or ', '.join(filter(None, (venue[i], exhibition.location))) for i in (0, 1))
+            entries.append(document_entry(f'{kind}-exhibition', page, title, snippet,
+                                          [*title, *venue, exhibition.location, *notes, exhibition.year],
+                                          year=first_year(exhibition.year)))
+    return entries
+
+
+def _translation_pair(document):
+    pair = []
+    for lang in ('en', 'is'):
+        try:
+            with open(os.path.join('translations', f'{document}-{lang}.json'), 'r', encoding='utf-8') as f:
+                pair.append(json.load(f))
+        except FileNotFoundError:
+            pair.append({})
+    return pair
+
+
+def document_pages(document):
+    """The entry pages a document's extractor owns."""
+    if document == 'exhibitions':
+        return set(EXHIBITION_PAGES.values())
+    return {document}
+
+
+def extract_documents(documents, exhibitions_data):
+    """
+    Fresh entries of the given documents ('exhibitions', 'articles' or EXTRACTORS names).
+
+    Returns (entries, failed): the index keeps its previous entries for the
+    pages of failed documents, so a broken translation file does not make a
+    page vanish from search.
+    """
+    entries = []
+    failed = []
+    for document in documents:
+        try:
+            if document == 'exhibitions':
+                entries.extend(exhibition_entries(exhibitions_data))
+            elif document == 'articles':
+                from article_pages import article_search_entries
+                entries.extend(article_search_entries())
+            else:
+                entries.extend(EXTRACTORS[document](*_translation_pair(document)))
+        except Exception as e:
+            print(f"Error extracting {document}: {e}")
+            import traceback
+            traceback.print_exc()
+            failed.append(document)
+    return entries, failed
+
+
+def check_extracted(failed):
+    """Fail the run (after the index was written) so the build retries the failed documents."""
+    if failed:
+        raise RuntimeError(f"Search index kept the previous entries of {', '.join(failed)}: extraction failed")
+
+
+def translation_documents(paths):
+    """Documents with an extractor among changed translations/*.json paths."""
+    names = {os.path.basename(path).rsplit('-', 1)[0] for path in paths}
+    return sorted(names & set(EXTRACTORS))
+
+
+def search_words(text):
+    """Folded words of text, split the way global-search.js splits them."""
+    return WORD_PATTERN.findall(fold(text))
+
+
+def build_vocabulary(entries):
+    """{'words': sorted folded words, 'trigrams': {trigram: delta-encoded word numbers}}"""
+    words = set()
+    for entry in entries:
+        title = entry.get('title')
+        titles = ' '.join(title.values()) if isinstance(title, dict) else (title or '')
+        words.update(word for word in search_words(f"{titles} {entry.get('content', '')}")
+                     if len(word) >= MIN_FUZZY_LENGTH and not word.isdigit())
+    words = sorted(words)
+
+    trigrams = {}
+    for number, word in enumerate(words):
+        padded = f' {word} '
+        for i in range(len(padded) - 2):
+            numbers = trigrams.setdefault(padded[i:i + 3], [])
+            if not numbers or numbers[-1] != number:
+                numbers.append(number)
+
+    def deltas(numbers):
+        return [n - previous for previous, n in zip([0] + numbers, numbers)]
+
+    return {'words': words, 'trigrams': {gram: deltas(numbers) for gram, numbers in sorted(trigrams.items())}}
+
+
+def write_vocabulary(entries):
+    vocabulary = build_vocabulary(entries)
+    with open(VOCABULARY_FILE, 'w', encoding='utf-8') as f:
+        json.dump(vocabulary, f, ensure_ascii=False, separators=(',', ':'))
+    print(f"Search vocabulary: {len(vocabulary['words'])} words, {len(vocabulary['trigrams'])} trigrams")
+    return vocabulary
+
+
+def split_passages(text):
+    """(start, end) of the sentence-level passages of text; short sentences are joined to the next one."""
+    passages, start = [], None
+    position = 0
+    for sentence in SENTENCE_END.split(text):
+        position = text.index(sentence, position)
+        if start is None:
+            start = position
+        position += len(sentence)
+        if position - start >= MIN_PASSAGE_LENGTH:
+            passages.append((start, position))
+            start = None
+    if start is not None:
+        passages.append((start, position))
+    return passages
+
+
+def content_passages(content, texts, numbers):
+    """{lang: [[start, end, word, offset, word, offset, ...], ...]} for texts ({lang: text}) found in content.
+
+    start and end are offsets into the entry's content, which the client
+    already has, so passages carry no text of their own. Each word is its
+    number in the vocabulary, followed by its offset from the passage start.
+    Languages with the same text as English are left out; the client falls
+    back to English.
+    """
+    passages = {}
+    for lang, text in texts.items():
+        base = content.find(text) if text else -1
+        if base < 0 or (lang != 'en' and text == texts.get('en')):
+            continue
+        passages[lang] = []
+        for start, end in split_passages(text):
+            passage = [base + start, base + end]
+            for match in ORIGINAL_WORD.finditer(text, start, end):
+                number = numbers.get(fold(match.group()))
+                if number is not None:
+                    passage.extend((number, match.start() - start))
+            passages[lang].append(passage)
+    return passages
+
+
+def write_passages(entries, works, vocabulary):
+    """Passages of every work's description, keyed by entry url."""
+    numbers = {word: number for number, word in enumerate(vocabulary['words'])}
+    works_by_url = {f"works.html?work={work.id}": work for work in works}
+    passages = {}
+    for entry in entries:
+        work = works_by_url.get(entry.get('url')) if entry.get('type') == 'work' else None
+        if work is not None:
+            desc_en, desc_is = work.description.en, work.description.is_
+            passages[entry['url']] = content_passages(entry['content'], {'en': desc_en or desc_is,
+                                                                         'is': desc_is or desc_en}, numbers)
+    with open(PASSAGES_FILE, 'w', encoding='utf-8') as f:
+        json.dump(passages, f, separators=(',', ':'))
+
+
+def rebuild_search_index(works=None, exhibitions_data=None):
+    """Rebuild the complete search index with bilingual support (optionally from already loaded records)"""
 
     print("Rebuilding search index from bilingual works.json and exhibitions.json...")
 
@@ -159,32 +454,41 @@ def rebuild_search_index():
 
     # Load exhibitions data
     print("Loading exhibitions...")
-    exhibitions_data = load_exhibitions()
-    print(f"Loaded {len(exhibitions_data.get('solo', []))} solo + {len(exhibitions_data.get('group', []))} group exhibitions")
+    if exhibitions_data is None:
+        exhibitions_data = load_exhibitions()
+    exhibitions_index = exhibitions_by_id(exhibitions_data)
+    print(f"Loaded {len(exhibitions_data['solo'])} solo + {len(exhibitions_data['group'])} group exhibitions")
 
     # Add all works
-    works = load_works()
+    if works is None:
+        works = load_works()
     print(f"Processing {len(works)} works...")
+    document_texts = work_document_text(works)
 
     for work in works:
         try:
-            entry = create_work_search_entry(work, exhibitions_data)
+            entry = create_work_search_entry(work, exhibitions_index, document_texts.get(work.id, ''))
             searchable_content.append(entry)
         except Exception as e:
-            print(f"Error processing work {work.get('id', 'unknown')}: {e}")
+            print(f"Error processing work {work.id or 'unknown'}: {e}")
             import traceback
             traceback.print_exc()
 
-    # Read existing search index to preserve non-work entries
+    documents = ['exhibitions', 'articles'] + sorted(EXTRACTORS)
+    document_entries, failed = extract_documents(documents, exhibitions_data)
+    print(f"Extracted {len(document_entries)} entries from {len(documents) - len(failed)} documents")
+    searchable_content.extend(document_entries)
+
+    # Keep entries on pages no extractor covers, or whose extractor failed
+    owned = set().union(*(document_pages(document) for document in documents if document not in failed))
     existing_entries = []
     if os.path.exists('search-index.json'):
         with open('search-index.json', 'r', encoding='utf-8') as f:
             existing_data = json.load(f)
-            existing_entries = [e for e in existing_data.get('searchableContent', []) if e.get('type') != 'work']
-
-    print(f"Preserving {len(existing_entries)} non-work entries from existing index...")
-
-    # Combine new works with existing non-work entries
+            existing_entries = [e for e in existing_data.get('searchableContent', [])
+                                if e.get('type') != 'work' and e.get('page') not in owned]
+    if existing_entries:
+        print(f"Preserving {len(existing_entries)} entries from existing index...")
     searchable_content.extend(existing_entries)
 
     # Create search index structure
@@ -195,11 +499,56 @@ def rebuild_search_index():
     # Write to file
     with open('search-index.json', 'w', encoding='utf-8') as f:
         json.dump(search_index, f, indent=2, ensure_ascii=False)
+    write_passages(searchable_content, works, write_vocabulary(searchable_content))
 
     print(f"\nSearch index rebuilt successfully!")
     print(f"Total entries: {len(searchable_content)}")
     print(f"  - Works: {len([e for e in searchable_content if e['type'] == 'work'])}")
-    print(f"  - Other: {len(existing_entries)}")
+    print(f"  - Other: {len(document_entries) + len(existing_entries)}")
+    check_extracted(failed)
+
+def update_work_entries(work_ids, removed_ids=(), works=None, documents=()):
+    """Regenerate index entries for just the given works and documents, leaving everything else untouched"""
+    work_ids = set(work_ids)
+    removed_urls = {f"works.html?work={work_id}" for work_id in removed_ids}
+
+    with open('search-index.json', 'r', encoding='utf-8') as f:
+        search_index = json.load(f)
+
+    exhibitions_data = load_exhibitions()
+    exhibitions_index = exhibitions_by_id(exhibitions_data)
+    works = load_works() if works is None else works
+    works_by_id = {w.id: w for w in works if w.id in work_ids}
+    document_texts = work_document_text(works_by_id.values())
+    new_entries = {f"works.html?work={work_id}": create_work_search_entry(work, exhibitions_index,
+                                                                          document_texts.get(work_id, ''))
+                   for work_id, work in works_by_id.items()}
+
+    document_entries, failed = extract_documents(documents, exhibitions_data)
+    replaced = set().union(set(), *(document_pages(document) for document in documents if document not in failed))
+
+    content = []
+    for entry in search_index.get('searchableContent', []):
+        url = entry.get('url')
+        if entry.get('type') == 'work' and url in removed_urls:
+            continue
+        if entry.get('type') == 'work' and url in new_entries:
+            entry = new_entries.pop(url)
+        elif entry.get('type') != 'work' and entry.get('page') in replaced:
+            continue
+        content.append(entry)
+    content.extend(new_entries.values())
+    content.extend(document_entries)
+    search_index['searchableContent'] = content
+
+    with open('search-index.json', 'w', encoding='utf-8') as f:
+        json.dump(search_index, f, indent=2, ensure_ascii=False)
+    # word numbers change with the vocabulary, so all passages are rewritten with it
+    write_passages(content, works, write_vocabulary(content))
+
+    print(f"Search index updated for {len(works_by_id)} works"
+          f"{f' and {len(documents)} documents ({len(document_entries)} entries)' if documents else ''}")
+    check_extracted(failed)
 
 if __name__ == '__main__':
     rebuild_search_index()
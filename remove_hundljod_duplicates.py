@@ -3,14 +3,14 @@
 Remove duplicate hundljóð entries from works.json, keeping only the hundar-dogs-1970 work.
 """
 
-import json
+from store import WorksStore
 
 def remove_hundljod_duplicates():
     """Remove standalone hundljóð entries from works.json."""
 
     # Read the current works.json
-    with open('works.json', 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    store = WorksStore()
+    data = store.data
 
     # Track what we're removing
     original_count = len(data['works'])
@@ -33,9 +33,9 @@ def remove_hundljod_duplicates():
     # Update the data
     data['works'] = filtered_works
 
-    # Write the updated JSON back
-    with open('works.json', 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    # Write the updated JSON back (journalled, so the removal can be reverted)
+    store.changed()
+    store.save()
 
     # Print summary
     print(f"\nSummary:")
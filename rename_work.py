@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+Rename a work and/or move its image folder in one transaction.
+
+Moves images/<old folder> into images/<new folder> (merging into an existing
+twin folder and dropping byte-identical duplicates), renames derivatives whose
+names carry the old folder prefix, rewrites every reference to the moved files
+and every ?work= deep link across the site, updates the work id together with
+relatedWorks/parentWork links, records the old id in work-redirects.json and
+refreshes the affected search index entries. works.json is saved through the
+WorksStore, so the rename is journalled per record (journal.py). If any step
+fails everything is rolled back.
+
+Usage:
+  python rename_work.py OLD_ID NEW_ID                 - Rename work, move its own folders to images/NEW_ID
+  python rename_work.py OLD_ID NEW_ID --folder NAME   - Move its folders to images/NAME instead
+  python rename_work.py OLD_ID NEW_ID --keep-folder   - Only rename the work id
+  python rename_work.py --move-folder OLD NEW         - Only move/merge an image folder
+  Add --dry-run to print the plan without changing anything.
+"""
+
+import argparse
+import filecmp
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+from rewrite_urls import DEFAULT_TARGETS, RewriteRules, expand_targets, rewrite_file_text
+from site_index import IMAGES_DIR, normalize_path, scan_images, work_folder
+from store import WorksStore
+
+REDIRECTS_FILE = 'work-redirects.json'
+
+
+class RenameError(Exception):
+    pass
+
+
+class Transaction:
+    """Records file moves and writes so they can be undone if a later step fails."""
+
+    def __init__(self):
+        self.staging = tempfile.mkdtemp(prefix='.rename-work-', dir='.')
+        self.moves = []
+        self.originals = {}
+        self.saved = set()
+
+    def move(self, src, dst):
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        os.replace(src, dst)
+        self.moves.append((src, dst))
+
+    def discard(self, path):
+        """Move a file aside; it is only deleted when the transaction commits."""
+        self.move(path, os.path.join(self.staging, str(len(self.moves))))
+
+    def write(self, path, text):
+        path = Path(path)
+        if path not in self.originals:
+            self.originals[path] = path.read_text(encoding='utf-8') if path.exists() else None
+        path.write_text(text, encoding='utf-8')
+
+    def save(self, path, doc):
+        """Write works.json or exhibitions.json through the WorksStore, so the change is journalled."""
+        path = Path(path)
+        if path not in self.originals:
+            self.originals[path] = path.read_text(encoding='utf-8')
+        _save_document(path, doc)
+        self.saved.add(path)
+
+    def rollback(self):
+        for path, text in self.originals.items():
+            if text is None:
+                path.unlink(missing_ok=True)
+            elif path in self.saved:
+                _save_document(path, json.loads(text))  # journalled as well, undoing the entry above
+            else:
+                path.write_text(text, encoding='utf-8')
+        for src, dst in reversed(self.moves):
+            os.makedirs(os.path.dirname(src), exist_ok=True)
+            os.replace(dst, src)
+        shutil.rmtree(self.staging, ignore_errors=True)
+
+    def commit(self):
+        shutil.rmtree(self.staging, ignore_errors=True)
+
+
+def _save_document(path, doc):
+    store = WorksStore()
+    store.replace_document(path, doc)
+    store.save()
+
+
+def load_works_data():
+    with open('works.json', 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def work_folders(work):
+    """Image folders referenced by a work's images."""
+    return sorted({work_folder(normalize_path(img.get('url', ''))) for img in work.get('images', [])
+                   if img.get('url', '').startswith(IMAGES_DIR + '/')} - {''})
+
+
+def folder_users(works):
+    """Map image folder -> ids of works referencing it."""
+    users = {}
+    for work in works:
+        for folder in work_folders(work):
+            users.setdefault(folder, set()).add(work.get('id'))
+    return users
+
+
+def plan_folder_move(old_folder, new_folder, files):
+    """
+    Work out file moves for one folder.
+
+    Returns (moves, duplicates, mapping): moves are (src real path, dst path),
+    duplicates are real paths identical to a file already at the destination,
+    mapping is old site path -> new site path.
+    """
+    prefix = f"{IMAGES_DIR}/{old_folder}/"
+    moves, duplicates, mapping = [], [], {}
+    for path, (real_path, _) in sorted(files.items()):
+        if not path.startswith(prefix):
+            continue
+        relative = path[len(prefix):]
+        head, _, name = relative.rpartition('/')
+        if name.startswith(old_folder):
+            name = new_folder + name[len(old_folder):]
+        new_path = f"{IMAGES_DIR}/{new_folder}/" + (f"{head}/" if head else '') + name
+
+        if new_path in files and new_path != path:
+            if not filecmp.cmp(real_path, files[new_path][0], shallow=False):
+                raise RenameError(f"{new_path} already exists with different content (from {path})")
+            duplicates.append(real_path)
+        else:
+            moves.append((real_path, new_path))
+        mapping[path] = new_path
+    return moves, duplicates, mapping
+
+
+def deep_link_rule(old_id, new_id):
+    """Rule rewriting ?work=OLD deep links anywhere in a URL string."""
+    return {
+        'regex': rf'^(.*[?&]work=){re.escape(old_id)}([&#].*)?$',
+        'template': rf'\g<1>{new_id}\g<2>',
+    }
+
+
+def update_redirects(old_id, new_id, text):
+    """Add old->new to the redirect map, collapsing chains."""
+    redirects = json.loads(text) if text else {}
+    redirects = {old: (new_id if target == old_id else target) for old, target in redirects.items()}
+    redirects.pop(new_id, None)
+    redirects[old_id] = new_id
+    return json.dumps(redirects, indent=2, ensure_ascii=False, sort_keys=True)
+
+
+def rename(old_id=None, new_id=None, folder=None, keep_folder=False, move_folder=None, dry_run=False):
+    """Plan and execute a rename; returns the list of actions performed."""
+    data = load_works_data()
+    works = [w for w in data['works'] if isinstance(w, dict)]
+    works_by_id = {w.get('id'): w for w in works}
+    files = scan_images()
+    actions = []
+
+    # Folders to move: (old, new)
+    folder_moves = []
+    if move_folder:
+        folder_moves.append(move_folder)
+    if old_id:
+        if old_id not in works_by_id:
+            raise RenameError(f"Work not found: {old_id}")
+        if new_id != old_id and new_id in works_by_id:
+            raise RenameError(f"Work id already in use: {new_id}")
+        if not keep_folder:
+            target = folder or new_id
+            users = folder_users(works)
+            for current in work_folders(works_by_id[old_id]):
+                if current == target:
+                    continue
+                if users.get(current, set()) - {old_id}:
+                    others = ', '.join(sorted(users[current] - {old_id}))
+                    actions.append(f"Skip folder {current} (also used by {others})")
+                    continue
+                folder_moves.append((current, target))
+
+    # File moves and the path mapping for every reference to them
+    all_moves, all_duplicates, mapping = [], [], {}
+    for old_folder, new_folder in folder_moves:
+        if not any(path.startswith(f"{IMAGES_DIR}/{old_folder}/") for path in files):
+            raise RenameError(f"Folder not found or empty: {IMAGES_DIR}/{old_folder}")
+        moves, duplicates, folder_mapping = plan_folder_move(old_folder, new_folder, files)
+        all_moves.extend(moves)
+        all_duplicates.extend(duplicates)
+        mapping.update(folder_mapping)
+        actions.append(f"Move folder {IMAGES_DIR}/{old_folder} -> {IMAGES_DIR}/{new_folder} "
+                       f"({len(moves)} files, {len(duplicates)} duplicates dropped)")
+
+    rules_list = [deep_link_rule(old_id, new_id)] if old_id and new_id != old_id else []
+    rules = RewriteRules(exact=mapping, rules=rules_list)
+
+    # Compute every file's new text in memory before touching the disk
+    new_texts = {}
+    for path in expand_targets(DEFAULT_TARGETS):
+        text = path.read_text(encoding='utf-8')
+        new_text, changes = rewrite_file_text(path, text, rules)
+        if changes:
+            new_texts[path] = new_text
+            actions.append(f"Rewrite {len(changes)} references in {path.as_posix()}")
+
+    works_path = Path('works.json')
+    works_data = json.loads(new_texts.pop(works_path)) if works_path in new_texts else None
+    if old_id and new_id != old_id:
+        if works_data is None:
+            works_data = load_works_data()
+        for work in works_data['works']:
+            if not isinstance(work, dict):
+                continue
+            if work.get('id') == old_id:
+                work['id'] = new_id
+            if work.get('parentWork') == old_id:
+                work['parentWork'] = new_id
+            related = work.get('relatedWorks', [])
+            for i, item in enumerate(related):
+                if item == old_id:
+                    related[i] = new_id
+                elif isinstance(item, dict) and item.get('id') == old_id:
+                    item['id'] = new_id
+        actions.append(f"Rename work id {old_id} -> {new_id}")
+
+        redirects_path = Path(REDIRECTS_FILE)
+        current = redirects_path.read_text(encoding='utf-8') if redirects_path.exists() else ''
+        new_texts[redirects_path] = update_redirects(old_id, new_id, current)
+        actions.append(f"Add redirect {old_id} -> {new_id} to {REDIRECTS_FILE}")
+
+    if dry_run:
+        return actions
+
+    transaction = Transaction()
+    try:
+        for real_path, new_path in all_moves:
+            transaction.move(real_path, new_path)
+        for real_path in all_duplicates:
+            transaction.discard(real_path)
+        for path, text in new_texts.items():
+            transaction.write(path, text)
+        if works_data is not None:
+            transaction.save(works_path, works_data)
+
+        if old_id:
+            from rebuild_search_index import update_work_entries
+            removed = [old_id] if new_id != old_id else []
+            update_work_entries([new_id], removed_ids=removed)
+    except Exception:
+        transaction.rollback()
+        raise
+    transaction.commit()
+
+    # Remove folders emptied by the move
+    for old_folder, _ in folder_moves:
+        for dirpath, _, _ in sorted(os.walk(os.path.join(IMAGES_DIR, old_folder)), reverse=True):
+            if not os.listdir(dirpath):
+                os.rmdir(dirpath)
+
+    return actions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rename a work and move its images in one transaction")
+    parser.add_argument('old_id', nargs='?', help='Current work id')
+    parser.add_argument('new_id', nargs='?', help='New work id')
+    parser.add_argument('--folder', help='Target image folder name (default: NEW_ID)')
+    parser.add_argument('--keep-folder', action='store_true', help='Do not move image folders')
+    parser.add_argument('--move-folder', nargs=2, metavar=('OLD', 'NEW'), help='Move/merge an image folder only')
+    parser.add_argument('--dry-run', action='store_true', help='Print the plan without changing anything')
+    args = parser.parse_args()
+
+    if not args.move_folder and not (args.old_id and args.new_id):
+        parser.error('give OLD_ID NEW_ID and/or --move-folder OLD NEW')
+
+    try:
+        actions = rename(args.old_id, args.new_id, folder=args.folder, keep_folder=args.keep_folder,
+                         move_folder=tuple(args.move_folder) if args.move_folder else None,
+                         dry_run=args.dry_run)
+    except RenameError as e:
+        print(f"ERROR: {e}")
+        return 1
+
+    for action in actions:
+        print(action)
+    print("\nDry run - nothing changed." if args.dry_run else "\nRename complete.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
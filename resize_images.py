@@ -5,49 +5,18 @@ Resizes images to maximum 800x600 while maintaining aspect ratio.
 """
 
 import os
-import sys
-from PIL import Image
 import argparse
 
+from derivatives import Rendition, render
+
 def resize_image(input_path, output_path, max_width=800, max_height=600, quality=85):
     """
     Resize an image to fit within max_width x max_height while maintaining aspect ratio.
     """
     try:
-        with Image.open(input_path) as img:
-            # Convert to RGB if necessary (for PNG with transparency)
-            if img.mode in ('RGBA', 'LA', 'P'):
-                background = Image.new('RGB', img.size, (255, 255, 255))
-                if img.mode == 'P':
-                    img = img.convert('RGBA')
-                background.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
-                img = background
-            elif img.mode != 'RGB':
-                img = img.convert('RGB')
-
-            # Calculate new size maintaining aspect ratio
-            width, height = img.size
-            aspect_ratio = width / height
-
-            if width > max_width or height > max_height:
-                if aspect_ratio > max_width / max_height:
-                    # Width is the limiting factor
-                    new_width = max_width
-                    new_height = int(max_width / aspect_ratio)
-                else:
-                    # Height is the limiting factor
-                    new_height = max_height
-                    new_width = int(max_height * aspect_ratio)
-
-                img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
-
-            # Ensure output directory exists
-            os.makedirs(os.path.dirname(output_path), exist_ok=True)
-
-            # Save with specified quality
-            img.save(output_path, 'JPEG', quality=quality, optimize=True)
-            print(f"Resized {input_path} -> {output_path} ({img.size[0]}x{img.size[1]})")
-            return True
+        width, height = render(input_path, output_path, Rendition(max_width, max_height, quality=quality))
+        print(f"Resized {input_path} -> {output_path} ({width}x{height})")
+        return True
 
     except Exception as e:
         print(f"Error processing {input_path}: {e}")
@@ -3,14 +3,14 @@
 Restore important works that were removed during cleanup, but without broken image references.
 """
 
-import json
+from store import WorksStore
 
 def restore_missing_works():
     """Add back important works without broken image references."""
 
     # Read current works.json
-    with open('works.json', 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    store = WorksStore()
+    data = store.data
 
     # Works to restore (without broken image references)
     restored_works = [
@@ -131,9 +131,9 @@ def restore_missing_works():
     # Add restored works to the beginning of the works array
     data['works'] = restored_works + data['works']
 
-    # Write updated JSON
-    with open('works.json', 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    # Write updated JSON through the store (atomic, and journalled per work)
+    store.changed()
+    store.save()
 
     print(f"OK: Restored {len(restored_works)} important works:")
     for work in restored_works:
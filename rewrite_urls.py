@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Mapping-driven bulk rewrite of asset paths across the site's JSON and HTML files.
+
+A mapping file is JSON with an exact old->new table and/or ordered rules:
+
+  {
+    "exact": {"images/a/old.jpg": "images/a/medium/old-medium.jpg"},
+    "rules": [
+      {"regex": "^images/([^/]+)/medium/(.+)\\.jpg$", "template": "images/\\1/medium/\\2.webp"},
+      {"glob": "images/*/thumbs/*.JPG", "template": "images/\\1/thumbs/\\2.jpg", "ifExists": true}
+    ]
+  }
+
+Exact entries are a dict lookup; rules are tried in order and the first full
+match wins. Glob wildcards become numbered groups for the template. With
+"ifExists" a rewrite only applies when the new path exists under images/;
+values skipped that way are collected in RewriteRules.missing and counted in
+the summary.
+
+Files are rewritten token by token, so formatting and untouched values stay
+byte-identical and the dry-run diff shows only real changes. works.json and
+exhibitions.json are saved through the WorksStore, so the rewrite is
+journalled per record (journal.py) and can be reverted.
+
+Usage:
+  python rewrite_urls.py mapping.json            - Dry run with unified diff
+  python rewrite_urls.py mapping.json --apply    - Write the changes
+"""
+
+import argparse
+import difflib
+import json
+import os
+import re
+import sys
+from pathlib import Path
+
+from site_index import HTML_ASSET_PATTERN, normalize_path, scan_images
+
+DEFAULT_TARGETS = ['works.json', 'search-index.json', 'exhibitions.json', 'translations/*.json', '*.html']
+
+JSON_STRING_TOKEN = re.compile(r'"((?:[^"\\]|\\.)*)"(\s*:)?')
+
+
+def glob_to_regex(pattern):
+    """Translate a path glob into an anchored regex with one group per wildcard."""
+    out = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if pattern.startswith('**', i):
+            out.append('(.*)')
+            i += 2
+            continue
+        if char == '*':
+            out.append('([^/]*)')
+        elif char == '?':
+            out.append('([^/])')
+        else:
+            out.append(re.escape(char))
+        i += 1
+    return '^' + ''.join(out) + '$'
+
+
+class RewriteRules:
+    """Compiled exact table plus ordered patterns."""
+
+    def __init__(self, exact=None, rules=None):
+        self.exact = {normalize_path(old): new for old, new in (exact or {}).items()}
+        self.patterns = []
+        for rule in rules or []:
+            if 'regex' in rule:
+                source = rule['regex']
+                regex = re.compile(source)
+            elif 'glob' in rule:
+                source = rule['glob']
+                regex = re.compile(glob_to_regex(source))
+            else:
+                raise ValueError(f"Rule needs 'regex' or 'glob': {rule}")
+            self.patterns.append((regex, rule['template'], bool(rule.get('ifExists')), source))
+        self._existing = None
+        self.hits = {}
+        self.missing = {}  # value -> rewritten path an ifExists rule skipped because it is not under images/
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            mapping = json.load(f)
+        if isinstance(mapping, list):
+            # Plain list of {"old": ..., "new": ...} pairs
+            return cls(exact={m['old']: m['new'] for m in mapping})
+        return cls(exact=mapping.get('exact'), rules=mapping.get('rules'))
+
+    def _exists(self, path):
+        if self._existing is None:
+            self._existing = scan_images()
+        return normalize_path(path) in self._existing
+
+    def rewrite(self, value):
+        """Return the rewritten value, or None when no rule applies."""
+        key = normalize_path(value)
+        new = self.exact.get(key)
+        if new is not None:
+            self.hits['exact'] = self.hits.get('exact', 0) + 1
+            return new
+
+        for regex, template, if_exists, source in self.patterns:
+            match = regex.match(key)
+            if not match:
+                continue
+            new = match.expand(template)
+            if if_exists and not self._exists(new):
+                self.missing.setdefault(value, new)
+                continue
+            self.missing.pop(value, None)
+            self.hits[source] = self.hits.get(source, 0) + 1
+            return new
+        return None
+
+
+def rewrite_json_text(text, rules):
+    """Rewrite JSON string values in place; returns (new text, changes)."""
+    changes = []
+
+    def replace(match):
+        if match.group(2):
+            return match.group(0)  # object key
+        body = match.group(1)
+        value = json.loads(match.group(0)) if '\\' in body else body
+        new = rules.rewrite(value)
+        if new is None or new == value:
+            return match.group(0)
+        changes.append((value, new))
+        return json.dumps(new, ensure_ascii=False)
+
+    return JSON_STRING_TOKEN.sub(replace, text), changes
+
+
+def rewrite_html_text(text, rules):
+    """Rewrite asset attributes in an HTML page; returns (new text, changes)."""
+    changes = []
+
+    def replace(match):
+        value = match.group(1)
+        new = rules.rewrite(value)
+        if new is None or new == value:
+            return match.group(0)
+        changes.append((value, new))
+        start, end = match.span(1)
+        offset = match.start(0)
+        whole = match.group(0)
+        return whole[:start - offset] + new + whole[end - offset:]
+
+    return HTML_ASSET_PATTERN.sub(replace, text), changes
+
+
+def rewrite_file_text(path, text, rules):
+    """Rewrite one file's text with the JSON or HTML strategy chosen by suffix."""
+    if Path(path).suffix == '.json':
+        return rewrite_json_text(text, rules)
+    return rewrite_html_text(text, rules)
+
+
+def expand_targets(targets):
+    """Expand target globs into existing files, preserving order."""
+    files = []
+    for target in targets:
+        matches = sorted(Path('.').glob(target)) if any(c in target for c in '*?[') else [Path(target)]
+        files.extend(p for p in matches if p.is_file() and p not in files)
+    return files
+
+
+def rewrite_files(rules, targets=None, apply=False, show_diff=True, store=None):
+    """
+    Apply rules to every target file in one pass each.
+
+    Returns {file name: [(old, new), ...]} for files that changed.
+    """
+    if store is None:
+        from store import WorksStore
+        store = WorksStore()
+    store_paths = {os.path.normpath(store.works_path), os.path.normpath(store.exhibitions_path)}
+    changed = {}
+    for path in expand_targets(targets or DEFAULT_TARGETS):
+        text = path.read_text(encoding='utf-8')
+        new_text, changes = rewrite_file_text(path, text, rules)
+
+        if not changes:
+            continue
+        changed[path.as_posix()] = changes
+
+        if show_diff and not apply:
+            sys.stdout.writelines(difflib.unified_diff(
+                text.splitlines(keepends=True), new_text.splitlines(keepends=True),
+                fromfile=f"a/{path.as_posix()}", tofile=f"b/{path.as_posix()}", n=1))
+        if apply and os.path.normpath(path) in store_paths:
+            store.replace_document(path, json.loads(new_text))
+        elif apply:
+            path.write_text(new_text, encoding='utf-8')
+
+    store.save()
+    return changed
+
+
+def print_summary(changed, rules, apply):
+    total = sum(len(c) for c in changed.values())
+    print(f"\nSummary:")
+    for name, changes in changed.items():
+        print(f"  {name}: {len(changes)} rewrites")
+    for source, count in rules.hits.items():
+        print(f"  rule {source}: {count} matches")
+    if rules.missing:
+        print(f"  {len(rules.missing)} values left as they are because their ifExists target is missing")
+    print(f"Total rewrites: {total}")
+    if not apply and total:
+        print("Dry run - no files written. Use --apply to write changes.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rewrite asset paths across JSON and HTML files")
+    parser.add_argument('mapping', help='Mapping JSON file (exact table and/or rules)')
+    parser.add_argument('--apply', action='store_true', help='Write changes (default is a dry run)')
+    parser.add_argument('--files', nargs='+', help=f"Target files or globs (default: {' '.join(DEFAULT_TARGETS)})")
+    parser.add_argument('--no-diff', action='store_true', help='Only print the summary')
+    args = parser.parse_args()
+
+    rules = RewriteRules.from_file(args.mapping)
+    changed = rewrite_files(rules, args.files, apply=args.apply, show_diff=not args.no_diff)
+    print_summary(changed, rules, args.apply)
+
+
+if __name__ == '__main__':
+    main()
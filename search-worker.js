@@ -0,0 +1,509 @@
+// search-worker.js - Search engine for global-search.js, run in a Web Worker
+//
+// Loading and parsing search-index.json, preparing the entries and scoring
+// every entry on each query all happen here, off the main thread. The page
+// posts {type: 'search', id, query, filters, lang} and gets {type: 'results',
+// id, results} back; a query still waiting when a newer one arrives is
+// dropped unanswered. Where workers are unavailable (older browsers, pages
+// opened from file://) global-search.js loads this file as a plain script
+// and talks to a SearchEngine directly through the same messages.
+//
+// Typing extends a query one letter at a time, so work is kept between
+// queries: the entries containing a string are narrowed from those of its
+// longest already-seen prefix, only those candidates are scored, and the
+// scored list of a recent query is reused as is when only the filters change.
+
+// Map-backed least-recently-used cache
+class LRUCache {
+  constructor(limit) {
+    this.limit = limit;
+    this.map = new Map();
+  }
+
+  get(key) {
+    if (!this.map.has(key)) return undefined;
+    const value = this.map.get(key);
+    this.map.delete(key);
+    this.map.set(key, value);
+    return value;
+  }
+
+  set(key, value) {
+    this.map.delete(key);
+    this.map.set(key, value);
+    if (this.map.size > this.limit) this.map.delete(this.map.keys().next().value);
+  }
+
+  clear() {
+    this.map.clear();
+  }
+}
+
+class SearchEngine {
+  constructor(post) {
+    this.post = post;
+    this.prepared = null;
+    this.pending = null;
+    this.substringCache = new LRUCache(200); // lower-cased string -> entry numbers containing it
+    this.queryCache = new LRUCache(50);      // query -> [{ number, score }] best first, before filters
+  }
+
+  receive(message) {
+    if (message.type === 'load') {
+      this.load();
+    } else if (message.type === 'search') {
+      // Answer only the newest query: older ones queued behind it are replaced
+      const scheduled = this.pending !== null;
+      this.pending = message;
+      if (!scheduled) setTimeout(() => this.runPending(), 0);
+    }
+  }
+
+  runPending() {
+    if (!this.prepared) return; // run by load() once the index is in
+    const message = this.pending;
+    this.pending = null;
+    if (!message) return;
+    this.post({ type: 'results', id: message.id, results: this.search(message.query, message.filters, message.lang) });
+  }
+
+  load() {
+    const xhr = new XMLHttpRequest();
+    xhr.open('GET', 'search-index.json', true);
+    const self = this;
+    xhr.onreadystatechange = function() {
+      if (xhr.readyState !== 4) return;
+      if (xhr.status !== 200) {
+        console.error('Error loading search index:', xhr.status, xhr.statusText);
+        self.post({ type: 'error', message: 'Search is temporarily unavailable. Please try again later.' });
+        return;
+      }
+      try {
+        const data = JSON.parse(xhr.responseText);
+        self.prepared = data.searchableContent.map(item => self.prepareItem(item));
+        self.indexEntries();
+      } catch (error) {
+        console.error('Error parsing search index:', error);
+        self.post({ type: 'error', message: 'Unable to load search data. Please refresh the page.' });
+        return;
+      }
+      self.post({ type: 'ready', count: self.prepared.length });
+      self.runPending();
+    };
+    xhr.onerror = function() {
+      console.error('Network error loading search index');
+      self.post({ type: 'error', message: 'Network error. Please check your connection and try again.' });
+    };
+    xhr.send();
+  }
+
+  // Normalize Icelandic characters for better searching
+  normalizeIcelandic(text) {
+    // Fold table generated from slugs.py (fold-table.js) so search matches the Python tools
+    return foldIcelandic(text);
+  }
+
+  // Folded words, split like search_words() in rebuild_search_index.py
+  searchWords(text) {
+    return text.match(/[0-9a-z\u00c0-\u024f]+/g) || [];
+  }
+
+  // Lower-cased and folded fields of an index entry and its word counts, computed once instead of on every keystroke
+  prepareItem(item) {
+    const titleEn = (typeof item.title === 'object' ? (item.title.en || '') : (item.title || '')).toLowerCase();
+    const titleIs = (typeof item.title === 'object' ? (item.title.is || '') : '').toLowerCase();
+    const titleEnNorm = this.normalizeIcelandic(titleEn);
+    const titleIsNorm = this.normalizeIcelandic(titleIs);
+    const contentLower = item.content.toLowerCase();
+    const contentNormalized = this.normalizeIcelandic(contentLower);
+    const titleEnWords = this.searchWords(titleEnNorm);
+    const titleIsWords = this.searchWords(titleIsNorm);
+    return {
+      item, titleEn, titleIs, titleEnNorm, titleIsNorm, contentLower, contentNormalized,
+      titleEnWords, titleIsWords,
+      titleWords: this.countWords(titleEnWords.concat(titleIsWords)),
+      contentWords: this.countWords(this.searchWords(contentNormalized))
+    };
+  }
+
+  countWords(words) {
+    const counts = new Map();
+    words.forEach(word => counts.set(word, (counts.get(word) || 0) + 1));
+    return counts;
+  }
+
+  // Fetch a JSON file built with search-index.json; failures only cost the features using it
+  requestJSON(url, onLoad) {
+    const xhr = new XMLHttpRequest();
+    xhr.open('GET', url, true);
+    xhr.onreadystatechange = function() {
+      if (xhr.readyState !== 4 || xhr.status !== 200) return;
+      try {
+        onLoad(JSON.parse(xhr.responseText));
+      } catch (error) {
+        console.error(`Error parsing ${url}:`, error);
+      }
+    };
+    xhr.send();
+  }
+
+  // The vocabulary (typo matches) and the description passages (result snippets) are fetched on
+  // the first search; until they arrive results have no typo matches and show the stored snippet
+  loadSearchData() {
+    if (this.searchDataRequested) return;
+    this.searchDataRequested = true;
+    const self = this;
+    this.requestJSON('search-vocabulary.json', data => {
+      const trigrams = {};
+      Object.keys(data.trigrams).forEach(gram => {
+        let number = 0;
+        trigrams[gram] = data.trigrams[gram].map(delta => (number += delta));
+      });
+      self.vocabulary = data.words;
+      self.wordNumbers = new Map(data.words.map((word, number) => [word, number]));
+      self.trigrams = trigrams;
+      self.correctionCache = new Map();
+      self.queryCache.clear(); // scores change now that typos are matched
+      self.post({ type: 'data' });
+    });
+    this.requestJSON('search-passages.json', data => {
+      self.passages = data;
+      self.post({ type: 'data' });
+    });
+  }
+
+  // Vocabulary words a folded query word may be a typo of: [[word, similarity], ...].
+  // Similarity is (longer length - edit distance) / longer length and has to exceed 0.75,
+  // so only words of five or more letters are corrected, by one edit up to eight letters.
+  corrections(word) {
+    if (!this.trigrams || word.length < 5) return [];
+    if (this.correctionCache.has(word)) return this.correctionCache.get(word);
+
+    const maxDistance = Math.floor((word.length - 1) / 4);
+    const padded = ` ${word} `;
+    const grams = new Set();
+    for (let i = 0; i < padded.length - 2; i++) {
+      grams.add(padded.substr(i, 3));
+    }
+    // One edit changes at most three trigrams
+    const shared = new Map();
+    grams.forEach(gram => {
+      (this.trigrams[gram] || []).forEach(number => shared.set(number, (shared.get(number) || 0) + 1));
+    });
+    const needed = Math.max(1, grams.size - 3 * maxDistance);
+
+    const found = [];
+    shared.forEach((count, number) => {
+      const candidate = this.vocabulary[number];
+      if (count < needed || candidate === word || Math.abs(candidate.length - word.length) > maxDistance) return;
+      const distance = this.editDistance(candidate, word, maxDistance);
+      const longer = Math.max(candidate.length, word.length);
+      const similarity = (longer - distance) / longer;
+      if (distance <= maxDistance && similarity > 0.75) {
+        found.push([candidate, similarity]);
+      }
+    });
+    this.correctionCache.set(word, found);
+    return found;
+  }
+
+  // Levenshtein distance, giving up (returning max + 1) once it must exceed max
+  editDistance(a, b, max) {
+    let previous = [];
+    for (let j = 0; j <= b.length; j++) previous[j] = j;
+    for (let i = 1; i <= a.length; i++) {
+      const current = [i];
+      let rowMin = i;
+      for (let j = 1; j <= b.length; j++) {
+        current[j] = a.charAt(i - 1) === b.charAt(j - 1)
+          ? previous[j - 1]
+          : Math.min(previous[j - 1], current[j - 1], previous[j]) + 1;
+        rowMin = Math.min(rowMin, current[j]);
+      }
+      if (rowMin > max) return max + 1;
+      previous = current;
+    }
+    return previous[b.length];
+  }
+
+  // Best similarity of a title to a query with the same number of words, each either
+  // in the title or a correction of a title word; 0 if any query word has no match
+  titleSimilarity(titleWords, queryWords) {
+    if (titleWords.length === 0 || titleWords.length !== queryWords.length) return 0;
+    const inTitle = new Set(titleWords);
+    let total = 0;
+    for (const word of queryWords) {
+      if (inTitle.has(word.normalized)) {
+        total += 1;
+        continue;
+      }
+      const matches = word.corrections.filter(([candidate]) => inTitle.has(candidate));
+      if (matches.length === 0) return 0;
+      total += Math.max(...matches.map(([, similarity]) => similarity));
+    }
+    return total / queryWords.length;
+  }
+
+  // Entry numbers by folded word and by year, for finding typo and year matches without a scan
+  indexEntries() {
+    this.allEntries = this.prepared.map((fields, number) => number);
+    this.wordEntries = new Map();
+    this.yearEntries = new Map();
+    this.prepared.forEach((fields, number) => {
+      new Set([...fields.titleWords.keys(), ...fields.contentWords.keys()]).forEach(word => {
+        if (!this.wordEntries.has(word)) this.wordEntries.set(word, []);
+        this.wordEntries.get(word).push(number);
+      });
+      const year = String(fields.item.year);
+      if (!this.yearEntries.has(year)) this.yearEntries.set(year, []);
+      this.yearEntries.get(year).push(number);
+    });
+  }
+
+  // Numbers of the entries whose titles or content contain text (lower-cased, as typed or folded).
+  // An entry containing a string contains each of its prefixes, so the search starts from the
+  // entries of the longest prefix seen recently instead of the whole index.
+  containing(text) {
+    const cached = this.substringCache.get(text);
+    if (cached) return cached;
+    let pool = null;
+    for (let end = text.length - 1; end > 0 && !pool; end--) {
+      pool = this.substringCache.get(text.slice(0, end));
+    }
+    const folded = this.normalizeIcelandic(text);
+    const found = (pool || this.allEntries).filter(number => {
+      const fields = this.prepared[number];
+      return fields.titleEn.includes(text) || fields.titleIs.includes(text) || fields.contentLower.includes(text) ||
+        fields.titleEnNorm.includes(folded) || fields.titleIsNorm.includes(folded) ||
+        fields.contentNormalized.includes(folded);
+    });
+    this.substringCache.set(text, found);
+    return found;
+  }
+
+  // The best eight entries for a query, each with its snippet passage (if any) and without its content
+  search(query, filters, lang) {
+    this.loadSearchData();
+    let scored = this.queryCache.get(query);
+    if (!scored) {
+      scored = this.scoreQuery(query);
+      this.queryCache.set(query, scored);
+    }
+
+    return scored
+      .filter(({ number }) => this.passesFilters(this.prepared[number].item, filters))
+      .slice(0, 8) // Limit to 8 results
+      .map(({ number, score }) => {
+        const { content, ...result } = this.prepared[number].item;
+        result.score = score;
+        result.passage = this.passageSnippet(this.prepared[number].item, query, lang);
+        return result;
+      });
+  }
+
+  // Every entry scoring above zero, best first. Only candidates are scored: entries containing
+  // the query or one of its significant words, holding a typo correction of a query word, or,
+  // for a four-digit query, from that year; no other entry can score.
+  scoreQuery(query) {
+    const queryLower = query.toLowerCase();
+    const queryNormalized = this.normalizeIcelandic(queryLower);
+    const queryWords = queryLower.split(' ').filter(word => word.length > 2);
+
+    // Significant words (avoid common words), with their typo corrections looked up once per search
+    const significantWords = queryWords
+      .filter(word => word.length > 3 &&
+        !['the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'have', 'it', 'my', 'i'].includes(word))
+      .map(word => {
+        const normalized = this.normalizeIcelandic(word);
+        return { word, normalized, corrections: this.corrections(normalized) };
+      });
+    const queryTitleWords = this.searchWords(queryNormalized)
+      .map(normalized => ({ normalized, corrections: this.corrections(normalized) }));
+
+    const candidates = new Set(this.containing(queryLower));
+    significantWords.forEach(({ word }) => this.containing(word).forEach(number => candidates.add(number)));
+    significantWords.concat(queryTitleWords).forEach(({ corrections }) => {
+      corrections.forEach(([candidate]) => {
+        (this.wordEntries.get(candidate) || []).forEach(number => candidates.add(number));
+      });
+    });
+    if (query.match(/^\d{4}$/)) {
+      (this.yearEntries.get(query) || []).forEach(number => candidates.add(number));
+    }
+
+    return Array.from(candidates)
+      .sort((a, b) => a - b)
+      .map(number => {
+        const fields = this.prepared[number];
+        const { titleEn, titleIs, titleEnNorm, titleIsNorm, contentLower, contentNormalized } = fields;
+        let score = 0;
+
+        // Exact title match gets highest score - check BOTH languages
+        if (titleEn === queryLower || titleIs === queryLower ||
+            titleEnNorm === queryNormalized || titleIsNorm === queryNormalized) {
+          score += 1000;
+        } else if (titleEn.includes(queryLower) || titleIs.includes(queryLower) ||
+                   titleEnNorm.includes(queryNormalized) || titleIsNorm.includes(queryNormalized)) {
+          score += 500;
+        }
+
+        // Fuzzy title matching for typos - check both languages, use best score
+        const bestTitleSimilarity = Math.max(this.titleSimilarity(fields.titleEnWords, queryTitleWords),
+                                             this.titleSimilarity(fields.titleIsWords, queryTitleWords));
+        if (bestTitleSimilarity > 0.7 && bestTitleSimilarity < 1) {
+          score += Math.floor(bestTitleSimilarity * 300);
+        }
+
+        // Exact content phrase match
+        if (contentLower.includes(queryLower) || contentNormalized.includes(queryNormalized)) {
+          score += 200;
+        }
+
+        significantWords.forEach(({ word, normalized, corrections }) => {
+          // Regular matches - check both language titles
+          if (titleEn.includes(word) || titleIs.includes(word) ||
+              titleEnNorm.includes(normalized) || titleIsNorm.includes(normalized)) {
+            score += 50;
+          }
+          if (contentLower.includes(word) || contentNormalized.includes(normalized)) {
+            score += 20;
+          }
+
+          // Fuzzy word matching: each occurrence of a corrected spelling in the titles or content
+          corrections.forEach(([candidate, similarity]) => {
+            score += Math.floor(similarity * 30) * (fields.titleWords.get(candidate) || 0);
+            score += Math.floor(similarity * 15) * (fields.contentWords.get(candidate) || 0);
+          });
+        });
+
+        // Year matches
+        if (query.match(/^\d{4}$/) && String(fields.item.year) === query) {
+          score += 100;
+        }
+
+        return { number, score };
+      })
+      .filter(entry => entry.score > 0)
+      .sort((a, b) => b.score - a.score);
+  }
+
+  // The description passage of a result with the most query words (or typo corrections of them),
+  // those words marked from the offsets in search-passages.json; null when no passage has any
+  passageSnippet(result, query, lang) {
+    const byLang = this.passages && this.wordNumbers && this.passages[result.url];
+    const passages = byLang && (byLang[lang] || byLang.en);
+    if (!passages) return null;
+
+    const wanted = new Set();
+    this.searchWords(this.normalizeIcelandic(query.toLowerCase())).forEach(word => {
+      if (this.wordNumbers.has(word)) wanted.add(this.wordNumbers.get(word));
+      this.corrections(word).forEach(([candidate]) => wanted.add(this.wordNumbers.get(candidate)));
+    });
+
+    let best = null;
+    let bestWords = 0;
+    let bestOffsets = [];
+    passages.forEach(passage => {
+      const words = new Set();
+      const offsets = [];
+      for (let i = 2; i < passage.length; i += 2) {
+        if (wanted.has(passage[i])) {
+          words.add(passage[i]);
+          offsets.push(passage[i + 1]);
+        }
+      }
+      if (words.size > bestWords) {
+        best = passage;
+        bestWords = words.size;
+        bestOffsets = offsets;
+      }
+    });
+    if (!best) return null;
+
+    // Long passages are cut to a window starting shortly before the first match
+    let text = result.content.slice(best[0], best[1]);
+    let shift = 0;
+    let prefix = '';
+    let suffix = '';
+    bestOffsets.sort((a, b) => a - b);
+    if (text.length > 220) {
+      shift = Math.max(0, text.lastIndexOf(' ', Math.max(0, bestOffsets[0] - 60)) + 1);
+      prefix = shift > 0 ? '… ' : '';
+      suffix = shift + 220 < text.length ? ' …' : '';
+      text = text.slice(shift, shift + 220);
+    }
+
+    const word = /[0-9A-Za-z\u00c0-\u024f]+/y;
+    let html = '';
+    let last = 0;
+    bestOffsets.forEach(offset => {
+      word.lastIndex = offset - shift;
+      const match = offset - shift >= last ? word.exec(text) : null;
+      if (!match) return;
+      html += this.escapeHtml(text.slice(last, match.index)) +
+        `<mark class="search-highlight-word">${this.escapeHtml(match[0])}</mark>`;
+      last = match.index + match[0].length;
+    });
+    return prefix + html + this.escapeHtml(text.slice(last)) + suffix;
+  }
+
+  escapeHtml(text) {
+    return text.replace(/&/g, '&amp;').replace(/</g, '&lt;').replace(/>/g, '&gt;').replace(/"/g, '&quot;');
+  }
+
+  passesFilters(item, filters) {
+    // Type filter
+    if (filters.type !== 'all') {
+      if (filters.type === 'exhibition') {
+        if (!item.type.includes('exhibition')) return false;
+      } else if (filters.type === 'collection') {
+        if (item.type !== 'collections' && item.type !== 'collection-work') return false;
+      } else if (filters.type === 'work') {
+        if (item.type !== 'work') return false;
+      }
+    }
+
+    // Year filter
+    if (item.year && item.year > filters.year) return false;
+
+    // Medium filter (based on content keywords)
+    if (filters.medium !== 'all') {
+      const contentLower = item.content.toLowerCase();
+      const mediumMap = {
+        'sculpture': ['sculpture', 'sculptural'],
+        'sound': ['sound', 'audio', 'voice', 'poetry'],
+        'installation': ['installation', 'mixed media'],
+        'performance': ['performance', 'body']
+      };
+      
+      const mediumKeywords = mediumMap[filters.medium];
+      if (mediumKeywords && !mediumKeywords.some(keyword => contentLower.includes(keyword))) {
+        return false;
+      }
+    }
+
+    // Institution filter (based on content keywords)
+    if (filters.institution !== 'all') {
+      const contentLower = item.content.toLowerCase();
+      const institutionMap = {
+        'living-art': ['living art museum', 'nýlistasafnið'],
+        'national-gallery': ['national gallery', 'listasafn íslands'],
+        'reykjavik-art': ['reykjavik art museum', 'reykjavík art museum', 'hafnarhús', 'kjarvalstaðir']
+      };
+      
+      const institutionKeywords = institutionMap[filters.institution];
+      if (institutionKeywords && !institutionKeywords.some(keyword => contentLower.includes(keyword))) {
+        return false;
+      }
+    }
+
+    return true;
+  }
+}
+
+// Inside a worker: answer the page's messages
+if (typeof importScripts === 'function' && typeof document === 'undefined') {
+  importScripts('fold-table.js');
+  const engine = new SearchEngine(message => self.postMessage(message));
+  self.onmessage = event => engine.receive(event.data);
+}
@@ -0,0 +1,61 @@
+"""
+Toolkit settings (paths used by the maintenance scripts).
+
+Defaults live in toolkit.json; machine-specific overrides go in
+toolkit.local.json, which is not committed. config.json is not used here
+because it is served to the browser.
+"""
+
+import json
+import os
+
+SETTINGS_FILE = 'toolkit.json'
+LOCAL_SETTINGS_FILE = 'toolkit.local.json'
+
+DEFAULTS = {
+    'sourceDir': '../images-not-used',   # original, unprocessed images to ingest from
+    'archiveDir': '../images-not-used',  # where archived originals are moved
+    'trashDir': '.trash',                # where gc/archive moves unreferenced files
+    'previewPort': 8000,                 # local preview server
+    'previewCacheDir': '.preview-cache', # resized images served by the preview server
+    'previewCacheMB': 256,               # size cap of that cache (least recently used files go first)
+    'snapshotDir': '.snapshots',         # record-level snapshots of works.json/exhibitions.json
+    'snapshotKeep': 200,                 # snapshots kept before the oldest are pruned
+    'journalFile': '.journal.jsonl',     # JSON Patch log of every save through the store
+}
+
+_settings = None
+
+
+def load_settings():
+    """DEFAULTS overlaid with toolkit.json and toolkit.local.json (loaded once)."""
+    global _settings
+    if _settings is None:
+        settings = dict(DEFAULTS)
+        for path in (SETTINGS_FILE, LOCAL_SETTINGS_FILE):
+            if os.path.exists(path):
+                with open(path, 'r', encoding='utf-8') as f:
+                    settings.update(json.load(f))
+        _settings = settings
+    return _settings
+
+
+def setting(key):
+    return load_settings()[key]
+
+
+def override(**values):
+    """Override settings for this process (e.g. from command-line flags)."""
+    load_settings().update({k: v for k, v in values.items() if v is not None})
+
+
+def source_dir():
+    return setting('sourceDir')
+
+
+def archive_dir():
+    return setting('archiveDir')
+
+
+def trash_dir():
+    return setting('trashDir')
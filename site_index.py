@@ -0,0 +1,179 @@
+"""
+Shared filesystem and reference index for the images/ tree.
+
+Builds the set of asset paths referenced by the site's JSON and HTML sources
+and a single-walk index of what actually exists on disk, so scripts can diff
+the two without a stat call per image.
+"""
+
+import os
+import re
+import unicodedata
+from pathlib import Path
+
+from data_cache import load_json
+
+IMAGES_DIR = 'images'
+
+# JSON documents whose string values may point at files under images/
+JSON_SOURCES = ['works.json', 'exhibitions.json', 'search-index.json']
+JSON_SOURCE_GLOBS = ['translations/*.json']
+
+# Attributes that load an asset in the static HTML pages
+HTML_ASSET_PATTERN = re.compile(r'''(?:src|href|poster|data-src)\s*=\s*["']([^"']+)["']''')
+
+MEDIA_EXTENSIONS = ('.mp4', '.webm', '.ogg', '.mov', '.avi',
+                    '.mp3', '.wav', '.aiff', '.m4a', '.flac', '.pdf')
+
+
+def normalize_path(path):
+    """Normalise a site-relative path so JSON references and disk names compare equal."""
+    path = unicodedata.normalize('NFC', path.strip())
+    if path.startswith('./'):
+        path = path[2:]
+    return path.replace('\\', '/')
+
+
+def is_local_asset(value):
+    """True if a string looks like a reference to a file under images/."""
+    return isinstance(value, str) and value.startswith(IMAGES_DIR + '/') and '\n' not in value
+
+
+def scan_images(root=IMAGES_DIR, sizes=True):
+    """Walk root once with os.scandir and return {normalised path: (real path, size)}.
+
+    sizes=False leaves the size None and saves a stat call per file, for callers
+    that only test existence.
+    """
+    index = {}
+    stack = [root]
+    while stack:
+        current = stack.pop()
+        try:
+            entries = os.scandir(current)
+        except FileNotFoundError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    index[normalize_path(entry.path)] = (entry.path, entry.stat().st_size if sizes else None)
+    return index
+
+
+def get_thumb_path(url):
+    """Python port of WorksManager.getThumbPath in works.js."""
+    lower = url.lower()
+    if any(ext in lower for ext in MEDIA_EXTENSIONS):
+        return url
+    if '/thumbs/' in url or url.endswith('-thumb.jpg'):
+        return url
+
+    parts = url.split('/')
+    file_name = parts[-1]
+    if '/medium/' in url:
+        if '-medium.' in file_name:
+            file_base = file_name.replace('-medium.', '.', 1)
+            file_base = file_base[:file_base.rfind('.')]
+        else:
+            file_base = file_name[:file_name.rfind('.')]
+        path_parts = parts[:-1]
+        path_parts[path_parts.index('medium')] = 'thumbs'
+        return '/'.join(path_parts) + '/' + file_base + '-thumb.jpg'
+
+    if len(parts) >= 3:
+        file_base = file_name[:file_name.rfind('.')]
+        return '/'.join(parts[:-1]) + '/' + file_base + '-thumb.jpg'
+    return url
+
+
+def get_medium_path(url):
+    """Python port of WorksManager.getMediumPath in works.js (the image shown in the work modal)."""
+    lower = url.lower()
+    if any(ext in lower for ext in MEDIA_EXTENSIONS):
+        return url
+    if '/medium/' in url or url.endswith('-medium.jpg'):
+        return url
+
+    parts = url.split('/')
+    if len(parts) >= 3:
+        file_name = parts[-1]
+        file_base = file_name[:file_name.rfind('.')]
+        return '/'.join(parts[:-1]) + '/medium/' + file_base + '-medium.jpg'
+    return url
+
+
+def iter_json_strings(node, path='', accept=None):
+    """
+    Yield (json path, string) for every string value in a parsed JSON document.
+
+    With accept, only strings for which accept(string) is true are yielded,
+    and the path is only formatted for those (search-index.json holds tens of
+    thousands of strings, few of them asset paths).
+    """
+    if isinstance(node, str):
+        if accept is None or accept(node):
+            yield path, node
+        return
+    stack = [(path, node)]
+    while stack:
+        where, value = stack.pop()
+        for key, child in value.items() if isinstance(value, dict) else enumerate(value):
+            if isinstance(child, str):
+                if accept is None or accept(child):
+                    yield f"{where}/{key}", child
+            elif isinstance(child, (dict, list)):
+                stack.append((f"{where}/{key}", child))
+
+
+def json_source_files(root='.'):
+    """List the JSON sources that may reference assets, relative to root."""
+    root = Path(root)
+    files = [root / name for name in JSON_SOURCES if (root / name).exists()]
+    for pattern in JSON_SOURCE_GLOBS:
+        files.extend(sorted(root.glob(pattern)))
+    return files
+
+
+def html_source_files(root='.'):
+    """List the top-level HTML pages of the site."""
+    return sorted(Path(root).glob('*.html'))
+
+
+def collect_references(root='.', include_derived=True):
+    """
+    Read every JSON and HTML source once and return {normalised path: [sources]}.
+
+    Image urls in works.json also reference the thumbnail and medium image the
+    front end derives from them (getThumbPath, getMediumPath), so those are
+    included unless disabled.
+    """
+    references = {}
+
+    def add(path, source):
+        references.setdefault(normalize_path(path), []).append(source)
+
+    for json_file in json_source_files(root):
+        data = load_json(json_file)
+        name = json_file.as_posix()
+        for where, value in iter_json_strings(data, accept=is_local_asset):
+            add(value, f"{name}#{where}")
+            if include_derived and name.endswith('works.json') and where.endswith('/url'):
+                for kind, derived in (('thumb', get_thumb_path(value)), ('medium', get_medium_path(value))):
+                    if derived != value:
+                        add(derived, f"{name}#{where} (derived {kind})")
+
+    for html_file in html_source_files(root):
+        text = html_file.read_text(encoding='utf-8')
+        for match in HTML_ASSET_PATTERN.finditer(text):
+            if is_local_asset(match.group(1)):
+                add(match.group(1), html_file.name)
+
+    return references
+
+
+def work_folder(path):
+    """Return the work folder name for a path under images/."""
+    parts = path.split('/')
+    return parts[1] if len(parts) > 2 else ''
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Shared transliteration, slug and id registry for works and exhibitions.
+
+fold() is the accent/Icelandic folding used for search; slugify() builds ids
+from titles; IdRegistry detects ids that collide across works.json and
+exhibitions.json (including underscore/hyphen twins) and hands out unique ones.
+ingest_work_id() gives the ingest scripts the id for a source folder, reusing
+the legacy id of a work ingested before these rules.
+The same fold table is emitted as fold-table.js so the browser folds text
+exactly like the Python tools.
+
+Usage:
+  python slugs.py check           - Report colliding work/exhibition ids
+  python slugs.py emit-js         - Regenerate fold-table.js
+  python slugs.py slug TEXT...    - Print the slug for TEXT
+"""
+
+import json
+import os
+import re
+import sys
+
+from years import YEAR_PATTERN
+
+# Single characters folded to ASCII (applied after lower-casing)
+FOLD_MAP = {
+    'á': 'a', 'à': 'a', 'ä': 'a', 'â': 'a', 'å': 'a', 'ã': 'a',
+    'é': 'e', 'è': 'e', 'ë': 'e', 'ê': 'e',
+    'í': 'i', 'ì': 'i', 'ï': 'i', 'î': 'i',
+    'ó': 'o', 'ò': 'o', 'ö': 'o', 'ô': 'o', 'õ': 'o', 'ø': 'o',
+    'ú': 'u', 'ù': 'u', 'ü': 'u', 'û': 'u',
+    'ý': 'y', 'ÿ': 'y',
+    'þ': 'th', 'ð': 'd',
+    'æ': 'ae', 'ß': 'ss', 'ç': 'c', 'ñ': 'n',
+}
+
+FOLD_TABLE = str.maketrans(FOLD_MAP)
+
+# Characters dropped from slugs instead of becoming separators
+SLUG_DROP_TABLE = str.maketrans('', '', "'’`\"")
+
+NON_SLUG_CHARS = re.compile(r'[^a-z0-9]+')
+
+FOLD_JS_FILE = 'fold-table.js'
+
+
+def fold(text):
+    """Lower-case and fold Icelandic/accented characters to ASCII."""
+    return text.lower().translate(FOLD_TABLE)
+
+
+def slugify(text, max_length=None):
+    """Fold text and join its alphanumeric runs with hyphens."""
+    slug = NON_SLUG_CHARS.sub('-', fold(text).translate(SLUG_DROP_TABLE)).strip('-')
+    if max_length:
+        slug = slug[:max_length].strip('-')
+    return slug
+
+
+def clean_work_id(work_name):
+    """Convert a work folder name to an id, appending the year unless already present."""
+    slug = slugify(work_name)
+    match = YEAR_PATTERN.search(work_name)
+    if match and match.group(0) not in slug.split('-'):
+        return f"{slug}-{match.group(0)}"
+    return slug
+
+
+# Folding of the per-script clean_work_id() copies slugs.py replaced
+LEGACY_FOLD_TABLE = str.maketrans({
+    'á': 'a', 'à': 'a', 'ä': 'a', 'â': 'a', 'é': 'e', 'è': 'e', 'ë': 'e', 'ê': 'e',
+    'í': 'i', 'ì': 'i', 'ï': 'i', 'î': 'i', 'ó': 'o', 'ò': 'o', 'ö': 'o', 'ô': 'o',
+    'ú': 'u', 'ù': 'u', 'ü': 'u', 'û': 'u', 'ý': 'y', 'ÿ': 'y',
+    'þ': 'th', 'ð': 'd', 'æ': 'ae', 'ø': 'o',
+})
+
+
+def _legacy_year(work_name, hyphenated):
+    year = None
+    for word in work_name.split():
+        if word.isdigit() and len(word) == 4 and word.startswith(('19', '20')):
+            return word
+        if hyphenated and '-' in word:
+            year = next((part for part in word.split('-') if part.isdigit() and len(part) == 4), year)
+    return year
+
+
+def legacy_work_ids(work_name):
+    """
+    The ids the ingest scripts derived before slugs.py: punctuation deleted
+    rather than separating words, and the year appended even when the name
+    ends in it (rumbjarni-sudurgata-7-1976-1976). Most copies also took the
+    year from a hyphenated word like 1975-1976; process_remaining_klm_works
+    did not, so both forms are returned.
+    """
+    slug = re.sub(r'\s+', '-', re.sub(r'[^a-z0-9\s]', '', work_name.lower().translate(LEGACY_FOLD_TABLE))).strip('-')
+    years = [_legacy_year(work_name, hyphenated) for hyphenated in (True, False)]
+    return list(dict.fromkeys(f"{slug}-{year}" if year else slug for year in years))
+
+
+def ingest_work_id(work_name, works_path='works.json', images_dir='images'):
+    """
+    The id to ingest a source folder under, or None if works.json already has the work.
+
+    Works ingested before slugs.py carry legacy ids, so clean_work_id() and
+    legacy_work_ids() are both looked up: a rerun skips a work already in
+    works.json and reuses an images/ folder left by an earlier run, instead of
+    adding a twin under the new id.
+    """
+    candidates = list(dict.fromkeys([clean_work_id(work_name)] + legacy_work_ids(work_name)))
+    registry = IdRegistry.from_files(works_path)
+    if any(registry.ids.get(work_id) == 'work' for work_id in candidates):
+        return None
+    return next((work_id for work_id in candidates if os.path.isdir(os.path.join(images_dir, work_id))),
+                candidates[0])
+
+
+def id_key(item_id):
+    """Comparison key under which two ids count as the same (case, accents, _ vs -)."""
+    return slugify(str(item_id))
+
+
+class IdRegistry:
+    """Index of ids across works and exhibitions, keyed by their slug form."""
+
+    def __init__(self):
+        self.ids = {}    # id -> kind
+        self.keys = {}   # id_key -> [ids]
+
+    @classmethod
+    def from_files(cls, works_path='works.json', exhibitions_path='exhibitions.json'):
+        registry = cls()
+        with open(works_path, 'r', encoding='utf-8') as f:
+            for work in json.load(f).get('works', []):
+                if isinstance(work, dict) and work.get('id'):
+                    registry.add(work['id'], 'work')
+        try:
+            with open(exhibitions_path, 'r', encoding='utf-8') as f:
+                exhibitions = json.load(f)
+        except FileNotFoundError:
+            exhibitions = {}
+        for kind in ('solo', 'group'):
+            for exhibition in exhibitions.get(kind, []):
+                if exhibition.get('id'):
+                    registry.add(exhibition['id'], f"{kind}-exhibition")
+        return registry
+
+    def add(self, item_id, kind):
+        """Register an existing id (duplicates are kept so they can be reported)."""
+        self.ids.setdefault(item_id, kind)
+        self.keys.setdefault(id_key(item_id), []).append(item_id)
+
+    def is_taken(self, item_id):
+        return id_key(item_id) in self.keys
+
+    def claim(self, candidate, kind):
+        """Register and return candidate, suffixed -2, -3... if it collides."""
+        base = slugify(candidate) or kind
+        item_id = base
+        n = 2
+        while self.is_taken(item_id):
+            item_id = f"{base}-{n}"
+            n += 1
+        self.add(item_id, kind)
+        return item_id
+
+    def collisions(self):
+        """Groups of ids sharing a key: exact duplicates and near-twins like a_b / a-b."""
+        return {key: ids for key, ids in self.keys.items() if len(ids) > 1}
+
+
+def fold_table_js():
+    """JavaScript source for the browser copy of the fold table."""
+    chars = ''.join(sorted(FOLD_MAP))
+    mapping = json.dumps(FOLD_MAP, ensure_ascii=False, sort_keys=True)
+    return (
+        "// fold-table.js - generated by slugs.py (python slugs.py emit-js), do not edit by hand.\n"
+        "// Same character folding as fold() in slugs.py, used by global search.\n"
+        f"var ICELANDIC_FOLD_MAP = {mapping};\n"
+        f"var ICELANDIC_FOLD_PATTERN = /[{chars}]/g;\n"
+        "\n"
+        "function foldIcelandic(text) {\n"
+        "  return text.toLowerCase().replace(ICELANDIC_FOLD_PATTERN, char => ICELANDIC_FOLD_MAP[char]);\n"
+        "}\n"
+    )
+
+
+def emit_js(path=FOLD_JS_FILE):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(fold_table_js())
+    print(f"Wrote {path} ({len(FOLD_MAP)} folded characters)")
+
+
+def check_collisions():
+    registry = IdRegistry.from_files()
+    collisions = registry.collisions()
+    for key, ids in sorted(collisions.items()):
+        described = ', '.join(f"{i} ({registry.ids[i]})" for i in ids)
+        print(f"{key}: {described}")
+    print(f"\n{len(registry.ids)} ids checked, {len(collisions)} collisions")
+    return 1 if collisions else 0
+
+
+if __name__ == '__main__':
+    command = sys.argv[1] if len(sys.argv) > 1 else 'check'
+    if command == 'check':
+        sys.exit(check_collisions())
+    elif command == 'emit-js':
+        emit_js()
+    elif command == 'slug':
+        print(slugify(' '.join(sys.argv[2:])))
+    else:
+        print(f"Unknown command: {command}")
+        print("Use 'check', 'emit-js' or 'slug'")
+        sys.exit(1)
@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+"""
+Record-level, content-addressed snapshots of works.json and exhibitions.json.
+
+Every work and exhibition is stored once as a compressed blob named by the
+hash of its JSON; a snapshot is a small manifest listing the blobs of each
+file in order. A work that did not change between snapshots costs nothing,
+so a snapshot after editing one work adds one blob plus the compressed
+manifest (about 10 KB) instead of another 640 KB copy of works.json. mp takes a snapshot before
+every command that writes the data files, and the data-fixing scripts take
+one before they save.
+
+Snapshot references: an id or a unique prefix of one, `latest`, or a date
+and time such as 2026-10-19T11:30 for the last snapshot taken at or before it.
+
+Usage:
+  python snapshots.py list                      - Snapshots, newest last
+  python snapshots.py take [LABEL]              - Snapshot the current files
+  python snapshots.py diff REF [REF2]           - Works/exhibitions changed since REF (or between two)
+  python snapshots.py diff REF --work ID        - Field changes of one work
+  python snapshots.py restore REF [WORK_ID...]  - Restore whole files, or just the given works
+  python snapshots.py prune [--keep N]          - Drop old snapshots and unreferenced blobs
+  python snapshots.py import-backups FILE...    - Turn old works.json.backup* copies into snapshots
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+import zlib
+from datetime import datetime
+
+from data_cache import load_json
+from settings import setting
+from store import write_json_atomic
+
+SNAPSHOT_FILES = ('works.json', 'exhibitions.json')
+TIME_FORMAT = '%Y-%m-%dT%H:%M:%S'
+HASH_LENGTH = 20  # hex digits of sha1 kept per record; plenty for a few thousand records
+MANIFEST_SUFFIX = '.z'
+
+
+class SnapshotError(Exception):
+    pass
+
+
+def _root():
+    return setting('snapshotDir')
+
+
+def _blob_path(digest):
+    return os.path.join(_root(), 'objects', digest[:2], digest[2:])
+
+
+def _manifest_dir():
+    return os.path.join(_root(), 'manifests')
+
+
+def _compact(value):
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _write_compressed(path, raw):
+    """Write zlib-compressed bytes atomically; returns the compressed size."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    data = zlib.compress(raw, 9)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return len(data)
+
+
+def _read_compressed(path):
+    with open(path, 'rb') as f:
+        return json.loads(zlib.decompress(f.read()).decode('utf-8'))
+
+
+def _write_blob(record, write=True):
+    """Store one record; returns (hash, bytes written, 0 if it was already stored)."""
+    raw = _compact(record)
+    digest = hashlib.sha1(raw).hexdigest()[:HASH_LENGTH]
+    path = _blob_path(digest)
+    if not write or os.path.exists(path):
+        return digest, 0
+    return digest, _write_compressed(path, raw)
+
+
+def _read_blob(digest):
+    try:
+        return _read_compressed(_blob_path(digest))
+    except FileNotFoundError:
+        raise SnapshotError(f"snapshot store is missing record {digest}")
+
+
+def _split(doc):
+    """Document -> its lists of records (stored as blobs) and everything else."""
+    lists = {key: value for key, value in doc.items()
+             if isinstance(value, list) and value and all(isinstance(item, dict) for item in value)}
+    rest = {key: (None if key in lists else value) for key, value in doc.items()}
+    return lists, rest
+
+
+def _store_document(doc, write=True):
+    """
+    Blobs for one document; returns (file entry for the manifest, new bytes written).
+
+    The entry lists [record id, blob hash] per record, so diffs and single-work
+    restores never have to open blobs they do not need.
+    """
+    lists, rest = _split(doc)
+    written = 0
+    entry = {'lists': {}}
+    for key, items in lists.items():
+        records = []
+        for item in items:
+            digest, size = _write_blob(item, write)
+            records.append([item.get('id'), digest])
+            written += size
+        entry['lists'][key] = records
+    entry['rest'], size = _write_blob(rest, write)
+    return entry, written + size
+
+
+def _load_document(entry):
+    doc = _read_blob(entry['rest'])
+    for key, records in entry['lists'].items():
+        doc[key] = [_read_blob(digest) for _, digest in records]
+    return doc
+
+
+def _save_manifest(files, label, when, written):
+    body = json.dumps(files, sort_keys=True)
+    stamp = f"{time.strftime('%Y%m%d-%H%M%S', time.localtime(when))}{int(when % 1 * 1000):03d}"
+    snapshot_id = f"{stamp}-{hashlib.sha1(body.encode()).hexdigest()[:6]}"
+    manifest = {
+        'id': snapshot_id,
+        'time': time.strftime(TIME_FORMAT, time.localtime(when)),
+        'label': label,
+        'written': written,
+        'files': files,
+    }
+    manifest['size'] = _write_compressed(os.path.join(_manifest_dir(), snapshot_id + MANIFEST_SUFFIX),
+                                         _compact(manifest))
+    return manifest
+
+
+def snapshot_ids():
+    """Ids of all snapshots, oldest first (ids start with their time)."""
+    try:
+        return sorted(n[:-len(MANIFEST_SUFFIX)] for n in os.listdir(_manifest_dir()) if n.endswith(MANIFEST_SUFFIX))
+    except FileNotFoundError:
+        return []
+
+
+def load_manifest(snapshot_id):
+    return _read_compressed(os.path.join(_manifest_dir(), snapshot_id + MANIFEST_SUFFIX))
+
+
+def list_snapshots():
+    """All manifests, oldest first."""
+    return [load_manifest(snapshot_id) for snapshot_id in snapshot_ids()]
+
+
+def take(label='manual', paths=SNAPSHOT_FILES, quiet=False):
+    """Snapshot the data files; returns the snapshot id (the latest one if nothing changed)."""
+    files = {}
+    written = 0
+    for path in paths:
+        if os.path.exists(path):
+            files[path], size = _store_document(load_json(path))
+            written += size
+    ids = snapshot_ids()
+    if ids and load_manifest(ids[-1])['files'] == files:
+        return ids[-1]
+    manifest = _save_manifest(files, label, time.time(), written)
+    if not quiet:
+        print(f"Snapshot {manifest['id']} ({label}): {(written + manifest['size']) / 1024:.1f} KB")
+    if len(ids) + 1 > setting('snapshotKeep'):
+        prune(setting('snapshotKeep'), quiet=True)
+    return manifest['id']
+
+
+def resolve(ref):
+    """Manifest for a snapshot id, unique id prefix, `latest` or a point in time."""
+    ids = snapshot_ids()
+    if not ids:
+        raise SnapshotError('no snapshots taken yet')
+    if ref == 'latest':
+        return load_manifest(ids[-1])
+    matches = [snapshot_id for snapshot_id in ids if snapshot_id.startswith(ref)]
+    if len(matches) == 1:
+        return load_manifest(matches[0])
+    if len(matches) > 1:
+        raise SnapshotError(f"{ref} matches {len(matches)} snapshots; give more of the id")
+    try:
+        moment = datetime.fromisoformat(ref).strftime('%Y%m%d-%H%M%S')
+    except ValueError:
+        raise SnapshotError(f"no snapshot {ref}")
+    earlier = [snapshot_id for snapshot_id in ids if snapshot_id[:15] <= moment]
+    if not earlier:
+        raise SnapshotError(f"no snapshot at or before {ref}")
+    return load_manifest(earlier[-1])
+
+
+def _current_files():
+    """The data files as they are now, in manifest form."""
+    files = {}
+    for path in SNAPSHOT_FILES:
+        if os.path.exists(path):
+            files[path], _ = _store_document(load_json(path), write=False)
+    return files
+
+
+def _record_ids(entry):
+    """(list key, record id) -> blob hash for one file entry."""
+    ids = {}
+    for key, records in entry['lists'].items():
+        for position, (record_id, digest) in enumerate(records):
+            ids.setdefault((key, record_id or f"#{position}"), digest)
+    return ids
+
+
+def diff(old_files, new_files):
+    """{file: {'added': [...], 'removed': [...], 'changed': [...]}} of record ids."""
+    result = {}
+    for path in sorted(old_files.keys() & new_files.keys()):
+        old, new = old_files[path], new_files[path]
+        if old == new:
+            continue
+        old_ids, new_ids = _record_ids(old), _record_ids(new)
+        result[path] = {
+            'added': sorted(f"{key}/{rid}" for key, rid in new_ids.keys() - old_ids.keys()),
+            'removed': sorted(f"{key}/{rid}" for key, rid in old_ids.keys() - new_ids.keys()),
+            'changed': sorted(f"{key}/{rid}" for key, rid in old_ids.keys() & new_ids.keys()
+                              if old_ids[key, rid] != new_ids[key, rid]),
+            'other': old['rest'] != new['rest'],
+        }
+    return result
+
+
+def find_work(files, work_id):
+    """The work with work_id in a manifest's works.json, or None."""
+    entry = files.get('works.json')
+    if entry is None:
+        return None
+    digest = _record_ids(entry).get(('works', work_id))
+    return _read_blob(digest) if digest else None
+
+
+def field_changes(old, new):
+    """[(field, old value, new value)] for the top-level fields that differ."""
+    old, new = old or {}, new or {}
+    return [(key, old.get(key), new.get(key)) for key in list(old) + [k for k in new if k not in old]
+            if old.get(key) != new.get(key)]
+
+
+def restore(ref, work_ids=(), store=None):
+    """Restore a snapshot; with work_ids only those works are put back. Returns the restored ids or files."""
+    from store import WorksStore
+    manifest = resolve(ref)
+    take(f"before restore of {manifest['id']}")
+    store = store or WorksStore()
+
+    if not work_ids:
+        for path, entry in manifest['files'].items():
+            doc = _load_document(entry)
+            if not store.replace_document(path, doc):
+                write_json_atomic(path, doc)
+        store.save()
+        return list(manifest['files'])
+
+    restored = []
+    for work_id in work_ids:
+        work = find_work(manifest['files'], work_id)
+        if work is None:
+            raise SnapshotError(f"snapshot {manifest['id']} has no work {work_id}")
+        if work_id in store:
+            store.replace_work(work_id, work)
+        else:
+            store.add_work(work)
+        restored.append(work_id)
+    store.save()
+    return restored
+
+
+def prune(keep=None, quiet=False):
+    """Keep the newest `keep` snapshots and delete blobs no remaining snapshot uses."""
+    keep = setting('snapshotKeep') if keep is None else keep
+    snapshots = list_snapshots()
+    dropped = snapshots[:-keep] if keep else snapshots
+    for manifest in dropped:
+        os.unlink(os.path.join(_manifest_dir(), manifest['id'] + MANIFEST_SUFFIX))
+
+    live = set()
+    for manifest in snapshots[len(dropped):]:
+        for entry in manifest['files'].values():
+            live.add(entry['rest'])
+            for records in entry['lists'].values():
+                live.update(digest for _, digest in records)
+    removed = freed = 0
+    objects = os.path.join(_root(), 'objects')
+    if os.path.isdir(objects):
+        for prefix in os.listdir(objects):
+            for name in os.listdir(os.path.join(objects, prefix)):
+                if prefix + name not in live:
+                    path = os.path.join(objects, prefix, name)
+                    freed += os.path.getsize(path)
+                    os.unlink(path)
+                    removed += 1
+    if not quiet:
+        print(f"Dropped {len(dropped)} snapshots and {removed} unused records ({freed / 1024:.1f} KB)")
+
+
+def import_backups(paths):
+    """Store full-file backups (works.json.backup, backups/works.json.old, ...) as snapshots."""
+    for path in sorted(paths, key=os.path.getmtime):
+        name = os.path.basename(path)
+        target = next((f for f in SNAPSHOT_FILES if name.startswith(f)), None)
+        if target is None:
+            print(f"  Skipping {path}: not a copy of {' or '.join(SNAPSHOT_FILES)}")
+            continue
+        with open(path, 'r', encoding='utf-8') as f:
+            entry, written = _store_document(json.load(f))
+        manifest = _save_manifest({target: entry}, f"imported {path}", os.path.getmtime(path), written)
+        print(f"  {path} -> {manifest['id']} ({written / 1024:.1f} KB of new records)")
+
+
+def _short(value, limit=70):
+    text = json.dumps(value, ensure_ascii=False)
+    return text if len(text) <= limit else text[:limit - 3] + '...'
+
+
+def print_list():
+    snapshots = list_snapshots()
+    if not snapshots:
+        print('No snapshots yet')
+        return
+    for manifest in snapshots:
+        counts = ', '.join(f"{len(records)} {key}" for entry in manifest['files'].values()
+                           for key, records in entry['lists'].items())
+        print(f"{manifest['id']}  {manifest['time']}  {manifest['label']}  "
+              f"[{counts}; {manifest.get('written', 0) / 1024:.1f} KB new]")
+
+
+def print_diff(old_ref, new_ref=None, work_id=None):
+    old = resolve(old_ref)
+    new_files = resolve(new_ref)['files'] if new_ref else _current_files()
+    target = new_ref or 'now'
+    if work_id:
+        changes = field_changes(find_work(old['files'], work_id), find_work(new_files, work_id))
+        print(f"{work_id}: {len(changes)} fields differ between {old['id']} and {target}")
+        for field, before, after in changes:
+            print(f"  {field}:\n    - {_short(before)}\n    + {_short(after)}")
+        return
+    result = diff(old['files'], new_files)
+    if not result:
+        print(f"No changes between {old['id']} and {target}")
+    for path, changes in result.items():
+        print(f"{path}:")
+        for kind in ('added', 'removed', 'changed'):
+            for record in changes[kind]:
+                print(f"  {kind:8} {record}")
+        if changes['other']:
+            print('  changed  (fields outside the record lists)')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Record-level snapshots of works.json and exhibitions.json")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('list', help='List snapshots')
+    take_parser = subparsers.add_parser('take', help='Snapshot the current files')
+    take_parser.add_argument('label', nargs='?', default='manual')
+    diff_parser = subparsers.add_parser('diff', help='Show what changed since a snapshot')
+    diff_parser.add_argument('ref')
+    diff_parser.add_argument('ref2', nargs='?', help='Compare with this snapshot instead of the current files')
+    diff_parser.add_argument('--work', help='Show the field changes of one work')
+    restore_parser = subparsers.add_parser('restore', help='Restore a snapshot or some works from it')
+    restore_parser.add_argument('ref')
+    restore_parser.add_argument('work_ids', nargs='*')
+    prune_parser = subparsers.add_parser('prune', help='Drop old snapshots')
+    prune_parser.add_argument('--keep', type=int, help='Snapshots to keep (default: snapshotKeep setting)')
+    import_parser = subparsers.add_parser('import-backups', help='Store old full-file backups as snapshots')
+    import_parser.add_argument('paths', nargs='+')
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == 'list':
+            print_list()
+        elif args.command == 'take':
+            take(args.label)
+        elif args.command == 'diff':
+            print_diff(args.ref, args.ref2, args.work)
+        elif args.command == 'restore':
+            restored = restore(args.ref, args.work_ids)
+            print(f"Restored {', '.join(restored)}")
+        elif args.command == 'prune':
+            prune(args.keep)
+        elif args.command == 'import-backups':
+            import_backups(args.paths)
+    except SnapshotError as e:
+        print(f"ERROR: {e}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
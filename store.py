@@ -0,0 +1,189 @@
+"""
+Shared, lazily loaded access to works.json and exhibitions.json.
+
+A WorksStore parses each file at most once per process (through the binary
+cache in data_cache), keeps an id index of the works and writes changes back
+atomically, appending what changed to the journal (journal.py). The mp
+command line hands one store to every step of an invocation, so
+`mp validate + report + index` reads works.json once.
+"""
+
+import json
+import os
+
+from data_cache import load_json
+
+
+def write_json_atomic(path, data, compact=False):
+    """Write data in the site's JSON format (or compact, for generated indexes) via a temp file and rename."""
+    import tempfile  # imported when writing, so read-only commands start faster
+    directory = os.path.dirname(path) or '.'
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-', suffix='.json')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            if compact:
+                json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+            else:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def record_version(record):
+    """Short content hash of one record; changes whenever any field does."""
+    import hashlib
+    canonical = json.dumps(record, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha1(canonical.encode('utf-8')).hexdigest()[:16]
+
+
+def _file_stamp(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+class WorksStore:
+    """works.json and exhibitions.json, loaded on first use."""
+
+    def __init__(self, works_path='works.json', exhibitions_path='exhibitions.json'):
+        self.works_path = works_path
+        self.exhibitions_path = exhibitions_path
+        self._data = None
+        self._exhibitions = None
+        self._index = None
+        self._records = None
+        self.dirty = False
+        self.exhibitions_dirty = False
+        self._stamps = {}
+
+    @property
+    def data(self):
+        """The whole works.json document (dicts, as stored)."""
+        if self._data is None:
+            self._stamps[self.works_path] = _file_stamp(self.works_path)
+            self._data = load_json(self.works_path)
+        return self._data
+
+    @property
+    def works(self):
+        return [w for w in self.data.get('works', []) if isinstance(w, dict)]
+
+    @property
+    def exhibitions_data(self):
+        """The exhibitions.json document; empty if the file is missing."""
+        if self._exhibitions is None:
+            self._stamps[self.exhibitions_path] = _file_stamp(self.exhibitions_path)
+            try:
+                self._exhibitions = load_json(self.exhibitions_path)
+            except FileNotFoundError:
+                self._exhibitions = {}
+        return self._exhibitions
+
+    def index(self):
+        """Map work id -> work dict (first one wins on duplicate ids)."""
+        if self._index is None:
+            self._index = {}
+            for work in self.works:
+                self._index.setdefault(work.get('id'), work)
+        return self._index
+
+    def get(self, work_id):
+        return self.index().get(work_id)
+
+    def __contains__(self, work_id):
+        return work_id in self.index()
+
+    def __len__(self):
+        return len(self.works)
+
+    def add_work(self, work):
+        self.data.setdefault('works', []).append(work)
+        self.changed()
+
+    def replace_work(self, work_id, work):
+        """Put work in place of the record with work_id, keeping its position in the file."""
+        works = self.data.get('works', [])
+        current = self.get(work_id)
+        works[next(i for i, w in enumerate(works) if w is current)] = work
+        self.changed()
+
+    def replace_document(self, path, doc):
+        """Put doc in place of works.json or exhibitions.json (written by save()); False for any other path."""
+        path = os.path.normpath(path)
+        if path == os.path.normpath(self.works_path):
+            self.data.clear()
+            self.data.update(doc)
+            self.changed()
+        elif path == os.path.normpath(self.exhibitions_path):
+            self.exhibitions_data.clear()
+            self.exhibitions_data.update(doc)
+            self.changed(works=False, exhibitions=True)
+        else:
+            return False
+        return True
+
+    def exhibition_index(self):
+        """Map exhibition id -> (list name, exhibition dict) over the solo and group lists."""
+        index = {}
+        for kind, items in self.exhibitions_data.items():
+            if kind == 'ui' or not isinstance(items, list):
+                continue
+            for exhibition in items:
+                if isinstance(exhibition, dict):
+                    index.setdefault(exhibition.get('id'), (kind, exhibition))
+        return index
+
+    def is_stale(self):
+        """True if a loaded file was changed on disk by something other than this store."""
+        return any(_file_stamp(path) != stamp for path, stamp in self._stamps.items())
+
+    def records(self):
+        """Works as models.Work records; reuses the model cache while nothing has changed."""
+        if self._records is None:
+            from models import load_works, normalise_works
+            self._records = normalise_works(self.data) if self.dirty else load_works(self.works_path)
+        return self._records
+
+    def exhibition_records(self):
+        from models import load_exhibitions, normalise_exhibitions
+        if self.exhibitions_dirty:
+            return normalise_exhibitions(self._exhibitions)
+        return load_exhibitions(self.exhibitions_path)
+
+    def changed(self, works=True, exhibitions=False):
+        """Mark in-memory documents as modified and drop derived views."""
+        if works:
+            self.dirty = True
+            self._index = None
+            self._records = None
+        if exhibitions:
+            self.exhibitions_dirty = True
+
+    def save(self):
+        """Write modified documents back to disk, journalling what changed; returns True if anything was written."""
+        if not (self.dirty or self.exhibitions_dirty):
+            return False
+        from journal import record
+        written = False
+        if self.dirty:
+            record(self.works_path, self._data)
+            write_json_atomic(self.works_path, self._data)
+            self._stamps[self.works_path] = _file_stamp(self.works_path)
+            self.dirty = False
+            written = True
+        if self.exhibitions_dirty:
+            record(self.exhibitions_path, self._exhibitions)
+            write_json_atomic(self.exhibitions_path, self._exhibitions)
+            self._stamps[self.exhibitions_path] = _file_stamp(self.exhibitions_path)
+            self.exhibitions_dirty = False
+            written = True
+        return written
+
+    def reload(self):
+        """Forget everything loaded, e.g. after a script rewrote the files directly."""
+        self.__init__(self.works_path, self.exhibitions_path)
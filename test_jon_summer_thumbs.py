@@ -6,6 +6,8 @@ Test script to verify Jon Summer thumbnail paths and file existence.
 import os
 import json
 
+from site_index import get_thumb_path
+
 def test_jon_summer_thumbs():
     """Test Jon Summer thumbnail generation and file existence."""
 
@@ -32,25 +34,9 @@ def test_jon_summer_thumbs():
         medium_url = image['url']
         print(f"\nImage {i+1}: {medium_url}")
 
-        # Simulate the JavaScript getThumbPath logic
+        # Same derivation the front end uses (works.js getThumbPath)
         if '/medium/' in medium_url:
-            parts = medium_url.split('/')
-            filename = parts[-1]
-
-            # Extract base name (remove -medium suffix)
-            if '-medium.' in filename:
-                file_base = filename.replace('-medium.', '.').split('.')[0]
-            else:
-                file_base = filename.split('.')[0]
-
-            # Create thumbnail path
-            path_parts = parts[:-1]  # Remove filename
-            for j, part in enumerate(path_parts):
-                if part == 'medium':
-                    path_parts[j] = 'thumbs'
-                    break
-
-            thumb_path = '/'.join(path_parts) + '/' + file_base + '-thumb.jpg'
+            thumb_path = get_thumb_path(medium_url)
             print(f"Expected thumbnail: {thumb_path}")
 
             # Check if thumbnail file exists
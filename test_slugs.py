@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+"""
+Tests for the ids the ingest scripts derive from source folder names.
+"""
+
+import json
+
+from slugs import clean_work_id, ingest_work_id, legacy_work_ids
+
+
+def test_legacy_ids():
+    assert legacy_work_ids('Rúmbjarni Suðurgata 7 1976') == ['rumbjarni-sudurgata-7-1976-1976']
+    assert legacy_work_ids('Pendúll student performance 1.2.1999') == ['pendull-student-performance-121999']
+    assert legacy_work_ids('Verk 1975-1976') == ['verk-19751976-1975', 'verk-19751976']
+
+
+def test_ingest_reuses_existing_ids(tmp_path):
+    works = tmp_path / 'works.json'
+    works.write_text(json.dumps({'works': [{'id': 'rumbjarni-sudurgata-7-1976-1976'}]}), encoding='utf-8')
+    images = tmp_path / 'images'
+    (images / 'pendull-student-performance-121999').mkdir(parents=True)
+
+    assert ingest_work_id('Rúmbjarni Suðurgata 7 1976', works, images) is None
+    assert ingest_work_id('Pendúll student performance 1.2.1999', works, images) == 'pendull-student-performance-121999'
+    assert ingest_work_id('Kúlan 1962', works, images) == clean_work_id('Kúlan 1962') == 'kulan-1962'
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Tests for the year parsing shared by the build, the search index and models.
+"""
+
+from years import YearRange, parse_year
+
+
+def test_ranges():
+    assert parse_year('1969-71') == YearRange(1969, 1971, '1969–71')
+    assert parse_year('1973–76') == YearRange(1973, 1976, '1973–76')
+    assert parse_year('1998-05') == YearRange(1998, 2005, '1998–05')
+    assert parse_year('1975/1976') == YearRange(1975, 1976, '1975/1976')
+
+
+def test_dates_are_not_ranges():
+    assert parse_year('1995-12-03') == YearRange(1995, 1995, '1995-12-03')
+    assert parse_year('opened 2004-05-21') == YearRange(2004, 2004, 'opened 2004-05-21')
+
+
+def test_decades():
+    assert parse_year('1990s') == YearRange(1990, 1999, '1990s')
+    assert parse_year('early 2000s') == YearRange(2000, 2009, 'early 2000s')
+    assert parse_year('1990s').decade == 1990
+
+
+def test_integers_are_bounded():
+    assert parse_year(1969) == YearRange(1969, 1969, '1969')
+    assert parse_year(150) == YearRange(display='150')
+    assert parse_year(12345) == YearRange(display='12345')
+    assert not parse_year(True)
+
+
+def test_no_year():
+    assert parse_year('Unknown') == YearRange(display='Unknown')
+    assert parse_year(None) == YearRange()
+    assert parse_year('ca 1957') == YearRange(1957, 1957, 'ca 1957')
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Per-page UI string bundles for i18n.js.
+
+translations/en.json and is.json still carry the pre-migration `works` map
+(the texts now live in works.json), so loading them costs every page over
+100 KB for a few dozen UI strings. This scans each page that loads i18n.js -
+the HTML, the local scripts it includes and the HTML partials those scripts
+fetch (nav.html, footer.html) - for the keys it uses:
+
+  data-i18n="key", data-i18n-placeholder="key", i18n.t('key')
+
+and writes translations/pages/<page>-<lang>.json holding just those strings.
+A bundle also says whether the page renders exhibitions (i18n.getExhibitions
+or i18n.te), and only those pages fetch exhibitions.json. Keys built at run
+time (i18n.t(variable)) are not found; use a data-i18n attribute for them.
+
+Usage:
+  python ui_strings.py              - Write the bundles and report their sizes
+"""
+
+import glob
+import json
+import os
+import re
+import sys
+
+from store import write_json_atomic
+
+LANGUAGES = ('en', 'is')
+BUNDLE_DIR = os.path.join('translations', 'pages')
+
+SCRIPT_SRC = re.compile(r'<script[^>]*\ssrc=["\']([^"\':?]+\.js)(?:\?[^"\']*)?["\']', re.IGNORECASE)
+FETCHED_HTML = re.compile(r'fetch\(\s*["\']([\w./-]+\.html)["\']')
+KEY_PATTERNS = (
+    re.compile(r'data-i18n(?:-placeholder)?=\\?["\']([^"\'\\]+)\\?["\']'),
+    re.compile(r'i18n\.t\(\s*(["\'`])([^"\'`$]+)\1\s*\)'),
+)
+EXHIBITIONS_USE = re.compile(r'i18n\.(?:getExhibitions|te)\(')
+
+
+def _read(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read()
+    except FileNotFoundError:
+        return ''
+
+
+def _keys(text):
+    keys = set()
+    for pattern in KEY_PATTERNS:
+        for match in pattern.finditer(text):
+            keys.add(match.group(match.lastindex))
+    return keys
+
+
+def page_sources(page):
+    """The page plus its local scripts and the partials they fetch."""
+    html = _read(page)
+    scripts = SCRIPT_SRC.findall(html)
+    sources = [page] + [s for s in scripts if os.path.exists(s)]
+    for script in scripts:
+        for partial in FETCHED_HTML.findall(_read(script)):
+            if partial not in sources and os.path.exists(partial):
+                sources.append(partial)
+    return sources
+
+
+def scan_page(page):
+    """(sorted UI keys, uses exhibitions) for one page."""
+    keys, exhibitions = set(), False
+    for path in page_sources(page):
+        text = _read(path)
+        keys |= _keys(text)
+        exhibitions = exhibitions or bool(EXHIBITIONS_USE.search(text))
+    return sorted(keys), exhibitions
+
+
+def i18n_pages():
+    return sorted(page for page in glob.glob('*.html') if 'i18n.js' in SCRIPT_SRC.findall(_read(page)))
+
+
+def build_bundles(verbose=True):
+    """Write the bundle of every page using i18n.js; returns {bundle path: size in bytes}."""
+    ui = {}
+    for lang in LANGUAGES:
+        with open(os.path.join('translations', f'{lang}.json'), 'r', encoding='utf-8') as f:
+            ui[lang] = json.load(f).get('ui', {})
+    os.makedirs(BUNDLE_DIR, exist_ok=True)
+
+    sizes = {}
+    expected = set()
+    for page in i18n_pages():
+        keys, exhibitions = scan_page(page)
+        name = os.path.splitext(page)[0]
+        missing = [key for key in keys if key not in ui['en']]
+        if missing and verbose:
+            print(f"  {page}: no English string for {', '.join(missing)}")
+        for lang in LANGUAGES:
+            bundle = {'ui': {key: ui[lang][key] for key in keys if key in ui[lang]},
+                      'exhibitions': exhibitions}
+            path = os.path.join(BUNDLE_DIR, f'{name}-{lang}.json')
+            expected.add(path)
+            text = json.dumps(bundle, indent=2, ensure_ascii=False)
+            if _read(path) != text:
+                write_json_atomic(path, bundle)
+            sizes[path] = len(text.encode('utf-8'))
+
+    for stale in set(glob.glob(os.path.join(BUNDLE_DIR, '*.json'))) - expected:
+        os.remove(stale)  # the page was removed or no longer loads i18n.js
+    return sizes
+
+
+def main():
+    sizes = build_bundles()
+    full = {lang: os.path.getsize(os.path.join('translations', f'{lang}.json')) for lang in LANGUAGES}
+    for path, size in sorted(sizes.items()):
+        lang = path.rsplit('-', 1)[1][:-len('.json')]
+        print(f"  {path:45} {size:7,} bytes (full file: {full[lang]:,})")
+    print(f"Wrote {len(sizes)} bundles to {BUNDLE_DIR}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,13 +1,14 @@
 #!/usr/bin/env python3
 
-import json
 import os
 import re
 
+from store import WorksStore
+
 def main():
     # Load the works.json file
-    with open('works.json', 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    store = WorksStore()
+    data = store.data
 
     # Get list of works with medium folders
     medium_works = []
@@ -66,15 +67,15 @@ def main():
     print(f"Works updated: {len(works_updated)}")
 
     if updates_made > 0:
-        # Create backup
-        os.rename('works.json', 'works.json.backup-final')
+        # Snapshot (undo with: python snapshots.py restore latest)
+        from snapshots import take
+        take('before update_json_final')
 
-        # Save the updated JSON
-        with open('works.json', 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        # Save the updated JSON through the store (atomic, and journalled per work)
+        store.changed()
+        store.save()
 
         print("Updated works.json saved successfully")
-        print("Backup created as works.json.backup-final")
     else:
         print("No updates needed")
 
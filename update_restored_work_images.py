@@ -3,16 +3,17 @@
 Update JSON references for the restored works with their actual image files.
 """
 
-import json
 import os
 import glob
 
+from store import WorksStore
+
 def update_restored_work_images():
     """Update JSON with actual image references for restored works."""
 
     # Read current works.json
-    with open('works.json', 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    store = WorksStore()
+    data = store.data
 
     # Define the restored work IDs and their image folders
     restored_works = {
@@ -67,9 +68,9 @@ def update_restored_work_images():
             else:
                 print(f"Warning: Medium folder not found for {work['title']}: {medium_path}")
 
-    # Write updated JSON
-    with open('works.json', 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    # Write updated JSON through the store (atomic, and journalled per work)
+    store.changed()
+    store.save()
 
     print(f"\nOK: Updated {updates_made} restored works with image references")
     print("JSON file has been updated with actual image paths.")
@@ -3,7 +3,7 @@
 Update Walking on Water entry in works.json
 """
 
-import json
+from store import WorksStore
 
 # The updated work data
 updated_work = {
@@ -155,8 +155,8 @@ updated_work = {
 }
 
 # Load works.json
-with open('works.json', 'r', encoding='utf-8') as f:
-    data = json.load(f)
+store = WorksStore()
+data = store.data
 
 # Find and replace Walking on Water
 for i, work in enumerate(data['works']):
@@ -165,8 +165,8 @@ for i, work in enumerate(data['works']):
         print(f'Updated Walking on Water at index {i}')
         break
 
-# Save back to works.json
-with open('works.json', 'w', encoding='utf-8') as f:
-    json.dump(data, f, indent=2, ensure_ascii=False)
+# Save back to works.json through the store (atomic, and journalled per work)
+store.changed()
+store.save()
 
 print('Works.json updated successfully!')
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Validate every asset and id reference on the site against one filesystem index.
+
+Unlike fix_broken_references.py this never modifies data: it reports problems
+and exits non-zero when any errors are found, so it can run after each ingest.
+
+Usage:
+  python validate_references.py            - Human readable report
+  python validate_references.py --json     - Structured JSON report on stdout
+  python validate_references.py --strict   - Treat warnings as errors
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+from data_cache import load_json
+from site_index import (
+    HTML_ASSET_PATTERN,
+    get_thumb_path,
+    is_local_asset,
+    iter_json_strings,
+    json_source_files,
+    normalize_path,
+    scan_images,
+)
+
+# Image fields checked on every work image; derived thumbs are only warnings
+# because the front end falls back to the medium image when they are missing.
+IMAGE_FIELDS = ('url', 'thumbnail', 'thumb')
+EXTERNAL_PREFIXES = ('http://', 'https://', '//', 'mailto:', 'tel:', 'data:', 'javascript:', '#')
+
+
+class Report:
+    """Collects errors and warnings grouped by check."""
+
+    def __init__(self):
+        self.errors = {}
+        self.warnings = {}
+        self.checked = 0
+
+    def error(self, check, source, reference):
+        self.errors.setdefault(check, []).append({'source': source, 'reference': reference})
+
+    def warning(self, check, source, reference):
+        self.warnings.setdefault(check, []).append({'source': source, 'reference': reference})
+
+    def error_count(self):
+        return sum(len(items) for items in self.errors.values())
+
+    def warning_count(self):
+        return sum(len(items) for items in self.warnings.values())
+
+    def to_dict(self):
+        return {
+            'checked': self.checked,
+            'errorCount': self.error_count(),
+            'warningCount': self.warning_count(),
+            'errors': self.errors,
+            'warnings': self.warnings,
+        }
+
+
+def check_works(works_data, exhibitions_data, files, report):
+    """Check image files, derived thumbs, exhibition ids and work-to-work links."""
+    exhibition_ids = {}
+    for kind in ('solo', 'group'):
+        for exhibition in exhibitions_data.get(kind, []):
+            ex_id = exhibition.get('id')
+            if ex_id in exhibition_ids:
+                report.warning('duplicate-exhibition-id', f"exhibitions.json#/{kind}", ex_id)
+            exhibition_ids[ex_id] = kind
+
+    works = [w for w in works_data.get('works', []) if isinstance(w, dict)]
+    work_ids = set()
+    for work in works:
+        if work.get('id') in work_ids:
+            report.error('duplicate-work-id', 'works.json', work.get('id'))
+        work_ids.add(work.get('id'))
+
+    for work in works:
+        work_id = work.get('id', '?')
+        source = f"works.json#{work_id}"
+
+        for image in work.get('images', []):
+            for field in IMAGE_FIELDS:
+                value = image.get(field)
+                if not value:
+                    continue
+                report.checked += 1
+                if normalize_path(value) not in files:
+                    report.error(f"missing-image-{field}", source, value)
+
+            url = image.get('url')
+            if url and not image.get('thumbnail') and not image.get('thumb'):
+                thumb = get_thumb_path(url)
+                if thumb != url:
+                    report.checked += 1
+                    if normalize_path(thumb) not in files:
+                        report.warning('missing-derived-thumb', source, thumb)
+
+        for exhibition in work.get('exhibitions', []):
+            if isinstance(exhibition, str):
+                report.checked += 1
+                if exhibition not in exhibition_ids:
+                    report.error('unknown-exhibition-id', source, exhibition)
+
+        for related in work.get('relatedWorks', []) + ([work['parentWork']] if work.get('parentWork') else []):
+            related_id = related.get('id') if isinstance(related, dict) else related
+            report.checked += 1
+            if related_id not in work_ids:
+                report.error('unknown-work-id', source, related_id)
+
+
+def check_json_assets(files, report, skip=('works.json',)):
+    """Check images/ paths anywhere in the other JSON sources (translations, exhibitions, index)."""
+    for json_file in json_source_files():
+        name = json_file.as_posix()
+        if name in skip:
+            continue
+        for where, value in iter_json_strings(load_json(json_file), accept=is_local_asset):
+            report.checked += 1
+            if normalize_path(value) not in files:
+                report.error('missing-translation-asset' if name.startswith('translations/') else 'missing-asset',
+                             f"{name}#{where}", value)
+
+
+def check_works_json_assets(works_data, files, report):
+    """Check images/ paths in works.json outside the image list (audio, videos, documents)."""
+    for work in works_data.get('works', []):
+        if not isinstance(work, dict):
+            continue
+        for where, value in iter_json_strings({k: v for k, v in work.items() if k != 'images'},
+                                              accept=is_local_asset):
+            report.checked += 1
+            if normalize_path(value) not in files:
+                report.error('missing-media', f"works.json#{work.get('id')}{where}", value)
+
+
+def check_html(report, files):
+    """Check src/href/poster attributes in the HTML pages point at existing local files."""
+    for html_file in sorted(Path('.').glob('*.html')):
+        text = html_file.read_text(encoding='utf-8')
+        for match in HTML_ASSET_PATTERN.finditer(text):
+            value = match.group(1)
+            if value.startswith(EXTERNAL_PREFIXES) or '${' in value:
+                continue
+            path = re.split(r'[?#]', value, maxsplit=1)[0]
+            if not path:
+                continue
+            report.checked += 1
+            if is_local_asset(path):
+                if normalize_path(path) not in files:
+                    report.error('missing-html-asset', html_file.name, value)
+            elif not Path(path).exists():
+                report.error('missing-html-link', html_file.name, value)
+
+
+def validate(works_data=None, exhibitions_data=None):
+    """Run all checks and return a Report; pass already loaded documents to skip reading them."""
+    report = Report()
+    files = scan_images(sizes=False)
+
+    if works_data is None:
+        works_data = load_json('works.json')
+    if exhibitions_data is None:
+        exhibitions_data = load_json('exhibitions.json') if Path('exhibitions.json').exists() else {}
+
+    check_works(works_data, exhibitions_data, files, report)
+    check_works_json_assets(works_data, files, report)
+    check_json_assets(files, report)
+    check_html(report, files)
+    return report
+
+
+def print_report(report, elapsed):
+    for title, groups in (('ERRORS', report.errors), ('WARNINGS', report.warnings)):
+        if not groups:
+            continue
+        print(f"\n{title}")
+        for check, items in sorted(groups.items()):
+            print(f"  {check} ({len(items)})")
+            for item in items:
+                print(f"    {item['source']}: {item['reference']}")
+
+    print(f"\nSummary:")
+    print(f"References checked: {report.checked}")
+    print(f"Errors: {report.error_count()}")
+    print(f"Warnings: {report.warning_count()}")
+    print(f"Time: {elapsed * 1000:.0f} ms")
+
+
+def exit_code(report, strict=False):
+    if report.error_count() or (strict and report.warning_count()):
+        return 1
+    return 0
+
+
+def validate_after_ingest(works_data=None, exhibitions_data=None):
+    """Short validation summary for the end of ingest scripts; returns an exit code."""
+    report = validate(works_data, exhibitions_data)
+    print(f"\n=== REFERENCE VALIDATION ===")
+    print(f"Checked {report.checked} references: {report.error_count()} errors, {report.warning_count()} warnings")
+    for check, items in sorted(report.errors.items()):
+        print(f"  {check}: {len(items)}")
+    if report.error_count():
+        print("Run validate_references.py for details.")
+    return exit_code(report)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate site references without modifying data")
+    parser.add_argument('--json', action='store_true', help='Print a structured JSON report')
+    parser.add_argument('--strict', action='store_true', help='Exit non-zero on warnings too')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    report = validate()
+    elapsed = time.perf_counter() - start
+
+    if args.json:
+        json.dump(report.to_dict(), sys.stdout, indent=2, ensure_ascii=False)
+        print()
+    else:
+        print_report(report, elapsed)
+
+    return exit_code(report, args.strict)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Watch images/, works.json, exhibitions.json, translations/, articles/, the HTML pages and
+their scripts and rebuild incrementally whenever they change.
+
+Changes are debounced (an editor saving several files, a folder of images
+being copied) and then handed to the build graph in build.py, which derives
+only the new or changed images, reindexes only the affected works and
+revalidates references. Uses watchdog (inotify/FSEvents) when it is installed
+and falls back to polling file stamps otherwise.
+
+Usage:
+  python watch.py                  - Watch and rebuild
+  python watch.py --poll           - Force the polling watcher
+  python watch.py --debounce 0.5   - Quiet period before a rebuild, in seconds
+"""
+
+import argparse
+import os
+import queue
+import sys
+import time
+
+WATCHED_FILES = ('works.json', 'exhibitions.json')
+WATCHED_DIRS = ('images', 'translations', 'articles')
+WATCHED_EXTENSIONS = ('.html', '.js')
+GENERATED_DIRS = ('translations/pages/', 'articles/pages/')  # written by the build itself
+
+
+def is_relevant(path):
+    """Skip caches, temp files and the build's own bookkeeping."""
+    path = os.path.relpath(path).replace(os.sep, '/')
+    name = path.rsplit('/', 1)[-1]
+    if name.startswith('.') or name.endswith(('.tmp', '~', '.swp')) or '__pycache__' in path:
+        return False
+    if path.startswith(GENERATED_DIRS):
+        return False
+    if path in WATCHED_FILES or path.endswith(WATCHED_EXTENSIONS) and '/' not in path:
+        return True
+    return path.split('/', 1)[0] in WATCHED_DIRS
+
+
+def snapshot():
+    """{path: (size, mtime_ns)} for everything watched."""
+    stamps = {}
+
+    def add(entry):
+        stat = entry.stat()
+        stamps[entry.path] = (stat.st_size, stat.st_mtime_ns)
+
+    def walk(directory):
+        with os.scandir(directory) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    walk(entry.path)
+                elif entry.is_file() and is_relevant(entry.path):
+                    add(entry)
+
+    with os.scandir('.') as it:
+        for entry in it:
+            if entry.is_file() and is_relevant(entry.path):
+                add(entry)
+    for directory in WATCHED_DIRS:
+        if os.path.isdir(directory):
+            walk(os.path.join('.', directory))
+    return stamps
+
+
+class PollingWatcher:
+    """Compares file stamps every interval seconds."""
+
+    def __init__(self, interval=0.5):
+        self.interval = interval
+        self.events = queue.Queue()
+        self.previous = snapshot()
+
+    def start(self):
+        import threading
+        threading.Thread(target=self._poll, daemon=True).start()
+
+    def _poll(self):
+        while True:
+            time.sleep(self.interval)
+            current = snapshot()
+            for path in current.keys() | self.previous.keys():
+                if current.get(path) != self.previous.get(path):
+                    self.events.put(path)
+            self.previous = current
+
+    def stop(self):
+        pass
+
+
+class WatchdogWatcher:
+    """Receives change notifications from the OS through watchdog."""
+
+    def __init__(self):
+        from watchdog.events import FileSystemEventHandler
+        from watchdog.observers import Observer
+
+        self.events = queue.Queue()
+        events = self.events
+
+        class Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                if event.is_directory:
+                    return
+                for path in (event.src_path, getattr(event, 'dest_path', None)):
+                    if path and is_relevant(path):
+                        events.put(path)
+
+        self.observer = Observer()
+        self.observer.schedule(Handler(), '.', recursive=False)
+        for directory in WATCHED_DIRS:
+            if os.path.isdir(directory):
+                self.observer.schedule(Handler(), directory, recursive=True)
+
+    def start(self):
+        self.observer.start()
+
+    def stop(self):
+        self.observer.stop()
+        self.observer.join()
+
+
+def make_watcher(poll=False, interval=0.5):
+    if not poll:
+        try:
+            return WatchdogWatcher()
+        except ImportError:
+            print("watchdog is not installed; polling for changes instead (pip install watchdog)")
+    return PollingWatcher(interval)
+
+
+def next_batch(events, debounce):
+    """Block for the first change, then collect until nothing new arrives for `debounce` seconds."""
+    paths = {events.get()}
+    while True:
+        try:
+            paths.add(events.get(timeout=debounce))
+        except queue.Empty:
+            return paths
+
+
+def record_writers(build):
+    """The out-of-date stages that will write works.json or exhibitions.json."""
+    from build import select
+    return [s.name for s in select(None)
+            if {'works', 'exhibitions'} & set(s.outputs) and build.changes(s)[0]]
+
+
+def rebuild(jobs=None, paths=()):
+    """Run the out-of-date build stages with freshly loaded data; returns the stage statuses.
+
+    A rebuild that will run a fix-up stage writing works.json or exhibitions.json
+    snapshots both files first, as the mutating mp commands do.
+    """
+    from build import Build
+    from snapshots import take
+    start = time.perf_counter()
+    build = Build(workers=jobs)
+    writers = record_writers(build)
+    if writers:
+        take(f"before watch rebuild ({', '.join(writers)})", quiet=True)
+    status = build.run()
+    ran = [name for name, state in status.items() if state in ('ran', 'failed')]
+    if ran:
+        shown = sorted(os.path.relpath(p) for p in paths)
+        trigger = f" after {len(shown)} changes ({', '.join(shown[:3])}{' ...' if len(shown) > 3 else ''})" if shown else ''
+        print(f"Rebuilt {', '.join(ran)} in {(time.perf_counter() - start) * 1000:.0f} ms{trigger}\n")
+    return status
+
+
+def watch(poll=False, interval=0.5, debounce=0.3, jobs=None):
+    watcher = make_watcher(poll, interval)
+    print("Bringing the build up to date...")
+    rebuild(jobs)
+    watcher.start()
+    print(f"Watching {', '.join(WATCHED_FILES + WATCHED_DIRS)} and *.html/*.js for changes (Ctrl+C to stop)")
+    try:
+        while True:
+            paths = next_batch(watcher.events, debounce)
+            # The build's own writes come back as events too; the rebuild they
+            # trigger finds every fingerprint current and does nothing.
+            rebuild(jobs, paths)
+    except KeyboardInterrupt:
+        print("\nStopped watching")
+    finally:
+        watcher.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rebuild derivatives, search index and validation on file changes")
+    parser.add_argument('--poll', action='store_true', help='Poll file stamps instead of using watchdog')
+    parser.add_argument('--interval', type=float, default=0.5, help='Polling interval in seconds (default: 0.5)')
+    parser.add_argument('--debounce', type=float, default=0.3, help='Quiet period before rebuilding (default: 0.3)')
+    parser.add_argument('-j', '--jobs', type=int, help='Maximum parallel workers')
+    args = parser.parse_args(argv)
+    watch(poll=args.poll, interval=args.interval, debounce=args.debounce, jobs=args.jobs)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
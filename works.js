@@ -30,6 +30,8 @@ class WorksManager {
       'video': 'vídeó', 'voice sculpture': 'raddskúlptúr', 'watercolor': 'vatnslitamynd'
     };
     this.exhibitionsData = null; // Will hold all exhibitions from exhibitions.json
+    this.facets = null; // Per-facet values, counts and work bitsets from facet-index.json
+    this.filterKeys = { category: 'categories', medium: 'mediums', tag: 'tags', decade: 'decades' };
 
     this.init();
   }
@@ -45,6 +47,7 @@ class WorksManager {
     await this.loadConfig();
     await this.loadExhibitions();
     await this.loadWorks();
+    await this.loadFacetIndex();
     this.setupEventListeners();
 
     // Set initial page title
@@ -133,6 +136,7 @@ class WorksManager {
     return {
       ...work,
       title: this.getLocalizedValue(work.title),
+      year: work.yearDisplay ?? work.year,
       description: this.getLocalizedValue(work.description),
       materials: typeof work.materials === 'object' && !Array.isArray(work.materials)
         ? this.getLocalizedValue(work.materials)
@@ -151,7 +155,7 @@ class WorksManager {
               title: this.getLocalizedValue(exhibition.title),
               venue: this.getLocalizedValue(exhibition.venue),
               location: exhibition.location,
-              year: exhibition.year
+              year: exhibition.yearDisplay || exhibition.year
             };
           }
           // If not found, return the ID as-is (legacy string exhibition)
@@ -249,6 +253,131 @@ class WorksManager {
     }
   }
 
+  // Facet bitsets are built with the site (facet_index.py); bit i stands for allWorks[i]
+  async loadFacetIndex() {
+    let index = null;
+    try {
+      const response = await fetch('facet-index.json');
+      if (!response.ok) {
+        throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+      }
+      index = await response.json();
+    } catch (error) {
+      console.warn('Facet index unavailable, building it from works:', error);
+    }
+    const current = index && index.format === 2 && index.fingerprint === this.facetFingerprint();
+    this.facets = this.prepareFacets(current ? index.facets : this.computeFacets());
+  }
+
+  // Getters of each facet's values for a work, in the order of FACETS in facet_index.py
+  facetValues() {
+    return {
+      category: w => Array.isArray(w.category) ? w.category : [],
+      medium: w => w.medium && Array.isArray(w.medium.en) ? w.medium.en : [],
+      tag: w => w.tags || [],
+      decade: w => {
+        const y = this.yearStart(w);
+        return y ? [Math.floor(y / 10) * 10] : [];
+      }
+    };
+  }
+
+  // FNV-1a over the UTF-8 JSON of each work's id and facet values, as fingerprint() in facet_index.py
+  facetFingerprint() {
+    const valuesOf = Object.values(this.facetValues());
+    const encoder = new TextEncoder();
+    let hash = 0x811c9dc5;
+    this.allWorks.forEach(work => {
+      encoder.encode(JSON.stringify([work.id, ...valuesOf.map(values => values(work))])).forEach(byte => {
+        hash = Math.imul(hash ^ byte, 0x01000193) >>> 0;
+      });
+    });
+    return hash.toString(16).padStart(8, '0');
+  }
+
+  // Same index as facet_index.py, for when facet-index.json is missing or stale
+  computeFacets() {
+    const valuesOf = this.facetValues();
+    const words = (this.allWorks.length + 31) >> 5;
+    const facets = {};
+    Object.entries(valuesOf).forEach(([name, values]) => {
+      const bits = new Map();
+      const counts = new Map();
+      this.allWorks.forEach((work, i) => {
+        new Set(values(work)).forEach(value => {
+          if (!bits.has(value)) {
+            bits.set(value, new Array(words).fill(0));
+            counts.set(value, 0);
+          }
+          bits.get(value)[i >> 5] |= 1 << (i & 31);
+          counts.set(value, counts.get(value) + 1);
+        });
+      });
+      const sorted = [...bits.keys()].sort();
+      facets[name] = { values: sorted, counts: sorted.map(v => counts.get(v)), bits: sorted.map(v => bits.get(v)) };
+    });
+    return facets;
+  }
+
+  prepareFacets(facets) {
+    const prepared = {};
+    Object.entries(facets).forEach(([name, facet]) => {
+      const bits = new Map();
+      const counts = new Map();
+      facet.values.forEach((value, i) => {
+        bits.set(value, Uint32Array.from(facet.bits[i]));
+        counts.set(value, facet.counts[i]);
+      });
+      prepared[name] = { values: facet.values, counts, bits };
+    });
+    return prepared;
+  }
+
+  countBits(bits) {
+    let count = 0;
+    for (let word of bits) {
+      word -= (word >>> 1) & 0x55555555;
+      word = (word & 0x33333333) + ((word >>> 2) & 0x33333333);
+      count += (((word + (word >>> 4)) & 0x0f0f0f0f) * 0x01010101) >>> 24;
+    }
+    return count;
+  }
+
+  // Works matching the current filters as a bitset (OR within a facet, AND across facets),
+  // leaving out the `except` facet; null when no filter applies
+  filterMask(except = null) {
+    let mask = null;
+    Object.entries(this.filterKeys).forEach(([name, key]) => {
+      const selected = this.currentFilters[key];
+      if (name === except || selected.length === 0) return;
+      const union = new Uint32Array((this.allWorks.length + 31) >> 5);
+      selected.forEach(value => {
+        const bits = this.facets[name].bits.get(value);
+        if (bits) bits.forEach((word, i) => { union[i] |= word; });
+      });
+      if (mask) mask.forEach((word, i) => { mask[i] = word & union[i]; });
+      else mask = union;
+    });
+    return mask;
+  }
+
+  // Each pill counts the works having its value that also match the selections in the other facets
+  updateFilterCounts() {
+    const masks = {};
+    document.querySelectorAll('#filter-panel .filter-pill').forEach(pill => {
+      const name = pill.dataset.filter;
+      const facet = this.facets[name];
+      const value = name === 'decade' ? parseInt(pill.dataset.value) : pill.dataset.value;
+      if (!(name in masks)) masks[name] = this.filterMask(name);
+      const bits = facet.bits.get(value);
+      const mask = masks[name];
+      const count = !bits ? 0 : mask ? this.countBits(bits.map((word, i) => word & mask[i])) : facet.counts.get(value);
+      const label = pill.querySelector('.filter-count');
+      if (label) label.textContent = count;
+      pill.classList.toggle('empty', count === 0);
+    });
+  }
+
   showErrorMessage(message) {
     const grid = document.getElementById('works-grid');
     if (grid) {
@@ -313,12 +442,12 @@ class WorksManager {
     });
   }
 
-  // Extract first valid year number from complex year strings
-  parseYearNumber(year) {
-    if (typeof year === 'number') return year;
-    if (!year) return null;
-    const str = String(year);
-    const match = str.match(/\d{4}/);
+  // First year of a work: yearStart is stored by the build (years.py); the year
+  // is only parsed here for a record the build has not processed yet
+  yearStart(work) {
+    if (work.yearStart !== undefined) return work.yearStart;
+    if (typeof work.year === 'number') return work.year >= 1900 && work.year <= 2099 ? work.year : null;
+    const match = String(work.year || '').match(/(?<!\d)(?:19|20)\d{2}(?!\d)/);
     return match ? parseInt(match[0]) : null;
   }
 
@@ -438,18 +567,14 @@ class WorksManager {
         <div class="filter-pills">
           ${this.categories.map(cat => `
             <button class="filter-pill${this.currentFilters.categories.includes(cat) ? ' active' : ''}"
-                    data-filter="category" data-value="${cat}">${catLabels[cat] || cat}</button>
+                    data-filter="category" data-value="${cat}">${catLabels[cat] || cat}<span class="filter-count"></span></button>
           `).join('')}
         </div>
       `;
     }
 
-    // Medium — collect from actual works data (medium.en arrays)
-    const allMediums = [...new Set(this.allWorks.flatMap(w => {
-      if (!w.medium) return [];
-      const m = w.medium.en || w.medium;
-      return Array.isArray(m) ? m : [];
-    }))].sort();
+    // Medium — values used by works (medium.en arrays), from the facet index
+    const allMediums = this.facets.medium.values;
     const medContainer = document.getElementById('filter-mediums');
     if (medContainer && allMediums.length > 0) {
       medContainer.innerHTML = `
@@ -458,14 +583,14 @@ class WorksManager {
           ${allMediums.map(m => {
             const display = lang === 'is' ? (this.mediumTranslations[m] || m) : m;
             return `<button class="filter-pill${this.currentFilters.mediums.includes(m) ? ' active' : ''}"
-                    data-filter="medium" data-value="${m}">${display}</button>`;
+                    data-filter="medium" data-value="${m}">${display}<span class="filter-count"></span></button>`;
           }).join('')}
         </div>
       `;
     }
 
-    // Tags — collect from actual works data, translate for Icelandic
-    const allTags = [...new Set(this.allWorks.flatMap(w => w.tags || []))].sort();
+    // Tags — values used by works, from the facet index; translated for Icelandic
+    const allTags = this.facets.tag.values;
     const tagContainer = document.getElementById('filter-tags');
     if (tagContainer && allTags.length > 0) {
       tagContainer.innerHTML = `
@@ -474,17 +599,14 @@ class WorksManager {
           ${allTags.map(tag => {
             const display = lang === 'is' ? (this.tagTranslations[tag] || tag) : tag;
             return `<button class="filter-pill${this.currentFilters.tags.includes(tag) ? ' active' : ''}"
-                    data-filter="tag" data-value="${tag}">${display}</button>`;
+                    data-filter="tag" data-value="${tag}">${display}<span class="filter-count"></span></button>`;
           }).join('')}
         </div>
       `;
     }
 
-    // Decades — parse year safely, filter out NaN
-    const decades = [...new Set(this.allWorks.map(w => {
-      const y = this.parseYearNumber(w.year);
-      return y ? Math.floor(y / 10) * 10 : null;
-    }).filter(d => d !== null))].sort();
+    // Decades — from the facet index (works without a parsable year have none)
+    const decades = this.facets.decade.values;
     const decContainer = document.getElementById('filter-decades');
     if (decContainer) {
       decContainer.innerHTML = `
@@ -492,7 +614,7 @@ class WorksManager {
         <div class="filter-pills">
           ${decades.map(d => `
             <button class="filter-pill${this.currentFilters.decades.includes(d) ? ' active' : ''}"
-                    data-filter="decade" data-value="${d}">${d}s</button>
+                    data-filter="decade" data-value="${d}">${d}s<span class="filter-count"></span></button>
           `).join('')}
         </div>
       `;
@@ -501,6 +623,7 @@ class WorksManager {
     // Clear label
     const clearBtn = document.getElementById('filter-clear');
     if (clearBtn) clearBtn.textContent = labels.clear;
+    this.updateFilterCounts();
 
     // Attach pill click handlers
     document.querySelectorAll('#filter-panel .filter-pill').forEach(pill => {
@@ -530,36 +653,11 @@ class WorksManager {
   }
 
   filterWorks() {
-    this.filteredWorks = this.allWorks.filter(work => {
-      // Category filter (OR within group)
-      if (this.currentFilters.categories.length > 0) {
-        const workCats = Array.isArray(work.category) ? work.category : [];
-        if (!this.currentFilters.categories.some(c => workCats.includes(c))) return false;
-      }
-
-      // Medium filter (OR within group)
-      if (this.currentFilters.mediums.length > 0) {
-        const workMediums = work.medium ? (Array.isArray(work.medium.en) ? work.medium.en : []) : [];
-        if (!this.currentFilters.mediums.some(m => workMediums.includes(m))) return false;
-      }
-
-      // Tag filter (OR within group)
-      if (this.currentFilters.tags.length > 0) {
-        const workTags = work.tags || [];
-        if (!this.currentFilters.tags.some(t => workTags.includes(t))) return false;
-      }
-
-      // Decade filter (OR within group)
-      if (this.currentFilters.decades.length > 0) {
-        const y = this.parseYearNumber(work.year);
-        if (!y) return false;
-        const workDecade = Math.floor(y / 10) * 10;
-        if (!this.currentFilters.decades.includes(workDecade)) return false;
-      }
-
-      return true;
-    });
-
+    const mask = this.filterMask();
+    this.filteredWorks = mask
+      ? this.allWorks.filter((work, i) => mask[i >> 5] & (1 << (i & 31)))
+      : [...this.allWorks];
+    this.updateFilterCounts();
     this.renderWorks();
   }
 
@@ -957,10 +1055,14 @@ class WorksManager {
   }
 
 
-  checkForDirectWorkLink() {
+  async checkForDirectWorkLink() {
     const urlParams = new URLSearchParams(window.location.search);
-    const workId = urlParams.get('work');
+    let workId = urlParams.get('work');
     
+    if (workId && !this.allWorks.some(w => w.id === workId)) {
+      workId = await this.resolveWorkRedirect(workId);
+    }
+
     if (workId) {
       // Small delay to ensure everything is rendered
       setTimeout(() => {
@@ -969,6 +1071,25 @@ class WorksManager {
     }
   }
 
+  async resolveWorkRedirect(workId) {
+    // Old deep links to renamed works (work-redirects.json is written by rename_work.py)
+    try {
+      const response = await fetch('work-redirects.json');
+      if (!response.ok) return workId;
+      const redirects = await response.json();
+      const newId = redirects[workId];
+      if (!newId) return workId;
+
+      const url = new URL(window.location);
+      url.searchParams.set('work', newId);
+      window.history.replaceState({}, '', url);
+      return newId;
+    } catch (error) {
+      console.error('Error loading work redirects:', error);
+      return workId;
+    }
+  }
+
   refreshWorkCards() {
     // Force complete re-render of the works grid to fix rendering issues
     setTimeout(() => {
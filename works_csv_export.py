@@ -1,165 +1,309 @@
 #!/usr/bin/env python3
 """
 Export works.json to CSV for Excel editing, and import back.
+
+The export writes the chosen columns (--columns; by default id, titles, year,
+dimensions, materials and the two status fields, `all` for every column). The import reads whichever columns the CSV
+has, one row at a time, compares each cell with what the export would write
+for the current record and applies only the cells that differ, through the
+WorksStore (atomic, journalled). It prints every change, saves once and then
+brings what is derived from works.json up to date for just the changed works
+(build.py update_records).
+
+A cleared cell clears the field. Bilingual fields are read and written
+through models.Text / TextList, so legacy shapes are upgraded the way the rest
+of the tools read them. Lists (materials, tags, exhibitions) are comma
+separated and image captions are separated by | in image order; a separator
+or a backslash inside an item is preceded by a backslash.
+
+Usage:
+  python works_csv_export.py export [--columns all|COL,COL...] [-o FILE]
+  python works_csv_export.py import [-i FILE] [--dry-run]
 """
 
-import json
+import argparse
+import copy
 import csv
-from pathlib import Path
-
-def get_localized_value(field, lang):
-    """Extract value from bilingual field"""
-    if not field:
-        return ''
-    if isinstance(field, dict):
-        return field.get(lang, '')
-    return str(field)
-
-def get_materials_string(materials, lang):
-    """Convert materials to comma-separated string"""
-    if not materials:
-        return ''
-    if isinstance(materials, dict) and (lang in materials or 'en' in materials or 'is' in materials):
-        mat = materials.get(lang, materials.get('en', materials.get('is', [])))
-        if isinstance(mat, list):
-            return ', '.join(mat)
-        return str(mat)
-    if isinstance(materials, list):
-        return ', '.join(materials)
-    return str(materials)
-
-def export_to_csv():
+import sys
+
+from models import Text, TextList
+
+CSV_FILE = 'works_export.csv'
+DELIMITER = ';'  # what Excel expects in most locales
+LIST_SEPARATOR = ', '
+CAPTION_SEPARATOR = ' | '
+
+
+def _join(values, separator=LIST_SEPARATOR):
+    """Join values, preceding a backslash or the separator character inside one with a backslash."""
+    char = separator.strip()
+    return separator.join(v.replace('\\', '\\\\').replace(char, '\\' + char) for v in values)
+
+
+def _split_all(cell, separator):
+    """Every part of a cell written by _join (a backslash takes the next character literally)."""
+    parts, current = [], []
+    chars = iter(cell)
+    for char in chars:
+        if char == '\\':
+            current.append(next(chars, char))
+        elif char == separator:
+            parts.append(''.join(current).strip())
+            current = []
+        else:
+            current.append(char)
+    parts.append(''.join(current).strip())
+    return parts
+
+
+def _split(cell):
+    """The non-empty items of a list cell."""
+    return [part for part in _split_all(cell, LIST_SEPARATOR.strip()) if part]
+
+
+def _join_captions(captions):
+    return _join(captions, CAPTION_SEPARATOR)
+
+
+def _split_captions(cell):
+    return _split_all(cell, CAPTION_SEPARATOR.strip())
+
+
+def _text_column(field, lang):
+    def get(work):
+        return Text.from_value(work.get(field)).value(lang)
+
+    def put(work, cell):
+        text = Text.from_value(work.get(field))
+        text.set(lang, cell)
+        work[field] = text.to_dict()
+    return get, put
+
+
+def _materials_column(lang):
+    def get(work):
+        return _join(TextList.from_value(work.get('materials')).value(lang))
+
+    def put(work, cell):
+        materials = TextList.from_value(work.get('materials'))
+        materials.set(lang, _split(cell))
+        work['materials'] = materials.to_dict()
+    return get, put
+
+
+def _optional_column(field):
+    def get(work):
+        return work.get(field) or ''
+
+    def put(work, cell):
+        if cell:
+            work[field] = cell
+        else:
+            work.pop(field, None)
+    return get, put
+
+
+def _year_get(work):
+    year = work.get('year')
+    return '' if year is None else str(year)
+
+
+def _year_put(work, cell):
+    work['year'] = int(cell) if cell.isdigit() else (cell or None)
+
+
+def _dimensions_get(work):
+    return work.get('dimensions') or ''
+
+
+def _dimensions_put(work, cell):
+    work['dimensions'] = cell or None
+
+
+def _tags_get(work):
+    return _join(work.get('tags') or [])
+
+
+def _tags_put(work, cell):
+    work['tags'] = _split(cell)
+
+
+def _exhibition_label(exhibition):
+    """Exhibition ids as they are; older inline entries by id or English title."""
+    if isinstance(exhibition, dict):
+        title = exhibition.get('title')
+        return exhibition.get('id') or (title.get('en', '') if isinstance(title, dict) else title or '')
+    return exhibition
+
+
+def _exhibitions_get(work):
+    return _join(_exhibition_label(e) for e in work.get('exhibitions') or [])
+
+
+def _exhibitions_put(work, cell):
+    # Entries still listed keep their original form, so inline ones survive the round trip.
+    # Each label takes the next unused entry with that label, so repeated labels stay separate.
+    existing = {}
+    for exhibition in work.get('exhibitions') or []:
+        existing.setdefault(_exhibition_label(exhibition), []).append(exhibition)
+    work['exhibitions'] = [existing[label].pop(0) if existing.get(label) else label for label in _split(cell)]
+
+
+def _caption_column(lang):
+    def get(work):
+        return _join_captions(Text.from_value(image.get('caption')).value(lang) for image in work.get('images') or [])
+
+    def put(work, cell):
+        images = work.get('images') or []
+        parts = _split_captions(cell) if cell else [''] * len(images)
+        if len(parts) != len(images):
+            raise ValueError(f"{len(parts)} captions for {len(images)} images")
+        for image, text in zip(images, parts):
+            caption = Text.from_value(image.get('caption'))
+            caption.set(lang, text)
+            image['caption'] = caption.to_dict()
+    return get, put
+
+
+# column -> (read the cell value from a work, write a cell value into a work)
+COLUMNS = {
+    'title_en': _text_column('title', 'en'),
+    'title_is': _text_column('title', 'is'),
+    'year': (_year_get, _year_put),
+    'dimensions': (_dimensions_get, _dimensions_put),
+    'materials_en': _materials_column('en'),
+    'materials_is': _materials_column('is'),
+    'contentStatus': _optional_column('contentStatus'),
+    'mediaStatus': _optional_column('mediaStatus'),
+    'description_en': _text_column('description', 'en'),
+    'description_is': _text_column('description', 'is'),
+    'tags': (_tags_get, _tags_put),
+    'exhibitions': (_exhibitions_get, _exhibitions_put),
+    'captions_en': _caption_column('en'),
+    'captions_is': _caption_column('is'),
+}
+
+DEFAULT_COLUMNS = ['title_en', 'title_is', 'year', 'dimensions', 'materials_en', 'materials_is',
+                   'contentStatus', 'mediaStatus']
+
+
+def parse_columns(spec):
+    """'all', 'a,b,c' or None (the default columns) -> list of column names."""
+    if not spec:
+        return list(DEFAULT_COLUMNS)
+    if spec == 'all':
+        return list(COLUMNS)
+    columns = [c.strip() for c in spec.split(',') if c.strip() and c.strip() != 'id']
+    unknown = [c for c in columns if c not in COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown column: {', '.join(unknown)} (columns: {', '.join(COLUMNS)})")
+    return columns
+
+
+def export_to_csv(path=CSV_FILE, columns=None, store=None):
     """Export works.json to CSV"""
-    with open('works.json', 'r', encoding='utf-8') as f:
-        data = json.load(f)
-
-    works = data['works']
-
-    # CSV columns
-    fieldnames = [
-        'id',
-        'title_en',
-        'title_is',
-        'year',
-        'dimensions',
-        'materials_en',
-        'materials_is',
-        'contentStatus',
-        'mediaStatus'
-    ]
-
-    with open('works_export.csv', 'w', encoding='utf-8-sig', newline='') as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames, delimiter=';')
-        writer.writeheader()
-
-        for work in works:
-            if isinstance(work, str):
-                continue
+    from store import WorksStore
+    store = store or WorksStore()
+    columns = columns or DEFAULT_COLUMNS
+
+    with open(path, 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.writer(f, delimiter=DELIMITER)
+        writer.writerow(['id'] + columns)
+        for work in store.works:
+            writer.writerow([work.get('id', '')] + [COLUMNS[c][0](work) for c in columns])
 
-            row = {
-                'id': work.get('id', ''),
-                'title_en': get_localized_value(work.get('title'), 'en'),
-                'title_is': get_localized_value(work.get('title'), 'is'),
-                'year': work.get('year', ''),
-                'dimensions': work.get('dimensions') or '',
-                'materials_en': get_materials_string(work.get('materials'), 'en'),
-                'materials_is': get_materials_string(work.get('materials'), 'is'),
-                'contentStatus': work.get('contentStatus', ''),
-                'mediaStatus': work.get('mediaStatus', '')
-            }
-            writer.writerow(row)
-
-    print(f"Exported {len(works)} works to works_export.csv")
+    print(f"Exported {len(store.works)} works ({len(columns)} columns) to {path}")
     print("Note: CSV uses semicolon (;) delimiter for Excel compatibility")
 
-def import_from_csv():
-    """Import CSV back to works.json, updating only the editable fields"""
-    # Load existing works.json
-    with open('works.json', 'r', encoding='utf-8') as f:
-        data = json.load(f)
 
-    works = data['works']
-    works_by_id = {w.get('id'): w for w in works if isinstance(w, dict)}
+def _short(text, limit=60):
+    return repr(text if len(text) <= limit else text[:limit - 3] + '...')
+
+
+def import_from_csv(path=CSV_FILE, store=None, dry_run=False, rebuild=True):
+    """Apply the cells that differ from works.json; returns [(work id, column, old, new)]."""
+    from store import WorksStore
+    store = store or WorksStore()
 
-    # Read CSV
-    updated_count = 0
-    with open('works_export.csv', 'r', encoding='utf-8-sig', newline='') as f:
-        reader = csv.DictReader(f, delimiter=';')
+    changes = []
+    per_column = {}
+    rows = unknown = errors = 0
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.DictReader(f, delimiter=DELIMITER)
+        columns = [c for c in reader.fieldnames or [] if c in COLUMNS]
+        ignored = [c for c in reader.fieldnames or [] if c != 'id' and c not in COLUMNS]
+        if ignored:
+            print(f"Ignoring unknown columns: {', '.join(ignored)}")
 
         for row in reader:
-            work_id = row.get('id', '').strip()
-            if not work_id or work_id not in works_by_id:
+            rows += 1
+            work_id = (row.get('id') or '').strip()
+            work = store.get(work_id)
+            if work is None:
                 print(f"Skipping unknown work: {work_id}")
+                unknown += 1
                 continue
 
-            work = works_by_id[work_id]
-
-            # Update title
-            title_en = row.get('title_en', '').strip()
-            title_is = row.get('title_is', '').strip()
-            if title_en or title_is:
-                if not isinstance(work.get('title'), dict):
-                    work['title'] = {}
-                if title_en:
-                    work['title']['en'] = title_en
-                if title_is:
-                    work['title']['is'] = title_is
-
-            # Update year
-            year = row.get('year', '').strip()
-            if year:
-                try:
-                    work['year'] = int(year)
-                except ValueError:
-                    work['year'] = year
-
-            # Update dimensions
-            dimensions = row.get('dimensions', '').strip()
-            work['dimensions'] = dimensions if dimensions else None
-
-            # Update materials
-            materials_en = row.get('materials_en', '').strip()
-            materials_is = row.get('materials_is', '').strip()
-            if materials_en or materials_is:
-                if not isinstance(work.get('materials'), dict):
-                    work['materials'] = {'en': [], 'is': []}
-                if materials_en:
-                    work['materials']['en'] = [m.strip() for m in materials_en.split(',')]
-                if materials_is:
-                    work['materials']['is'] = [m.strip() for m in materials_is.split(',')]
-
-            # Update status fields
-            content_status = row.get('contentStatus', '').strip()
-            if content_status:
-                work['contentStatus'] = content_status
-
-            media_status = row.get('mediaStatus', '').strip()
-            if media_status:
-                work['mediaStatus'] = media_status
-
-            updated_count += 1
-
-    # Save updated works.json
-    with open('works.json', 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-
-    print(f"Updated {updated_count} works in works.json")
+            updated = copy.deepcopy(work)
+            row_changes = []
+            try:
+                for column in columns:
+                    get, put = COLUMNS[column]
+                    cell, current = (row.get(column) or '').strip(), get(updated).strip()
+                    if cell != current:
+                        put(updated, cell)
+                        row_changes.append((work_id, column, current, cell))
+            except ValueError as e:
+                print(f"  {work_id}: {column}: {e}; row not applied")
+                errors += 1
+                continue
+            if not row_changes:
+                continue
+            for _, column, old, new in row_changes:
+                print(f"  {work_id}: {column}: {_short(old)} -> {_short(new)}")
+                per_column[column] = per_column.get(column, 0) + 1
+            changes.extend(row_changes)
+            if not dry_run:
+                store.replace_work(work_id, updated)
 
-if __name__ == '__main__':
-    import sys
+    changed_works = len({change[0] for change in changes})
+    print(f"\n{rows} rows read: {changed_works} works changed, {rows - changed_works - unknown - errors} unchanged"
+          f"{f', {unknown} unknown ids' if unknown else ''}{f', {errors} rows with errors' if errors else ''}")
+    for column, count in per_column.items():
+        print(f"  {column}: {count}")
+
+    if dry_run:
+        print("Dry run: nothing written")
+    elif changes:
+        store.save()
+        print(f"Updated {changed_works} works in works.json")
+        if rebuild:
+            from build import update_records
+            update_records(store)
+    return changes
 
-    if len(sys.argv) < 2:
-        print("Usage:")
-        print("  python works_csv_export.py export  - Export to CSV")
-        print("  python works_csv_export.py import  - Import from CSV")
-        sys.exit(1)
 
-    command = sys.argv[1].lower()
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="CSV round trip of works.json for spreadsheet editing")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    export_parser = subparsers.add_parser('export', help='Export to CSV')
+    export_parser.add_argument('--columns', help=f"all, or a comma separated list of: {', '.join(COLUMNS)}")
+    export_parser.add_argument('-o', '--output', default=CSV_FILE, help=f'CSV file (default: {CSV_FILE})')
+    import_parser = subparsers.add_parser('import', help='Import changed cells from CSV')
+    import_parser.add_argument('-i', '--input', default=CSV_FILE, help=f'CSV file (default: {CSV_FILE})')
+    import_parser.add_argument('--dry-run', action='store_true', help='Report the changes without saving')
+    args = parser.parse_args(argv)
 
-    if command == 'export':
-        export_to_csv()
-    elif command == 'import':
-        import_from_csv()
+    if args.command == 'export':
+        try:
+            columns = parse_columns(args.columns)
+        except ValueError as e:
+            parser.error(str(e))
+        export_to_csv(args.output, columns)
     else:
-        print(f"Unknown command: {command}")
-        print("Use 'export' or 'import'")
+        import_from_csv(args.input, dry_run=args.dry_run)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Year and date-range parsing for works and exhibitions.
+
+`year` values mix integers, ranges ("1969-71", "1973–76"), alternatives
+("1975/1976", "1966 / 2018"), qualified years ("ca 1957", "before 1985"),
+strings where a number would do (exhibitions' "2025") and "Unknown". The
+ingest scripts, slug generation, the search index and works.js each read a
+year out of them in their own way. parse_year() is the one reading:
+
+  1969            1969 - 1969   "1969"
+  "1969-71"       1969 - 1971   "1969–71"
+  "1975/1976"     1975 - 1976   "1975/1976"
+  "ca 1957"       1957 - 1957   "ca 1957"
+  "1990s"         1990 - 1999   "1990s"
+  "1995-12-03"    1995 - 1995   "1995-12-03"
+  "Unknown"       None - None   "Unknown"
+
+A range's abbreviated end takes the missing digits from its start; a
+decade runs to its ninth year; any other text spans its first to its last
+year. A date is not a range: the end must not be followed by another -DD.
+Only years from 1900 to 2099 count, integers included, so catalogue
+numbers and dimensions in folder names are not taken for years.
+
+The build stores the result in every work and exhibition as yearStart,
+yearEnd and yearDisplay (set_year_fields), so sorting, the decade facet
+and timeline queries compare integers instead of parsing text.
+
+Usage:
+  python years.py                   - Report how works' and exhibitions' years parse
+"""
+
+import re
+import sys
+from dataclasses import dataclass
+
+YEAR_PATTERN = re.compile(r'(?<!\d)(?:19|20)\d{2}(?!\d)')
+YEAR_RANGE = re.compile(r'(?<!\d)(?P<start>(?:19|20)\d{2})\s*[-–—]\s*(?P<end>\d{1,4})(?!\d|[-–—]\d)')
+DECADE_PATTERN = re.compile(r'(?<!\d)((?:19|20)\d0)s\b')
+FIRST_YEAR, LAST_YEAR = 1900, 2099
+FIELDS = ('yearStart', 'yearEnd', 'yearDisplay')
+
+
+@dataclass(frozen=True, slots=True)
+class YearRange:
+    start: int = None
+    end: int = None
+    display: str = ''
+
+    def __bool__(self):
+        return self.start is not None
+
+    @property
+    def decade(self):
+        return None if self.start is None else self.start // 10 * 10
+
+    def overlaps(self, first, last):
+        """True if any year of the range falls within first..last."""
+        return self.start is not None and self.start <= last and self.end >= first
+
+
+def _range_end(start, end):
+    """Expand an abbreviated range end: (1969, '71') -> 1971, (1998, '05') -> 2005."""
+    digits = len(end)
+    value = int(str(start)[:4 - digits] + end)
+    return value + 10 ** digits if value < start else value
+
+
+def parse_year(value):
+    """YearRange of a year field (int, string, None); start and end are None when no year is found."""
+    if isinstance(value, bool) or value is None:
+        return YearRange()
+    if isinstance(value, int):
+        if not FIRST_YEAR <= value <= LAST_YEAR:
+            return YearRange(display=str(value))
+        return YearRange(value, value, str(value))
+    text = ' '.join(str(value).split())
+    span = YEAR_RANGE.search(text)
+    if span:
+        start = int(span.group('start'))
+        end = _range_end(start, span.group('end'))
+        display = f"{text[:span.start()]}{span.group('start')}–{span.group('end')}{text[span.end():]}"
+        return YearRange(start, max(start, end), display)
+    years = [int(year) for year in YEAR_PATTERN.findall(text)]
+    years += [int(decade) + 9 for decade in DECADE_PATTERN.findall(text)]
+    if not years:
+        return YearRange(display=text)
+    return YearRange(min(years), max(years), text)
+
+
+def first_year(text):
+    """The first year mentioned in text (a folder name, a title), or None."""
+    match = YEAR_PATTERN.search(str(text or ''))
+    return int(match.group()) if match else None
+
+
+def set_year_fields(record):
+    """Store yearStart, yearEnd and yearDisplay right after `year` in a work or exhibition dict; True if changed."""
+    span = parse_year(record.get('year'))
+    fields = dict(zip(FIELDS, (span.start, span.end, span.display)))
+    if all(key in record and record[key] == value for key, value in fields.items()):
+        return False
+    items = [(key, value) for key, value in record.items() if key not in FIELDS]
+    at = next((i + 1 for i, (key, _) in enumerate(items) if key == 'year'), len(items))
+    items[at:at] = fields.items()
+    record.clear()
+    record.update(items)
+    return True
+
+
+def main():
+    from models import load_exhibitions, load_works
+    records = [('work', work.id, work.year) for work in load_works()]
+    exhibitions = load_exhibitions()
+    records += [(kind, ex.id, ex.year) for kind in ('solo', 'group') for ex in exhibitions[kind]]
+    unparsed = 0
+    for kind, record_id, year in records:
+        span = parse_year(year)
+        if not span:
+            unparsed += 1
+            print(f"  {kind} {record_id}: no year in {year!r}")
+        elif span.start != span.end or span.display != str(year):
+            print(f"  {kind} {record_id}: {year!r} -> {span.start}-{span.end} {span.display!r}")
+    print(f"{len(records)} years, {unparsed} without a year")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())